@@ -2,11 +2,13 @@
 
 - Loads rules from YAML in `config/`.
 - Provides core models and a small reducer to apply actions to GameState.
-- Effects are registered via a simple plugin registry in `effects.py`.
+- Effects are registered via a simple plugin registry in `effects.py`; cards
+  subscribe to triggers (on_enter, on_damage, ...) and the reducer emits them.
 """
 
 from .models import (
     Card, CardType, Faction, PlayerState, GameState, TokenPools, Slot,
 )
-from .engine import apply_action, next_turn, initialize_game
-from .actions import Action, Attack, Defend, Influence, DiscardCard
+from .engine import apply_action, next_turn, initialize_game, rollback
+from .actions import Action, Attack, Defend, Influence, DiscardCard, Draw, UseAbility
+from .legal import legal_actions, is_legal
@@ -43,3 +43,10 @@ class Draw(Action):
     # shelf: reveal to open shelf (face-up pool)
     place: Literal["hand", "slot", "shelf"]
     slot_index: Optional[int] = None  # required when place == "slot"
+
+
+class UseAbility(Action):
+    kind: Literal["use_ability"] = "use_ability"
+    # Activate a paid ability (Card.paid) of a card on the active player's board
+    own_slot: int
+    ability_id: str
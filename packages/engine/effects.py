@@ -1,9 +1,42 @@
+"""Effect registry and trigger bus.
+
+Effects are plain functions `fn(ctx, payload)` registered under an id. Cards
+subscribe to triggers through their `abl` when they are built (see
+`subscribe`); the engine then calls `emit(ctx, trigger, ...)` at the matching
+moments and only the subscribed effects run — no card `abl` is parsed during
+play.
+
+Triggers:
+
+- on_enter: the card entered a board slot face-up;
+- on_damage: the card lost HP (payload["damage"]);
+- on_death: the card's HP dropped to zero or below;
+- turn_start / turn_end: the owner's turn begins / ends (every card on board).
+
+`abl` forms, per trigger key: `{"gain": 2, "steal": 1}` (effect id -> amount),
+`"heal_self_1"` or `["heal_self_1", ...]` (amount 1). Effects are looked up by
+id when the trigger fires, so `register` adds or overrides behavior without
+touching the reducer.
+"""
+
 from __future__ import annotations
-from typing import Callable, Dict, Any
+from typing import Any, Callable, Dict, Tuple
+
+from .eventlog import enabled, record
 
 EffectFunc = Callable[[Any, dict], None]
 
+TRIGGERS = ("on_enter", "on_damage", "on_death", "turn_start", "turn_end")
+
+# trigger -> ((effect_id, amount), ...)
+Subscriptions = Dict[str, Tuple[Tuple[str, int], ...]]
+
 _registry: Dict[str, EffectFunc] = {}
+# Effects the engine ships with; `register` overrides them and clearing
+# `_registry` does not remove them
+_builtins: Dict[str, EffectFunc] = {}
+# Triggers at least one card has subscribed to (lets the engine skip board scans)
+_live_triggers: set = set()
 
 
 def register(effect_id: str):
@@ -13,15 +46,177 @@ def register(effect_id: str):
     return _wrap
 
 
+def _builtin(effect_id: str):
+    def _wrap(fn: EffectFunc):
+        _builtins[effect_id] = fn
+        return fn
+    return _wrap
+
+
 def get(effect_id: str) -> EffectFunc | None:
-    return _registry.get(effect_id)
+    fn = _registry.get(effect_id)
+    return fn if fn is not None else _builtins.get(effect_id)
+
+
+# --- Subscriptions -----------------------------------------------------------
+
+def _parse(spec) -> Tuple[Tuple[str, int], ...]:
+    if isinstance(spec, str):
+        return ((spec, 1),)
+    if isinstance(spec, (list, tuple)):
+        return tuple((str(s), 1) for s in spec)
+    if isinstance(spec, dict):
+        out = []
+        for effect_id, amount in spec.items():
+            try:
+                out.append((str(effect_id), int(amount)))
+            except (TypeError, ValueError):
+                continue
+        return tuple(out)
+    return ()
+
+
+def subscribe(card) -> Subscriptions:
+    """Index the card's trigger effects from its `abl` (called when a Card is built).
+
+    Re-call after replacing or editing `card.abl` in place.
+    """
+    subs: Subscriptions = {}
+    abl = getattr(card, "abl", None)
+    if isinstance(abl, dict):
+        for trigger in TRIGGERS:
+            handlers = _parse(abl.get(trigger))
+            if handlers:
+                subs[trigger] = handlers
+                _live_triggers.add(trigger)
+    card._subs = subs
+    return subs
+
+
+def subscriptions(card) -> Subscriptions:
+    subs = getattr(card, "_subs", None)
+    return subscribe(card) if subs is None else subs
 
 
-# Example effects (placeholders)
-@register("heal_self_1")
+def listening(trigger: str) -> bool:
+    """Whether any card built so far subscribes to `trigger`."""
+    return trigger in _live_triggers
+
+
+def emit(ctx, trigger: str, pid: str, slot_index: int, **extra) -> int:
+    """Run the effects the card in (pid, slot_index) subscribed to for `trigger`.
+
+    Payload: trigger, player, slot, card, amount, plus `extra`. Returns the
+    number of effects run. Effects may touch any part of the state, so both
+    players' Zobrist parts are refreshed when one ran.
+    """
+    card = ctx.state.players[pid].slots[slot_index].card
+    if card is None:
+        return 0
+    handlers = subscriptions(card).get(trigger)
+    if not handlers:
+        return 0
+    ran = 0
+    for effect_id, amount in handlers:
+        fn = get(effect_id)
+        if fn is None:
+            continue
+        payload = {"trigger": trigger, "player": pid, "slot": slot_index, "card": card, "amount": amount}
+        payload.update(extra)
+        fn(ctx, payload)
+        ran += 1
+    if ran:
+        from . import zobrist as zh
+        zh.touch_player(ctx.state, "P1")
+        zh.touch_player(ctx.state, "P2")
+    return ran
+
+
+def emit_board(ctx, trigger: str, pid: str) -> int:
+    """`emit` for every card on a player's board; O(1) when no card listens."""
+    if trigger not in _live_triggers:
+        return 0
+    ran = 0
+    for i, s in enumerate(ctx.state.players[pid].slots):
+        if s.card is not None:
+            ran += emit(ctx, trigger, pid, i)
+    return ran
+
+
+# --- Built-in effects ----------------------------------------------------------
+
+def _other(pid: str) -> str:
+    return "P2" if pid == "P1" else "P1"
+
+
+@_builtin("gain")
+def effect_gain(ctx, payload):
+    # Gain N coins into the owner's reserve
+    amount = max(0, payload["amount"])
+    ctx.state.players[payload["player"]].tokens.reserve_money += amount
+    if enabled(ctx, payload["trigger"]):
+        record(ctx, payload["trigger"], payload["player"], payload.get("slot"), amount,
+               {"card": payload["card"].id, "effect": "gain", "amount": amount, "to": payload["player"]})
+
+
+@_builtin("steal")
+def effect_steal(ctx, payload):
+    # Steal N from the opponent's reserve (up to available)
+    p = ctx.state.players[payload["player"]]
+    op = ctx.state.players[_other(payload["player"])]
+    take = min(max(0, payload["amount"]), max(0, op.tokens.reserve_money))
+    op.tokens.reserve_money -= take
+    p.tokens.reserve_money += take
+    if enabled(ctx, payload["trigger"]):
+        record(ctx, payload["trigger"], payload["player"], payload.get("slot"), take,
+               {"card": payload["card"].id, "effect": "steal", "amount": take, "from": op.id, "to": payload["player"]})
+
+
+@_builtin("bribe")
+def effect_bribe(ctx, payload):
+    # Place up to N muscles on this slot for free, capped by its defense quota
+    from .engine import _defense_quota
+    pid = payload["player"]
+    s = ctx.state.players[pid].slots[payload["slot"]]
+    want = payload["amount"]
+    placed = max(0, min(want, _defense_quota(ctx, pid, s) - s.muscles))
+    s.muscles += placed
+    if enabled(ctx, payload["trigger"]):
+        record(ctx, payload["trigger"], pid, payload["slot"], placed,
+               {"card": payload["card"].id, "effect": "bribe", "requested": max(0, want), "placed": placed,
+                "quota": _defense_quota(ctx, pid, s)})
+
+
+@_builtin("heal_self_1")
 def effect_heal_self_1(ctx, payload):
     # payload: {"player": "P1", "slot": 0}
-    slot = ctx.state.get_slot(payload["player"], payload["slot"])
+    slot = ctx.state.get_slot(payload["player"], payload.get("slot", payload.get("target_slot")))
     if slot.card:
+        slot.card = ctx.state.own_card(slot.card)
         slot.card.hp += 1
-        ctx.log.append({"type": "effect", "id": "heal_self_1", "delta": 1})
+        if enabled(ctx, "effect"):
+            record(ctx, "effect", payload["player"], amount=1, extra={"id": "heal_self_1", "delta": 1})
+
+
+# Event cards resolve through the effect with the card's id (see engine.resolve_event)
+
+@_builtin("event_plus_cash")
+def effect_event_plus_cash(ctx, payload):
+    # Return up to 2 tokens from the active player's discard to reserve
+    ap = ctx.state.players[ctx.state.active_player]
+    take = min(2, ap.tokens.otboy)
+    ap.tokens.otboy -= take
+    ap.tokens.reserve_money += take
+    record(ctx, "event_plus_cash", ap.id, amount=take)
+
+
+@_builtin("event_minus_raid")
+def effect_event_minus_raid(ctx, payload):
+    # Remove 1 muscle from the first opponent slot that has any
+    op = ctx.state.players[ctx.state.opponent_id()]
+    for i, s in enumerate(op.slots):
+        if s.muscles > 0:
+            s.muscles -= 1
+            op.tokens.otboy += 1
+            record(ctx, "event_minus_raid", op.id, i)
+            break
@@ -1,14 +1,28 @@
 from __future__ import annotations
-from typing import List, Dict
-import random
-from pydantic import BaseModel
+from typing import List, Dict, Optional
+from pydantic import BaseModel, ConfigDict
 from .models import GameState, PlayerState, Slot, TurnPhase
-from .actions import Action, Attack, Defend, Influence, DiscardCard, Draw
+from .actions import Action, Attack, Defend, Influence, DiscardCard, Draw, UseAbility
+from . import effects, eventlog
+from . import zobrist as zh
+from .eventlog import EventLog, enabled, record
 
 
 class Ctx(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     state: GameState
     log: List[Dict] = []
+    # Undo stack for apply_action(..., record_undo=True): (snapshot, log mark)
+    undo: List[tuple] = []
+    # Event logging (see eventlog.py): level OFF/SUMMARY/FULL; with an EventLog
+    # attached events go to its columnar ring buffer instead of `log`
+    log_level: int = eventlog.FULL
+    events: Optional[EventLog] = None
+
+    def log_dicts(self) -> List[Dict]:
+        """Logged events in dict format, whichever sink is in use."""
+        return self.events.to_dicts() if self.events is not None else self.log
 
 
 def _card_trait(card, key: str, default: int = 0) -> int:
@@ -54,7 +68,9 @@ def _maybe_trigger_cascade(ctx: Ctx, pid: str) -> None:
         if reward > 0:
             p.tokens.reserve_money += reward
         p.cascade_triggers += 1
-        ctx.log.append({"type": "cascade_trigger", "pattern": "2-2-2", "reward": reward, "triggers": p.cascade_triggers})
+        zh.touch(st, zh.tokens_part(pid))
+        if enabled(ctx, "cascade_trigger"):
+            record(ctx, "cascade_trigger", pid, amount=reward, extra={"pattern": "2-2-2", "triggers": p.cascade_triggers})
 
 
 def _authority_bonus(p: PlayerState) -> int:
@@ -81,75 +97,23 @@ def _defense_quota(ctx: Ctx, pid: str, slot: Slot) -> int:
 
 def _on_enter_slot(ctx: Ctx, owner_pid: str, slot_index: int) -> None:
     """Generic hook when a card enters a board slot face-up.
-    Applies on-enter effects and then checks cascade.
+    Runs the card's on_enter effects and then checks cascade.
     """
-    p = ctx.state.get_player(owner_pid)
-    s = p.slots[slot_index]
-    if not s.card:
+    card = ctx.state.get_slot(owner_pid, slot_index).card
+    if not card:
         return
-    card = s.card
-    # Data-driven on-enter effects via abl.on_enter
     try:
-        on_enter = None
-        if isinstance(getattr(card, "abl", None), dict):
-            on_enter = card.abl.get("on_enter")
-        if isinstance(on_enter, dict):
-            # Effect: gain N coins into owner's reserve
-            if "gain" in on_enter:
-                amount = int(on_enter.get("gain", 0))
-                if amount > 0:
-                    p.tokens.reserve_money += amount
-                ctx.log.append({
-                    "type": "on_enter",
-                    "card": getattr(card, "id", "unknown"),
-                    "effect": "gain",
-                    "amount": max(0, int(on_enter.get("gain", 0))),
-                    "to": owner_pid,
-                })
-            # Effect: steal N from opponent reserve (up to available)
-            if "steal" in on_enter:
-                amount = int(on_enter.get("steal", 0))
-                if amount > 0:
-                    op = ctx.state.get_player(ctx.state.opponent_id() if owner_pid == ctx.state.active_player else ctx.state.active_player)
-                    take = min(amount, max(0, op.tokens.reserve_money))
-                    if take > 0:
-                        op.tokens.reserve_money -= take
-                        p.tokens.reserve_money += take
-                ctx.log.append({
-                    "type": "on_enter",
-                    "card": getattr(card, "id", "unknown"),
-                    "effect": "steal",
-                    "amount": take,
-                    "from": getattr(op, "id", "OP"),
-                    "to": owner_pid,
-                })
-            # Effect: bribe N — place up to N muscles on this slot, capped by defense quota; free placement
-            if "bribe" in on_enter:
-                want = int(on_enter.get("bribe", 0))
-                placed = 0
-                if want > 0:
-                    quota = _defense_quota(ctx, owner_pid, s)
-                    already = s.muscles
-                    can_place = max(0, min(want, max(0, quota - already)))
-                    if can_place > 0:
-                        s.muscles += can_place
-                        placed = can_place
-                ctx.log.append({
-                    "type": "on_enter",
-                    "card": getattr(card, "id", "unknown"),
-                    "effect": "bribe",
-                    "requested": max(0, want),
-                    "placed": placed,
-                    "quota": _defense_quota(ctx, owner_pid, s),
-                })
+        effects.emit(ctx, "on_enter", owner_pid, slot_index)
     except Exception:
         # Fail-safe: on-enter should never crash the flow
-        ctx.log.append({"type": "on_enter_error", "card": getattr(card, "id", "unknown")})
+        if enabled(ctx, "on_enter_error"):
+            record(ctx, "on_enter_error", owner_pid, slot_index, extra={"card": getattr(card, "id", "unknown")})
+    zh.touch(ctx.state, zh.slot_part(owner_pid, slot_index), zh.tokens_part("P1"), zh.tokens_part("P2"))
     # After per-card enter effects, attempt cascade check
     _maybe_trigger_cascade(ctx, owner_pid)
 
 
-def _apply_damage(slot: Slot, damage: int, ctx: Ctx, owner_pid: str):
+def _apply_damage(slot: Slot, damage: int, ctx: Ctx, owner_pid: str, slot_index: int | None = None):
     if damage <= 0 or slot.card is None:
         return
     # Muscles burn first (block damage first)
@@ -159,7 +123,33 @@ def _apply_damage(slot: Slot, damage: int, ctx: Ctx, owner_pid: str):
     ctx.state.players[owner_pid].tokens.otboy += burn
     remain = damage - burn
     if remain > 0:
+        slot.card = ctx.state.own_card(slot.card)
+        alive = slot.card.hp > 0
         slot.card.hp -= remain
+        subs = effects.subscriptions(slot.card)
+        if slot_index is not None and subs:
+            if "on_damage" in subs:
+                effects.emit(ctx, "on_damage", owner_pid, slot_index, damage=remain)
+            if alive and slot.card is not None and slot.card.hp <= 0 and "on_death" in subs:
+                effects.emit(ctx, "on_death", owner_pid, slot_index)
+
+
+def _ability_key(slot_index: int, ability_id: str) -> str:
+    return f"{slot_index}:{ability_id}"
+
+
+def ability_uses_left(st: GameState, pid: str, slot_index: int, ability) -> int | None:
+    """Uses of a paid ability left this turn (None = unlimited).
+
+    Counts are stamped with the turn number they belong to, so a new turn
+    starts from zero without touching any counter.
+    """
+    if ability.cooldown_per_turn <= 0:
+        return None
+    turn, used = st.players[pid].ability_uses.get(_ability_key(slot_index, ability.id), (0, 0))
+    if turn != st.turn_number:
+        used = 0
+    return max(0, ability.cooldown_per_turn - used)
 
 
 def _economic_collapse_check(p: PlayerState) -> bool:
@@ -169,27 +159,14 @@ def _economic_collapse_check(p: PlayerState) -> bool:
 
 
 def resolve_event(ctx: Ctx, card) -> None:
-    """Simple event resolution (demo implementation for cards from config)."""
-    st = ctx.state
-    ap = st.get_player(st.active_player)
-    op = st.get_player(st.opponent_id())
-    if card.id == "event_plus_cash":
-        # Return up to 2 tokens from the active player's discard to reserve
-        take = min(2, ap.tokens.otboy)
-        ap.tokens.otboy -= take
-        ap.tokens.reserve_money += take
-        ctx.log.append({"type": "event_plus_cash", "moved": take})
-    elif card.id == "event_minus_raid":
-        # Remove 1 muscle from the first opponent slot that has any
-        for i, s in enumerate(op.slots):
-            if s.muscles > 0:
-                s.muscles -= 1
-                op.tokens.otboy += 1
-                ctx.log.append({"type": "event_minus_raid", "slot": i})
-                break
-    else:
+    """Resolve an event card through the effect registered under its id."""
+    fn = effects.get(card.id)
+    if fn is None:
         # Log only for now
-        ctx.log.append({"type": "event_unknown", "id": card.id})
+        if enabled(ctx, "event_unknown"):
+            record(ctx, "event_unknown", ctx.state.active_player, extra={"id": card.id})
+        return
+    fn(ctx, {"trigger": "event", "player": ctx.state.active_player, "card": card})
 
 
 def initialize_game(state: GameState):
@@ -199,9 +176,11 @@ def initialize_game(state: GameState):
     state.flags.update({
         "micro_bribe_used": False,
     })
+    zh.touch(state, zh.TURN)
 
 
 def next_turn(ctx: Ctx):
+    effects.emit_board(ctx, "turn_end", ctx.state.active_player)
     # Switch active player and reset per-turn flags
     ctx.state.active_player = ctx.state.opponent_id()
     ctx.state.turn_number += 1
@@ -212,13 +191,33 @@ def next_turn(ctx: Ctx):
     # Reset cascade flags for the new turn
     ap.cascade_used = False
     ap.cascade_triggers = 0
-    for s in ap.slots:
+    zh.touch(ctx.state, zh.TURN, zh.tokens_part(ap.id))
+    for i, s in enumerate(ap.slots):
         if s.card and not s.face_up:
             s.face_up = True
+            zh.touch(ctx.state, zh.slot_part(ap.id, i))
+    effects.emit_board(ctx, "turn_start", ap.id)
+
+
+def rollback(ctx: Ctx, steps: int = 1) -> int:
+    """Undo the last `steps` actions applied with `record_undo=True`.
+
+    Restores the state in place and trims the log. Returns how many actions
+    were actually undone.
+    """
+    done = 0
+    while done < steps and ctx.undo:
+        snapshot, log_len = ctx.undo.pop()
+        ctx.state.restore(snapshot)
+        eventlog.truncate(ctx, log_len)
+        done += 1
+    return done
 
 
-def apply_action(ctx: Ctx, action: Action) -> Dict:
+def apply_action(ctx: Ctx, action: Action, record_undo: bool = False) -> Dict:
     st = ctx.state
+    if record_undo:
+        ctx.undo.append((st.fork(), eventlog.mark(ctx)))
     ap = st.get_player(st.active_player)
     op = st.get_player(st.opponent_id())
 
@@ -243,12 +242,14 @@ def apply_action(ctx: Ctx, action: Action) -> Dict:
         if action.target_slot is not None:
             # Explicit slot is given — attack the card on the board
             target_slot = op.slots[action.target_slot]
-            _apply_damage(target_slot, dmg, ctx, owner_pid=op.id)
+            _apply_damage(target_slot, dmg, ctx, owner_pid=op.id, slot_index=action.target_slot)
+            zh.touch(st, zh.slot_part(op.id, action.target_slot))
         else:
             # No slot specified
             if opponent_has_board:
                 # Cannot attack the hand if there are cards on the board
-                ctx.log.append({"type": "attack_skipped", "reason": "opponent_has_board"})
+                if enabled(ctx, "attack_skipped"):
+                    record(ctx, "attack_skipped", ap.id, extra={"reason": "opponent_has_board"})
             else:
                 # Opponent has no cards on board: may target a card from hand (if hand mode enabled)
                 if st.config.hand_enabled and op.hand:
@@ -295,23 +296,30 @@ def apply_action(ctx: Ctx, action: Action) -> Dict:
                                     target_slot.muscles += move
                                     need_block -= move
                                     remaining_quota -= move
-                                    ctx.log.append({"type": "reassign_muscles", "from": i, "to": free_idx, "count": move})
+                                    if enabled(ctx, "reassign_muscles"):
+                                        record(ctx, "reassign_muscles", op.id, i, move, {"to": free_idx})
                         # Now apply damage in the usual way, considering muscles
-                        _apply_damage(target_slot, dmg, ctx, owner_pid=op.id)
-                        ctx.log.append({"type": "attack_hand_deployed", "slot": free_idx, "dmg": dmg})
+                        _apply_damage(target_slot, dmg, ctx, owner_pid=op.id, slot_index=free_idx)
+                        record(ctx, "attack_hand_deployed", ap.id, free_idx, dmg)
                     else:
                         # If there is no free slot — damage directly to the HP of the card in hand
+                        hand_card = op.hand[0] = st.own_card(hand_card)
                         hand_card.hp -= max(0, dmg)
-                        if hand_card.hp <= 0:
+                        killed = hand_card.hp <= 0
+                        if killed:
                             ctx.state.discard_out_of_game.append(hand_card)
                             op.hand.pop(0)
-                            ctx.log.append({"type": "attack_hand", "dmg": dmg, "killed": True})
-                        else:
-                            ctx.log.append({"type": "attack_hand", "dmg": dmg, "killed": False})
-                else:
-                    ctx.log.append({"type": "attack_skipped", "reason": "no_target"})
-
-        ctx.log.append({"type": "attack", "dmg": dmg})
+                        if enabled(ctx, "attack_hand"):
+                            record(ctx, "attack_hand", ap.id, amount=dmg, extra={"killed": killed})
+                elif enabled(ctx, "attack_skipped"):
+                    record(ctx, "attack_skipped", ap.id, extra={"reason": "no_target"})
+
+        if action.target_slot is None:
+            # Hand attacks may deploy, reinforce and discard on the opponent side
+            zh.touch_player(st, op.id)
+            zh.touch(st, zh.DISCARD)
+        zh.touch(st, zh.tokens_part(ap.id), zh.tokens_part(op.id))
+        record(ctx, "attack", ap.id, action.target_slot, dmg)
         st.phase = TurnPhase.resolution
 
     elif isinstance(action, Defend):
@@ -324,7 +332,8 @@ def apply_action(ctx: Ctx, action: Action) -> Dict:
         hire = max(0, min(action.hire_count, remaining_quota, ap.tokens.reserve_money))
         ap.tokens.reserve_money -= hire
         s.muscles += hire
-        ctx.log.append({"type": "defend", "hired": hire})
+        zh.touch(st, zh.slot_part(ap.id, action.target_slot), zh.tokens_part(ap.id))
+        record(ctx, "defend", ap.id, action.target_slot, hire)
         st.phase = TurnPhase.resolution
 
     elif isinstance(action, Influence):
@@ -341,7 +350,9 @@ def apply_action(ctx: Ctx, action: Action) -> Dict:
                     ts.muscles -= 1
                     tp.tokens.otboy += 1
                 st.flags["micro_bribe_used"] = True
-                ctx.log.append({"type": "micro_bribe", "slot": action.micro_bribe_target_slot})
+                zh.touch(st, zh.tokens_part(ap.id), zh.tokens_part(tp.id),
+                         zh.slot_part(tp.id, action.micro_bribe_target_slot))
+                record(ctx, "micro_bribe", ap.id, action.micro_bribe_target_slot)
         st.phase = TurnPhase.resolution
 
     elif isinstance(action, DiscardCard):
@@ -350,7 +361,8 @@ def apply_action(ctx: Ctx, action: Action) -> Dict:
             ctx.state.discard_out_of_game.append(s.card)
             s.card = None
             s.muscles = 0
-            ctx.log.append({"type": "discard", "slot": action.own_slot})
+            zh.touch(st, zh.slot_part(ap.id, action.own_slot), zh.DISCARD)
+            record(ctx, "discard", ap.id, action.own_slot)
         st.phase = TurnPhase.resolution
 
     elif isinstance(action, Draw):
@@ -363,25 +375,28 @@ def apply_action(ctx: Ctx, action: Action) -> Dict:
         if not st.deck:
             # If the deck is empty but there are cards on the shelf — shuffle the shelf into a new face-down deck
             if st.shelf:
-                random.shuffle(st.shelf)
-                st.deck.extend(st.shelf)
-                st.shelf.clear()
-                ctx.log.append({"type": "shelf_recycled"})
+                st.shelf.shuffle(st.rng())
+                st.deck.take_all(st.shelf)
+                record(ctx, "shelf_recycled", ap.id)
             if not st.deck:
                 return {"error": "deck_empty"}
-        card = st.deck.pop(0)
+        card = st.deck.draw()
+        zh.touch(st, zh.DECK, zh.SHELF)
         # Immediate resolution of event cards — they do not occupy a slot/hand/shelf
         if getattr(card, "type", None) == "event":
             resolve_event(ctx, card)
-            ctx.log.append({"type": "draw_event", "card": card.id})
+            zh.touch_player(st, ap.id)
+            zh.touch_player(st, op.id)
+            if enabled(ctx, "draw_event"):
+                record(ctx, "draw_event", ap.id, extra={"card": card.id})
             st.phase = TurnPhase.resolution
+            zh.touch(st, zh.TURN, zh.DECK)
             return {"phase": st.phase}
-        placed = None
         if action.place == "hand":
             if not st.config.hand_enabled:
                 return {"error": "hand_disabled"}
             ap.hand.append(card)
-            placed = {"zone": "hand"}
+            zh.touch(st, zh.hand_part(ap.id))
         elif action.place == "slot":
             if action.slot_index is None:
                 return {"error": "slot_index_required"}
@@ -392,17 +407,49 @@ def apply_action(ctx: Ctx, action: Action) -> Dict:
                 return {"error": "slot_not_empty"}
             slot.card = card
             slot.face_up = True
-            placed = {"zone": "slot", "slot": action.slot_index}
             # Generic enter-slot hook (applies on-enter and cascade)
             _on_enter_slot(ctx, ap.id, action.slot_index)
         elif action.place == "shelf":
             st.shelf.append(card)
-            placed = {"zone": "shelf"}
+            zh.touch(st, zh.SHELF)
         else:
             return {"error": "bad_place"}
-        ctx.log.append({"type": "draw", "card": card.id, "placed": placed})
+        if enabled(ctx, "draw"):
+            placed = {"zone": action.place}
+            if action.place == "slot":
+                placed["slot"] = action.slot_index
+            record(ctx, "draw", ap.id, extra={"card": card.id, "placed": placed})
         st.phase = TurnPhase.resolution
 
+    elif isinstance(action, UseAbility):
+        # Paid ability: pay the cost into otboy and run the effect; the turn continues
+        if action.own_slot < 0 or action.own_slot >= len(ap.slots):
+            return {"error": "bad_slot_index"}
+        card = ap.slots[action.own_slot].card
+        ability = next((a for a in (card.paid if card else ()) if a.id == action.ability_id), None)
+        if ability is None:
+            return {"error": "unknown_ability"}
+        fn = effects.get(ability.effect_id)
+        if fn is None:
+            return {"error": "unknown_effect", "effect": ability.effect_id}
+        if ability_uses_left(st, ap.id, action.own_slot, ability) == 0:
+            return {"error": "ability_on_cooldown"}
+        if ap.tokens.reserve_money < ability.cost:
+            return {"error": "not_enough_money", "cost": ability.cost}
+        ap.tokens.reserve_money -= ability.cost
+        ap.tokens.otboy += ability.cost
+        key = _ability_key(action.own_slot, ability.id)
+        turn, used = ap.ability_uses.get(key, (0, 0))
+        ap.ability_uses[key] = (st.turn_number, used + 1 if turn == st.turn_number else 1)
+        fn(ctx, {"trigger": "ability", "player": ap.id, "slot": action.own_slot, "card": card,
+                 "amount": 1, "ability": ability})
+        zh.touch_player(st, ap.id)
+        zh.touch_player(st, op.id)
+        zh.touch(st, zh.TURN)
+        if enabled(ctx, "use_ability"):
+            record(ctx, "use_ability", ap.id, action.own_slot, ability.cost, {"ability": ability.id})
+        st.phase = TurnPhase.main
+
     # Win by killing the Boss
     # By default — a card of type "boss" on the opponent's board
     boss_dead = False
@@ -413,9 +460,15 @@ def apply_action(ctx: Ctx, action: Action) -> Dict:
 
     result = {"phase": st.phase}
 
+    if boss_dead and isinstance(action, UseAbility):
+        result["winner"] = st.active_player
+        result["win_reason"] = "boss_killed"
+        return result
+
     if st.phase == TurnPhase.resolution:
         # End of turn and check for economic collapse of the active player
         st.phase = TurnPhase.end
+        zh.touch(st, zh.TURN)
         if _economic_collapse_check(ap):
             result["winner"] = st.opponent_id()
             result["win_reason"] = "economic_collapse"
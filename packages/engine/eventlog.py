@@ -0,0 +1,193 @@
+"""Level-gated engine event log.
+
+The reducer reports what happened through `record(ctx, type, ...)` instead of
+building a dict per sub-event; call sites with an `extra` dict check
+`enabled(ctx, type)` first, so the dict is built only for kept events.
+What is kept depends on `Ctx.log_level`:
+
+- OFF: nothing (simulations and search that never read the log);
+- SUMMARY: one event per action (attack, defend, micro_bribe, discard, draw,
+  draw_event, use_ability);
+- FULL: every event, including sub-events (on_enter, reassign_muscles,
+  cascade_trigger, ...).
+
+Events are stored as one of two sinks:
+
+- `Ctx.log` (default): the dicts the server and tests have always read, e.g.
+  {"type": "attack", "dmg": 3};
+- `Ctx.events`, an `EventLog`: a preallocated columnar ring buffer with one
+  row per event (type code, actor, slot, amount) plus an `extra` column for
+  the few fields that do not fit (card ids, reasons). `to_dicts()` converts
+  the buffer to the dict format on demand.
+
+Each event type maps its columns to dict keys in `FIELDS`; `actor` is kept in
+the buffer even when the dict format has no key for it.
+"""
+
+from __future__ import annotations
+from array import array
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+OFF, SUMMARY, FULL = 0, 1, 2
+LEVELS = {"off": OFF, "summary": SUMMARY, "full": FULL}
+
+SUMMARY_EVENTS = frozenset({"attack", "defend", "micro_bribe", "discard", "draw", "draw_event", "use_ability"})
+
+# type -> dict keys for the (actor, slot, amount) columns; None = not shown
+FIELDS: Dict[str, Tuple[Optional[str], Optional[str], Optional[str]]] = {
+    "attack": (None, None, "dmg"),
+    "attack_skipped": (None, None, None),
+    "attack_hand": (None, None, "dmg"),
+    "attack_hand_deployed": (None, "slot", "dmg"),
+    "reassign_muscles": (None, "from", "count"),
+    "defend": (None, None, "hired"),
+    "micro_bribe": (None, "slot", None),
+    "discard": (None, "slot", None),
+    "draw": (None, None, None),
+    "draw_event": (None, None, None),
+    "shelf_recycled": (None, None, None),
+    "use_ability": (None, "slot", "cost"),
+    "cascade_trigger": (None, None, "reward"),
+    "on_enter_error": (None, None, None),
+    "event_unknown": (None, None, None),
+    "event_plus_cash": (None, None, "moved"),
+    "event_minus_raid": (None, "slot", None),
+    "effect": (None, None, None),
+}
+
+EVENT_TYPES: List[str] = list(FIELDS) + ["on_enter", "on_damage", "on_death", "turn_start", "turn_end", "ability", "event"]
+_CODES: Dict[str, int] = {t: i for i, t in enumerate(EVENT_TYPES)}
+
+_ACTORS = {"P1": 0, "P2": 1}
+_ACTOR_IDS = ("P1", "P2")
+
+
+def code_for(etype: str) -> int:
+    """Type code of an event (new types, e.g. from custom effects, are added)."""
+    code = _CODES.get(etype)
+    if code is None:
+        code = _CODES[etype] = len(EVENT_TYPES)
+        EVENT_TYPES.append(etype)
+    return code
+
+
+def to_dict(etype: str, actor: Optional[str], slot: Optional[int], amount: Optional[int],
+            extra: Optional[dict]) -> dict:
+    d: Dict[str, Any] = {"type": etype}
+    a_key, s_key, n_key = FIELDS.get(etype, (None, None, None))
+    if a_key:
+        d[a_key] = actor
+    if s_key:
+        d[s_key] = slot
+    if n_key:
+        d[n_key] = amount
+    if extra:
+        d.update(extra)
+    return d
+
+
+class EventLog:
+    """Columnar ring buffer of engine events; the oldest rows are overwritten.
+
+    `count` is the number of events ever recorded (rows below
+    `count - capacity` are gone); `mark()`/`truncate()` let `rollback` drop
+    the events of undone actions.
+    """
+
+    def __init__(self, capacity: int = 4096):
+        self.capacity = capacity
+        self.types = array("h", bytes(2 * capacity))
+        self.actors = array("b", bytes(capacity))
+        self.slots = array("b", bytes(capacity))
+        self.amounts = array("q", bytes(8 * capacity))
+        self.extra: List[Optional[dict]] = [None] * capacity
+        self.count = 0
+        self._high = 0  # highest count reached; rows below _high - capacity were overwritten
+        self._floor = 0  # rows below were dropped by a truncate past the retained window
+
+    def append(self, etype: str, actor: Optional[str] = None, slot: Optional[int] = None,
+               amount: Optional[int] = None, extra: Optional[dict] = None) -> None:
+        i = self.count % self.capacity
+        self.types[i] = code_for(etype)
+        self.actors[i] = _ACTORS.get(actor, -1)
+        self.slots[i] = -1 if slot is None else slot
+        self.amounts[i] = 0 if amount is None else amount
+        self.extra[i] = extra
+        self.count += 1
+        if self.count > self._high:
+            self._high = self.count
+
+    def __len__(self) -> int:
+        return self.count - self._first()
+
+    def _first(self) -> int:
+        return max(self._floor, self._high - self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        """Recorded events that are no longer retained."""
+        return self._first()
+
+    def mark(self) -> int:
+        return self.count
+
+    def truncate(self, mark: int) -> None:
+        """Forget every event recorded after `mark`."""
+        first = self._first()
+        for n in range(max(mark, first), self.count):
+            self.extra[n % self.capacity] = None
+        self.count = min(self.count, mark)
+        if self.count < first:
+            # Undone past what the ring still holds: nothing older is valid
+            self._floor = self._high = self.count
+
+    def clear(self) -> None:
+        self.truncate(0)
+        self._floor = self._high = 0
+
+    def rows(self) -> Iterator[Tuple[str, Optional[str], Optional[int], int, Optional[dict]]]:
+        """(type, actor, slot, amount, extra) from oldest to newest."""
+        for n in range(self._first(), self.count):
+            i = n % self.capacity
+            a = self.actors[i]
+            s = self.slots[i]
+            yield (EVENT_TYPES[self.types[i]], _ACTOR_IDS[a] if a >= 0 else None,
+                   s if s >= 0 else None, self.amounts[i], self.extra[i])
+
+    def to_dicts(self) -> List[dict]:
+        """The retained events in the `Ctx.log` dict format."""
+        return [to_dict(*row) for row in self.rows()]
+
+
+def enabled(ctx, etype: str) -> bool:
+    """Whether `record(ctx, etype, ...)` would keep the event.
+
+    Call sites with an `extra` dict check this first, so the dict is not
+    built for events that are dropped.
+    """
+    level = ctx.log_level
+    return level == FULL or (level != OFF and etype in SUMMARY_EVENTS)
+
+
+def record(ctx, etype: str, actor: Optional[str] = None, slot: Optional[int] = None,
+           amount: Optional[int] = None, extra: Optional[dict] = None) -> None:
+    """Log one event on `ctx` if its level is enabled."""
+    level = ctx.log_level
+    if level < FULL and (level == OFF or etype not in SUMMARY_EVENTS):
+        return
+    events = ctx.events
+    if events is not None:
+        events.append(etype, actor, slot, amount, extra)
+    else:
+        ctx.log.append(to_dict(etype, actor, slot, amount, extra))
+
+
+def mark(ctx) -> int:
+    return ctx.events.mark() if ctx.events is not None else len(ctx.log)
+
+
+def truncate(ctx, position: int) -> None:
+    if ctx.events is not None:
+        ctx.events.truncate(position)
+    else:
+        del ctx.log[position:]
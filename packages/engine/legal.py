@@ -0,0 +1,242 @@
+"""Legal-move generator.
+
+`legal_actions(state)` enumerates every action the active player may submit to
+`apply_action` as a flat tuple. Enumeration is split into per-kind components
+(attack, defend, influence, discard, draw); each component is cached by the
+small signature of the inputs it depends on, so between turns only the
+components whose inputs actually changed are rebuilt. Paid abilities depend
+on per-turn use counts and are listed uncached (only cards with `paid`
+abilities are looked at). States that carry a
+tracked Zobrist hash (see `zobrist.py`) additionally hit a whole-result cache
+keyed by that hash.
+
+Returned actions are shared between calls — treat them as read-only.
+"""
+
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Callable, Hashable, Tuple
+from .models import GameState, PlayerState
+from .actions import Action, Attack, Defend, Influence, DiscardCard, Draw, UseAbility
+from .engine import _card_trait, _authority_bonus, ability_uses_left
+from . import effects
+from . import zobrist as zh
+
+ActionTuple = Tuple[Action, ...]
+
+CACHE_SIZE = 4096
+
+_PASS = (Influence.model_construct(),)
+
+
+class _LRU:
+    """Tiny bounded mapping used for the per-component caches."""
+
+    def __init__(self, size: int = CACHE_SIZE):
+        self.size = size
+        self._data: "OrderedDict[Hashable, ActionTuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, build: Callable[[], ActionTuple]) -> ActionTuple:
+        data = self._data
+        try:
+            value = data[key]
+        except KeyError:
+            self.misses += 1
+            value = build()
+            data[key] = value
+            if len(data) > self.size:
+                data.popitem(last=False)
+            return value
+        self.hits += 1
+        data.move_to_end(key)
+        return value
+
+    def clear(self) -> None:
+        self._data.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+_attack_cache = _LRU()
+_defend_cache = _LRU()
+_influence_cache = _LRU()
+_discard_cache = _LRU()
+_draw_cache = _LRU()
+_state_cache = _LRU()
+
+
+def clear_cache() -> None:
+    """Drop all cached enumerations (e.g. after editing card stats in place)."""
+    for c in (_attack_cache, _defend_cache, _influence_cache, _discard_cache, _draw_cache, _state_cache):
+        c.clear()
+
+
+def cache_info() -> dict:
+    return {
+        name: {"hits": c.hits, "misses": c.misses, "size": len(c._data)}
+        for name, c in (
+            ("attack", _attack_cache),
+            ("defend", _defend_cache),
+            ("influence", _influence_cache),
+            ("discard", _discard_cache),
+            ("draw", _draw_cache),
+            ("state", _state_cache),
+        )
+    }
+
+
+# --- Component signatures -------------------------------------------------
+
+def _occupied(p: PlayerState) -> Tuple[int, ...]:
+    return tuple(i for i, s in enumerate(p.slots) if s.card is not None)
+
+
+def _attackers(p: PlayerState) -> Tuple[int, ...]:
+    return tuple(i for i, s in enumerate(p.slots) if s.card is not None and s.card.atk > 0)
+
+
+def _shielded(p: PlayerState) -> Tuple[int, ...]:
+    return tuple(i for i, s in enumerate(p.slots) if s.card is not None and s.muscles > 0)
+
+
+def _free(p: PlayerState) -> Tuple[int, ...]:
+    return tuple(i for i, s in enumerate(p.slots) if s.card is None)
+
+
+def hire_caps(p: PlayerState) -> Tuple[Tuple[int, int], ...]:
+    """(slot, max hire) for every slot that can still take muscles this turn."""
+    money = p.tokens.reserve_money
+    if money <= 0:
+        return ()
+    auth = _authority_bonus(p)
+    caps = []
+    for i, s in enumerate(p.slots):
+        if s.card is None:
+            continue
+        quota = max(0, max(0, s.card.d) + _card_trait(s.card, "extra_defense", 0) + auth)
+        room = min(quota - s.muscles, money)
+        if room > 0:
+            caps.append((i, room))
+    return tuple(caps)
+
+
+# --- Component builders ---------------------------------------------------
+
+def _build_attacks(op_id: str, attackers, targets, hand_target: bool, max_ammo: int) -> ActionTuple:
+    out = []
+    target_slots = targets if targets else ((None,) if hand_target else ())
+    for a in attackers:
+        for t in target_slots:
+            for ammo in range(max_ammo + 1):
+                out.append(Attack.model_construct(
+                    target_player=op_id, target_slot=t, ammo_spend=ammo, attacker_slot=a,
+                ))
+    return tuple(out)
+
+
+def _build_defends(caps) -> ActionTuple:
+    return tuple(
+        Defend.model_construct(target_slot=i, hire_count=n)
+        for i, cap in caps
+        for n in range(1, cap + 1)
+    )
+
+
+def _build_influence(op_id: str, shielded) -> ActionTuple:
+    return tuple(
+        Influence.model_construct(micro_bribe_target_player=op_id, micro_bribe_target_slot=i)
+        for i in shielded
+    )
+
+
+def _build_discards(occupied) -> ActionTuple:
+    return tuple(DiscardCard.model_construct(own_slot=i) for i in occupied)
+
+
+def _build_draws(hand_ok: bool, free) -> ActionTuple:
+    out = []
+    if hand_ok:
+        out.append(Draw.model_construct(place="hand"))
+    out.extend(Draw.model_construct(place="slot", slot_index=i) for i in free)
+    out.append(Draw.model_construct(place="shelf"))
+    return tuple(out)
+
+
+def _build_abilities(state: GameState, p: PlayerState) -> ActionTuple:
+    out = []
+    money = p.tokens.reserve_money
+    for i, s in enumerate(p.slots):
+        if s.card is None or not s.card.paid:
+            continue
+        for ab in s.card.paid:
+            if ab.cost <= money and ability_uses_left(state, p.id, i, ab) != 0 and effects.get(ab.effect_id):
+                out.append(UseAbility.model_construct(own_slot=i, ability_id=ab.id))
+    return tuple(out)
+
+
+# --- Public API -----------------------------------------------------------
+
+def legal_actions(state: GameState) -> ActionTuple:
+    """All actions the active player may take, as a flat tuple.
+
+    The last entry is always a bare `Influence()` (pass), so the tuple is never
+    empty and bots can always end the turn.
+    """
+    if zh.is_tracked(state):
+        cfg = state.config
+        key = (state._zhash, cfg.hand_enabled, cfg.ammo_max_bonus, cfg.micro_bribe_once_per_turn)
+        return _state_cache.get(key, lambda: _enumerate(state))
+    return _enumerate(state)
+
+
+def _enumerate(state: GameState) -> ActionTuple:
+    cfg = state.config
+    ap = state.players[state.active_player]
+    op_id = state.opponent_id()
+    op = state.players[op_id]
+    money = ap.tokens.reserve_money
+
+    # Attack: any own card with ATK > 0 against any opposing card. With an empty
+    # opposing board, the hand becomes the target (target_slot=None) if enabled.
+    attackers = _attackers(ap)
+    targets = _occupied(op)
+    hand_target = not targets and cfg.hand_enabled and bool(op.hand)
+    max_ammo = max(0, min(cfg.ammo_max_bonus, money))
+    if attackers and (targets or hand_target):
+        key = (op_id, attackers, targets, hand_target, max_ammo)
+        attacks = _attack_cache.get(key, lambda: _build_attacks(op_id, attackers, targets, hand_target, max_ammo))
+    else:
+        attacks = ()
+
+    caps = hire_caps(ap)
+    defends = _defend_cache.get(caps, lambda: _build_defends(caps)) if caps else ()
+
+    bribe_blocked = cfg.micro_bribe_once_per_turn and state.flags.get("micro_bribe_used", False)
+    if money >= 2 and not bribe_blocked:
+        shielded = _shielded(op)
+        key = (op_id, shielded)
+        influence = _influence_cache.get(key, lambda: _build_influence(op_id, shielded)) if shielded else ()
+    else:
+        influence = ()
+
+    occupied = _occupied(ap)
+    discards = _discard_cache.get(occupied, lambda: _build_discards(occupied)) if occupied else ()
+
+    draws: ActionTuple = ()
+    if state.deck or state.shelf:
+        if not cfg.hand_enabled or len(ap.hand) + len(occupied) < ap.hand_limit:
+            free = _free(ap)
+            key = (cfg.hand_enabled, free)
+            draws = _draw_cache.get(key, lambda: _build_draws(cfg.hand_enabled, free))
+
+    abilities = _build_abilities(state, ap)
+
+    return attacks + defends + influence + discards + draws + abilities + _PASS
+
+
+def is_legal(state: GameState, action: Action) -> bool:
+    """Server-side validation helper: is `action` in `legal_actions(state)`?"""
+    return action in legal_actions(state)
+
@@ -1,7 +1,11 @@
 from __future__ import annotations
+import random
 from enum import Enum
-from typing import List, Dict, Optional, Literal
-from pydantic import BaseModel, Field, root_validator
+from typing import List, Dict, Optional, Literal, Tuple
+from pydantic import BaseModel, Field, PrivateAttr, model_validator, root_validator
+
+from . import effects
+from .zones import Zone
 
 
 class CardType(str, Enum):
@@ -21,9 +25,16 @@ class Faction(str, Enum):
 class PaidAbility(BaseModel):
     id: str
     cost: int = 1
-    cooldown_per_turn: int = 1  # default: once per turn
+    cooldown_per_turn: int = 1  # default: once per turn; <= 0 — unlimited
     effect_id: str
 
+    @model_validator(mode="after")
+    def _check_bounded(self):
+        # A free ability without a cooldown could be used forever and the turn would never end
+        if self.cost <= 0 and self.cooldown_per_turn <= 0:
+            raise ValueError("a paid ability with cost <= 0 needs a positive cooldown_per_turn")
+        return self
+
 
 class Card(BaseModel):
     id: str
@@ -54,6 +65,11 @@ class Card(BaseModel):
     pair_hp: int = 0
     pair_d: int = 0
     pair_r: int = 0
+    # Trigger subscriptions parsed from abl (effects.subscribe)
+    _subs: Optional[dict] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context) -> None:
+        effects.subscribe(self)
 
     @root_validator(pre=True)
     def _migrate_inf_to_abl(cls, values):  # type: ignore[override]
@@ -93,6 +109,9 @@ class PlayerState(BaseModel):
     tokens: TokenPools = Field(default_factory=TokenPools)
     cascade_used: bool = False
     cascade_triggers: int = 0  # 0..3
+    # Paid ability uses: "slot:ability_id" -> (turn_number, uses that turn).
+    # Counts from an earlier turn are stale, so nothing is reset on turn change.
+    ability_uses: Dict[str, Tuple[int, int]] = Field(default_factory=dict)
 
     def active_cards(self) -> List[Card]:
         return [s.card for s in self.slots if s.card is not None]
@@ -115,17 +134,46 @@ class GameConfig(BaseModel):
     cascade_max_triggers: int = 3
 
 
+ZONES = ("deck", "shelf", "discard_out_of_game")
+
+
 class GameState(BaseModel):
     seed: int = 0
     config: GameConfig = Field(default_factory=GameConfig)
-    deck: List[Card] = Field(default_factory=list)  # кладовая (закрытая)
-    shelf: List[Card] = Field(default_factory=list)  # полка (открытая)
-    discard_out_of_game: List[Card] = Field(default_factory=list)
+    deck: Zone = Field(default_factory=Zone)  # кладовая (закрытая)
+    shelf: Zone = Field(default_factory=Zone)  # полка (открытая)
+    discard_out_of_game: Zone = Field(default_factory=Zone)
     players: Dict[str, PlayerState] = Field(default_factory=dict)
     active_player: Literal["P1", "P2"] = "P1"
     phase: TurnPhase = TurnPhase.upkeep
     turn_number: int = 1
     flags: Dict[str, bool] = Field(default_factory=dict)  # временные ограничения/эффекты
+    # Incremental Zobrist hash (see zobrist.py); None until first requested
+    _zhash: Optional[int] = PrivateAttr(default=None)
+    _zparts: Dict[tuple, int] = PrivateAttr(default_factory=dict)
+    # Copy-on-write card ownership after fork(): id -> Card this state may mutate
+    # in place. None means the state owns every card it references.
+    _owned: Optional[Dict[int, Card]] = PrivateAttr(default=None)
+    # Game-local RNG for shuffles, seeded from `seed` on first use
+    _rng: Optional[random.Random] = PrivateAttr(default=None)
+
+    def model_post_init(self, __context) -> None:
+        # model_construct() skips validation: wrap zones passed as plain lists
+        for name in ZONES:
+            value = self.__dict__.get(name)
+            if not isinstance(value, Zone):
+                self.__dict__[name] = Zone(value or ())
+
+    def __setattr__(self, name, value):
+        if name in ZONES and not isinstance(value, Zone):
+            value = Zone(value)
+        super().__setattr__(name, value)
+
+    def rng(self) -> random.Random:
+        """This game's RNG (deck and shelf shuffles); independent of the global one."""
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        return self._rng
 
     def opponent_id(self) -> str:
         return "P2" if self.active_player == "P1" else "P1"
@@ -135,3 +183,63 @@ class GameState(BaseModel):
 
     def get_slot(self, pid: str, idx: int) -> Slot:
         return self.players[pid].slots[idx]
+
+    def state_hash(self) -> int:
+        """64-bit Zobrist hash, maintained incrementally by the reducer."""
+        from .zobrist import state_hash
+        return state_hash(self)
+
+    def own_card(self, card: Card) -> Card:
+        """Copy-on-write: return a version of `card` safe to mutate in place.
+
+        Cards are shared between a state and its forks; the first in-place
+        mutation on either side copies the card. Callers must store the
+        returned card back where they found it.
+        """
+        owned = self._owned
+        if owned is None or owned.get(id(card)) is card:
+            return card
+        mine = card.model_copy()
+        owned[id(mine)] = mine
+        return mine
+
+    def fork(self) -> "GameState":
+        """Cheap structural copy for search and what-if previews.
+
+        Slots, hands, token pools and zones are copied shallowly; Card
+        objects and the config are shared and copied lazily by `own_card()`
+        when a side first damages or heals them.
+        """
+        players = {}
+        for pid, p in self.players.items():
+            q = p.model_copy()
+            q.hand = list(p.hand)
+            q.slots = [s.model_copy() for s in p.slots]
+            q.tokens = p.tokens.model_copy()
+            q.ability_uses = dict(p.ability_uses)
+            players[pid] = q
+        child = self.model_copy()
+        child.players = players
+        child.deck = self.deck.copy()
+        child.shelf = self.shelf.copy()
+        child.discard_out_of_game = self.discard_out_of_game.copy()
+        child.flags = dict(self.flags)
+        child._zparts = dict(self._zparts)
+        if self._rng is not None:
+            child._rng = random.Random()
+            child._rng.setstate(self._rng.getstate())
+        # Every card is now shared: both sides copy before their next write
+        self._owned = {}
+        child._owned = {}
+        return child
+
+    def restore(self, snapshot: "GameState") -> None:
+        """Roll this state back in place to a snapshot taken with `fork()`.
+
+        The snapshot is consumed: it shares structure with this state afterwards.
+        """
+        self.__dict__.update(snapshot.__dict__)
+        self._zhash = snapshot._zhash
+        self._zparts = snapshot._zparts
+        self._rng = snapshot._rng
+        self._owned = {}
@@ -0,0 +1,139 @@
+"""Reducers specialized for one GameConfig.
+
+The generic reducer reads `st.config.<rule>` (hand_enabled, cascade_enabled,
+micro_bribe_once_per_turn, ...) on every call although a simulation sweep
+plays millions of actions under a single ruleset. `specialize(config)`
+returns an `apply_action` compiled for that config:
+
+1. the reducer module's functions are parsed from source;
+2. every `<state>.config.<field>` read becomes the literal value;
+3. branches whose test became constant are removed (`if False: ...`,
+   `if not True: return`, leading constants in `and`/`or`);
+4. the functions are compiled into a private copy of the module namespace,
+   so specialized helpers call each other and not the generic ones.
+
+Everything else — models, effects, logging, Zobrist — is shared with the
+generic reducer, and the result of every action is identical to
+`engine.apply_action` on a state with the same config. Calling the
+specialized reducer on a state with a different config — including the
+same config object edited after specialization — raises ValueError.
+
+Compiled reducers are cached per config.
+"""
+
+from __future__ import annotations
+import __future__
+import ast
+import inspect
+from typing import Any, Callable, Dict, Tuple
+
+from . import engine as _engine
+from .models import GameConfig
+
+Reducer = Callable[..., Dict]
+
+_cache: Dict[Tuple, Reducer] = {}
+_MAX_CACHED = 16
+
+
+def _config_key(config: GameConfig) -> Tuple:
+    return tuple(sorted(config.model_dump().items()))
+
+
+class _Inline(ast.NodeTransformer):
+    """`<expr>.config.<field>` -> literal value of that field."""
+
+    def __init__(self, values: Dict[str, Any]):
+        self.values = values
+
+    def visit_Attribute(self, node: ast.Attribute):
+        if (isinstance(node.ctx, ast.Load) and node.attr in self.values
+                and isinstance(node.value, ast.Attribute) and node.value.attr == "config"):
+            return ast.copy_location(ast.Constant(self.values[node.attr]), node)
+        return self.generic_visit(node)
+
+
+def _const(node) -> Tuple[bool, Any]:
+    return (True, node.value) if isinstance(node, ast.Constant) else (False, None)
+
+
+class _Fold(ast.NodeTransformer):
+    """Drop branches decided by constants."""
+
+    def visit_UnaryOp(self, node: ast.UnaryOp):
+        self.generic_visit(node)
+        known, value = _const(node.operand)
+        if known and isinstance(node.op, ast.Not):
+            return ast.copy_location(ast.Constant(not value), node)
+        return node
+
+    def visit_BoolOp(self, node: ast.BoolOp):
+        self.generic_visit(node)
+        values = list(node.values)
+        is_and = isinstance(node.op, ast.And)
+        # Only leading constants fold without changing the value of the expression
+        while len(values) > 1:
+            known, value = _const(values[0])
+            if not known:
+                break
+            if bool(value) != is_and:
+                return values[0]  # short-circuits: `False and x`, `True or x`
+            values.pop(0)
+        if len(values) == 1:
+            return values[0]
+        node.values = values
+        return node
+
+    def visit_If(self, node: ast.If):
+        self.generic_visit(node)
+        known, value = _const(node.test)
+        if not known:
+            return node
+        kept = node.body if value else node.orelse
+        return kept or ast.copy_location(ast.Pass(), node)
+
+    def visit_IfExp(self, node: ast.IfExp):
+        self.generic_visit(node)
+        known, value = _const(node.test)
+        if not known:
+            return node
+        return node.body if value else node.orelse
+
+
+def _compile(config: GameConfig) -> Dict[str, Any]:
+    module = ast.parse(inspect.getsource(_engine))
+    funcs = [n for n in module.body if isinstance(n, ast.FunctionDef)]
+    values = {k: v for k, v in config.model_dump().items() if isinstance(v, (bool, int, float, str, type(None)))}
+    tree = ast.Module(body=funcs, type_ignores=[])
+    tree = _Fold().visit(_Inline(values).visit(tree))
+    ast.fix_missing_locations(tree)
+    namespace = dict(vars(_engine))
+    code = compile(tree, f"<specialized {_engine.__name__}>", "exec",
+                   flags=__future__.annotations.compiler_flag, dont_inherit=True)
+    exec(code, namespace)
+    return namespace
+
+
+def specialize(config: GameConfig) -> Reducer:
+    """`apply_action(ctx, action, record_undo=False)` compiled for `config`."""
+    key = _config_key(config)
+    reducer = _cache.get(key)
+    if reducer is not None:
+        return reducer
+    # A private copy: the caller's config object may be edited in place later
+    config = config.model_copy(deep=True)
+    namespace = _compile(config)
+    specialized = namespace["apply_action"]
+
+    def apply_action(ctx, action, record_undo: bool = False) -> Dict:
+        if ctx.state.config != config:
+            raise ValueError("state config differs from the config this reducer was specialized for")
+        return specialized(ctx, action, record_undo)
+
+    apply_action.config = config
+    apply_action.namespace = namespace
+    apply_action.__doc__ = specialize.__doc__
+    if len(_cache) >= _MAX_CACHED:
+        _cache.pop(next(iter(_cache)))
+    _cache[key] = apply_action
+    return apply_action
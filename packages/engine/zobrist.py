@@ -0,0 +1,175 @@
+"""Zobrist-style 64-bit hashing of GameState.
+
+The state is split into parts — one per board slot, one per hand, one per
+token pool, one per shared zone and one for turn bookkeeping. Each part maps
+to a pseudo-random 64-bit key and the state hash is the XOR of all part keys.
+When the reducer mutates a part it calls `touch(state, part)`, which XORs the
+old key out and the new key in, so keeping the hash current costs O(parts
+touched) instead of a full `model_dump()`.
+
+Keys are derived from a digest of the part's features rather than from a
+seeded RNG, so hashes are stable across processes and runs (replay dedup,
+shared transposition tables).
+
+Hashing is lazy: nothing is tracked until `state_hash(state)` is first called.
+Code that mutates a hashed state outside `apply_action`/`next_turn` (server
+handlers, tests) must call `touch()` for the parts it changed or `invalidate()`.
+"""
+
+from __future__ import annotations
+import hashlib
+from typing import Dict, Hashable, Tuple
+from .models import GameState
+
+Part = Tuple
+
+DECK: Part = ("deck",)
+SHELF: Part = ("shelf",)
+DISCARD: Part = ("discard",)
+TURN: Part = ("turn",)
+
+_keys: Dict[Hashable, int] = {}
+# Zone features (whole deck orders) are open-ended; keep the memo bounded
+_MAX_KEYS = 1 << 18
+
+
+def zkey(feature: Hashable) -> int:
+    """Stable pseudo-random 64-bit key for a feature tuple (memoized)."""
+    k = _keys.get(feature)
+    if k is None:
+        if len(_keys) >= _MAX_KEYS:
+            _keys.clear()
+        digest = hashlib.blake2b(repr(feature).encode("utf-8"), digest_size=8).digest()
+        k = _keys[feature] = int.from_bytes(digest, "little")
+    return k
+
+
+def slot_part(pid: str, idx: int) -> Part:
+    return ("slot", pid, idx)
+
+
+def hand_part(pid: str) -> Part:
+    return ("hand", pid)
+
+
+def tokens_part(pid: str) -> Part:
+    return ("tokens", pid)
+
+
+def _card_feature(c) -> tuple:
+    return (c.id, c.hp, c.atk, c.d)
+
+
+def _zone_feature(cards) -> tuple:
+    return tuple(c.id for c in cards)
+
+
+def _part_key(st: GameState, part: Part) -> int:
+    kind = part[0]
+    if kind == "slot":
+        _, pid, idx = part
+        slots = st.players[pid].slots
+        if idx >= len(slots):
+            return 0
+        s = slots[idx]
+        if s.card is None:
+            return zkey((kind, pid, idx, None, s.muscles))
+        return zkey((kind, pid, idx, _card_feature(s.card), s.face_up, s.muscles))
+    if kind == "hand":
+        pid = part[1]
+        p = st.players[pid]
+        return zkey((kind, pid, p.hand_limit, tuple(_card_feature(c) for c in p.hand)))
+    if kind == "tokens":
+        pid = part[1]
+        p = st.players[pid]
+        feature = (kind, pid, p.tokens.reserve_money, p.tokens.otboy, p.cascade_used, p.cascade_triggers)
+        if p.ability_uses:
+            feature += (tuple(sorted(p.ability_uses.items())),)
+        return zkey(feature)
+    if kind == "deck":
+        return zkey((kind, _zone_feature(st.deck)))
+    if kind == "shelf":
+        return zkey((kind, _zone_feature(st.shelf)))
+    if kind == "discard":
+        return zkey((kind, _zone_feature(st.discard_out_of_game)))
+    if kind == "turn":
+        phase = st.phase.value if hasattr(st.phase, "value") else str(st.phase)
+        return zkey((kind, st.active_player, st.turn_number, phase, bool(st.flags.get("micro_bribe_used", False))))
+    raise ValueError(f"Unknown hash part: {part!r}")
+
+
+def all_parts(st: GameState):
+    for pid, p in st.players.items():
+        for i in range(len(p.slots)):
+            yield slot_part(pid, i)
+        yield hand_part(pid)
+        yield tokens_part(pid)
+    yield DECK
+    yield SHELF
+    yield DISCARD
+    yield TURN
+
+
+def full_hash(st: GameState) -> int:
+    """Hash computed from scratch (does not touch the cached value)."""
+    h = 0
+    for part in all_parts(st):
+        h ^= _part_key(st, part)
+    return h
+
+
+def rehash(st: GameState) -> int:
+    """(Re)compute the hash from scratch and start tracking it on the state."""
+    parts: Dict[Part, int] = {}
+    h = 0
+    for part in all_parts(st):
+        k = _part_key(st, part)
+        parts[part] = k
+        h ^= k
+    st._zparts = parts
+    st._zhash = h
+    return h
+
+
+def state_hash(st: GameState) -> int:
+    """Current 64-bit hash of the state; starts incremental tracking on first use."""
+    h = st._zhash
+    if h is None:
+        return rehash(st)
+    return h
+
+
+def is_tracked(st: GameState) -> bool:
+    return st._zhash is not None
+
+
+def touch(st: GameState, *parts: Part) -> None:
+    """Refresh the keys of the given parts after they were mutated.
+
+    No-op for states whose hash was never requested.
+    """
+    h = st._zhash
+    if h is None:
+        return
+    cache = st._zparts
+    for part in parts:
+        new = _part_key(st, part)
+        old = cache.get(part, 0)
+        if new != old:
+            h ^= old ^ new
+            cache[part] = new
+    st._zhash = h
+
+
+def touch_player(st: GameState, pid: str) -> None:
+    """Refresh every part owned by a player (all slots, hand, tokens)."""
+    if st._zhash is None:
+        return
+    n = len(st.players[pid].slots)
+    touch(st, *(slot_part(pid, i) for i in range(n)), hand_part(pid), tokens_part(pid))
+
+
+def invalidate(st: GameState) -> None:
+    """Forget the tracked hash; the next `state_hash()` recomputes it."""
+    st._zhash = None
+    st._zparts = {}
@@ -0,0 +1,318 @@
+"""Indexed card zones (deck, shelf, discard).
+
+`Zone` replaces the plain lists behind `GameState.deck`, `shelf` and
+`discard_out_of_game`. It behaves like a list of cards for existing callers
+(len, iteration, indexing, append/extend/pop/insert/clear, comparison with
+lists, pydantic validation and serialization as a list) and adds:
+
+- O(1) amortized draw from either end (deque-backed);
+- secondary indexes by card id, type and clan, so lookups like "the first boss
+  in the deck" touch only matching cards;
+- O(1) targeted removal of an indexed card (`remove`, `take`);
+- `shuffle(rng)` in place with a caller-supplied (game-local) RNG;
+- `take_all(other)`, which moves a whole zone by swapping storage when the
+  destination is empty (shelf recycling).
+
+Removal in the middle leaves a tombstone in the deque that is skipped when it
+reaches an end; the deque is compacted once tombstones outnumber live cards.
+Index lookups return cards in zone order.
+"""
+
+from __future__ import annotations
+from collections import deque
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+
+class _Entry:
+    __slots__ = ("card", "pos", "alive")
+
+    def __init__(self, card, pos: int):
+        self.card = card
+        self.pos = pos  # monotone zone order key (left < right)
+        self.alive = True
+
+
+def _type_key(card) -> str:
+    t = getattr(card, "type", None)
+    return str(getattr(t, "value", t) or "")
+
+
+def _clan_key(card) -> str:
+    return (getattr(card, "clan", None) or getattr(card, "caste", None) or "").lower()
+
+
+class Zone:
+    """Ordered, indexed collection of cards; index 0 is the top (next draw)."""
+
+    __slots__ = ("_q", "_n", "_lo", "_hi", "_by_id", "_by_type", "_by_clan")
+
+    def __init__(self, cards: Iterable[Any] = ()):
+        self._reset()
+        self.extend(cards)
+
+    def _reset(self) -> None:
+        self._q: deque = deque()
+        self._n = 0
+        self._lo = 0
+        self._hi = 0
+        self._by_id: Dict[str, Dict[_Entry, None]] = {}
+        self._by_type: Dict[str, Dict[_Entry, None]] = {}
+        self._by_clan: Dict[str, Dict[_Entry, None]] = {}
+
+    # --- pydantic integration -------------------------------------------------
+
+    @classmethod
+    def __get_pydantic_core_schema__(cls, source, handler):
+        from pydantic_core import core_schema
+        from .models import Card
+
+        items = core_schema.list_schema(handler.generate_schema(Card))
+        from_list = core_schema.no_info_after_validator_function(cls, items)
+        return core_schema.json_or_python_schema(
+            json_schema=from_list,
+            python_schema=core_schema.union_schema([core_schema.is_instance_schema(cls), from_list]),
+            serialization=core_schema.plain_serializer_function_ser_schema(list, return_schema=items),
+        )
+
+    # --- index maintenance ----------------------------------------------------
+
+    def _index(self, e: _Entry) -> None:
+        c = e.card
+        self._by_id.setdefault(getattr(c, "id", None), {})[e] = None
+        self._by_type.setdefault(_type_key(c), {})[e] = None
+        self._by_clan.setdefault(_clan_key(c), {})[e] = None
+
+    def _unindex(self, e: _Entry) -> None:
+        c = e.card
+        for idx, key in ((self._by_id, getattr(c, "id", None)), (self._by_type, _type_key(c)), (self._by_clan, _clan_key(c))):
+            bucket = idx.get(key)
+            if bucket is not None:
+                bucket.pop(e, None)
+                if not bucket:
+                    del idx[key]
+
+    def _kill(self, e: _Entry) -> Any:
+        e.alive = False
+        self._n -= 1
+        self._unindex(e)
+        if self._n == 0:
+            self._q.clear()
+        elif len(self._q) > 2 * self._n + 16:
+            self._q = deque(x for x in self._q if x.alive)
+        return e.card
+
+    def _entries(self) -> Iterator[_Entry]:
+        return (e for e in self._q if e.alive)
+
+    def _rebuild(self, cards: List[Any]) -> None:
+        self._reset()
+        self.extend(cards)
+
+    # --- list protocol ----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __bool__(self) -> bool:
+        return self._n > 0
+
+    def __iter__(self) -> Iterator[Any]:
+        return (e.card for e in self._q if e.alive)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list(self)[i]
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("zone index out of range")
+        if len(self._q) == self._n:
+            return self._q[i].card
+        return next(islice(iter(self), i, None))
+
+    def __setitem__(self, i, value) -> None:
+        cards = list(self)
+        cards[i] = value
+        self._rebuild(cards)
+
+    def __delitem__(self, i) -> None:
+        if isinstance(i, slice):
+            cards = list(self)
+            del cards[i]
+            self._rebuild(cards)
+        else:
+            self.pop(i)
+
+    def __contains__(self, card) -> bool:
+        return any(c == card for c in self._cards_by_id(getattr(card, "id", None)))
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (Zone, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __add__(self, other) -> List[Any]:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> List[Any]:
+        return list(other) + list(self)
+
+    def __repr__(self) -> str:
+        return f"Zone({list(self)!r})"
+
+    def copy(self) -> "Zone":
+        return Zone(self)
+
+    def append(self, card) -> None:
+        e = _Entry(card, self._hi)
+        self._hi += 1
+        if self._n == 0:
+            self._lo = e.pos
+        self._q.append(e)
+        self._n += 1
+        self._index(e)
+
+    def appendleft(self, card) -> None:
+        if self._n == 0:
+            self.append(card)
+            return
+        self._lo -= 1
+        e = _Entry(card, self._lo)
+        self._q.appendleft(e)
+        self._n += 1
+        self._index(e)
+
+    def extend(self, cards: Iterable[Any]) -> None:
+        for card in cards:
+            self.append(card)
+
+    def insert(self, i: int, card) -> None:
+        if i <= 0:
+            self.appendleft(card)
+        elif i >= self._n:
+            self.append(card)
+        else:
+            cards = list(self)
+            cards.insert(i, card)
+            self._rebuild(cards)
+
+    def pop(self, i: int = -1) -> Any:
+        if self._n == 0:
+            raise IndexError("pop from empty zone")
+        q = self._q
+        if i == 0 or i == -self._n:
+            while not q[0].alive:
+                q.popleft()
+            return self._kill(q.popleft())
+        if i == -1 or i == self._n - 1:
+            while not q[-1].alive:
+                q.pop()
+            return self._kill(q.pop())
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError("pop index out of range")
+        return self._kill(next(islice(self._entries(), i, None)))
+
+    def draw(self) -> Any:
+        """Take the top card (index 0)."""
+        return self.pop(0)
+
+    def clear(self) -> None:
+        self._reset()
+
+    def remove(self, card) -> None:
+        """Remove the first occurrence of `card` (by identity, then equality)."""
+        bucket = self._by_id.get(getattr(card, "id", None), {})
+        for match in (lambda e: e.card is card, lambda e: e.card == card):
+            found = [e for e in bucket if match(e)]
+            if found:
+                self._kill(min(found, key=lambda e: e.pos))
+                return
+        raise ValueError("card not in zone")
+
+    # --- indexed lookups --------------------------------------------------------
+
+    def _cards_by_id(self, card_id) -> List[Any]:
+        return [e.card for e in sorted(self._by_id.get(card_id, ()), key=lambda e: e.pos)]
+
+    def by_id(self, card_id: str) -> List[Any]:
+        return self._cards_by_id(card_id)
+
+    def of_type(self, card_type: str) -> List[Any]:
+        return [e.card for e in sorted(self._by_type.get(str(getattr(card_type, "value", card_type)), ()), key=lambda e: e.pos)]
+
+    def of_clan(self, clan: str) -> List[Any]:
+        return [e.card for e in sorted(self._by_clan.get((clan or "").lower(), ()), key=lambda e: e.pos)]
+
+    def count(self, card_id: Optional[str] = None, card_type: Optional[str] = None,
+              clan: Optional[str] = None) -> int:
+        """Number of cards matching every given key (O(1) for a single key)."""
+        buckets = self._buckets(card_id, card_type, clan)
+        if buckets is None:
+            return self._n
+        if len(buckets) == 1:
+            return len(buckets[0])
+        smallest = min(buckets, key=len)
+        return sum(1 for e in smallest if all(e in b for b in buckets))
+
+    def _buckets(self, card_id, card_type, clan):
+        keys = []
+        if card_id is not None:
+            keys.append(self._by_id.get(card_id, {}))
+        if card_type is not None:
+            keys.append(self._by_type.get(str(getattr(card_type, "value", card_type)), {}))
+        if clan is not None:
+            keys.append(self._by_clan.get(clan.lower(), {}))
+        return keys or None
+
+    def take(self, card_id: Optional[str] = None, card_type: Optional[str] = None,
+             clan: Optional[str] = None, predicate: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """Remove and return the first card (zone order) matching all filters, or None.
+
+        Index keys narrow the candidates; `predicate` is then tested on those
+        only (or on the whole zone when no key is given).
+        """
+        buckets = self._buckets(card_id, card_type, clan)
+        if buckets is None:
+            candidates = self._entries()
+        else:
+            smallest = min(buckets, key=len)
+            candidates = sorted((e for e in smallest if all(e in b for b in buckets)), key=lambda e: e.pos)
+        for e in candidates:
+            if predicate is None or predicate(e.card):
+                return self._kill(e)
+        return None
+
+    # --- bulk operations ----------------------------------------------------------
+
+    def shuffle(self, rng) -> None:
+        """Shuffle in place with `rng` (e.g. the game's own `random.Random`)."""
+        entries = [e for e in self._q if e.alive]
+        rng.shuffle(entries)
+        for pos, e in enumerate(entries):
+            e.pos = pos
+        self._q = deque(entries)
+        self._lo, self._hi = 0, len(entries)
+
+    def take_all(self, other: "Zone") -> None:
+        """Move every card of `other` to the bottom of this zone, emptying `other`.
+
+        When this zone is empty the storage is swapped instead of copied.
+        """
+        if other is self:
+            return
+        if self._n == 0 and isinstance(other, Zone):
+            for name in Zone.__slots__:
+                a, b = getattr(self, name), getattr(other, name)
+                setattr(self, name, b)
+                setattr(other, name, a)
+            other.clear()
+            return
+        self.extend(other)
+        other.clear()
+
+
+def as_zone(cards: Iterable[Any]) -> Zone:
+    return cards if isinstance(cards, Zone) else Zone(cards)
@@ -4,16 +4,22 @@ from pathlib import Path
 import time
 import random
 import csv
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import socketio
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
+# Корень проекта — для packages.simulator (политики ботов)
+sys.path.append(str(Path(__file__).resolve().parents[2]))
 
 from engine.loader import load_game, load_yaml_config, build_state_from_config, load_cards_from_csv
-from engine.models import GameState, PlayerState, Slot, Card
-from engine.engine import initialize_game
+from engine.models import GameState, PlayerState, Slot, Card, TurnPhase
+from engine.engine import initialize_game, apply_action, Ctx
+from engine.actions import Attack, Defend, Influence, DiscardCard, Draw, UseAbility
+from packages.simulator.bots import POLICIES, choose_action_payload
 
 # Socket.IO сервер (ASGI)
 sio = socketio.AsyncServer(async_mode="asgi", cors_allowed_origins="*")
@@ -33,6 +39,14 @@ INIT_VISIBLE_SLOTS = 6
 rooms: Dict[str, dict] = {}
 sid_index: Dict[str, Dict[str, str]] = {}
 
+# Боты: думают в пуле процессов, чтобы не блокировать event loop
+BOT_THINK_TIME = 0.5  # бюджет поиска, который получает политика (сек)
+BOT_TIMEOUT = 2.0  # жёсткий предел ожидания ответа от пула (сек)
+BOT_WORKERS = 2
+_bot_pool: Optional[ProcessPoolExecutor] = None
+
+_ACTIONS = {cls.model_fields["kind"].default: cls for cls in (Attack, Defend, Influence, DiscardCard, Draw, UseAbility)}
+
 
 def _new_slots(n: int) -> List[Slot]:
     return [Slot() for _ in range(n)]
@@ -93,10 +107,8 @@ def _ensure_bosses_in_hands(st: GameState) -> None:
     have = {pid: any(_is_boss_card(c) for c in st.players[pid].hand) for pid in ("P1", "P2")}
 
     def take_from_deck(predicate) -> Optional[Card]:
-        for i, c in enumerate(st.deck):
-            if predicate(c):
-                return st.deck.pop(i)
-        return None
+        # Сначала по индексу типа (только боссы), затем эвристика по тексту
+        return st.deck.take(card_type="boss", predicate=predicate) or st.deck.take(predicate=predicate)
 
     # Сначала пытаемся взять по владельцу
     for pid in ("P1", "P2"):
@@ -137,13 +149,12 @@ def _build_state_from_csv() -> Tuple[GameState, dict]:
     # Some loaders may prefill a visible shelf; merge it back into the deck for start state.
     if getattr(st, "shelf", None):
         if len(st.shelf) > 0:
-            st.deck.extend(st.shelf)
-            st.shelf.clear()
+            st.deck.take_all(st.shelf)
     
     # Initialize game state
     _ensure_slots(st, MAX_SLOTS)
     _place_starters(st, cfg)
-    random.shuffle(st.deck)
+    st.deck.shuffle(random)
     _ensure_bosses_in_hands(st)
     initialize_game(st)
     return st, cfg
@@ -246,6 +257,110 @@ def _log(room_id: str, kind: str, msg: str, actor: Optional[str] = None) -> None
     r["log"].append(entry)
 
 
+def _get_bot_pool() -> ProcessPoolExecutor:
+    global _bot_pool
+    if _bot_pool is None:
+        _bot_pool = ProcessPoolExecutor(max_workers=BOT_WORKERS)
+    return _bot_pool
+
+
+def _is_bot(r: dict, pid: Optional[str]) -> bool:
+    return pid in (r.get("bots") or {})
+
+
+def _free_seat(r: dict) -> Optional[str]:
+    for pid in ("P1", "P2"):
+        if r["seats"].get(pid) is None and not _is_bot(r, pid):
+            return pid
+    return None
+
+
+def _switch_turn(st: GameState) -> str:
+    """Передать ход сопернику и сбросить фазу; возвращает игрока, завершившего ход."""
+    prev = st.active_player
+    st.active_player = "P2" if st.active_player == "P1" else "P1"
+    st.turn_number += 1
+    # Сброс фазы к началу хода
+    st.phase = TurnPhase.upkeep
+    return prev
+
+
+def _action_from_payload(data: dict):
+    cls = _ACTIONS.get((data or {}).get("kind"))
+    if cls is None:
+        raise ValueError(f"Unknown action kind: {data!r}")
+    return cls.model_validate(data)
+
+
+async def _bot_decide(room_id: str, pid: str) -> Optional[dict]:
+    """Выбор хода бота в пуле процессов. None — таймаут или ошибка (бот пасует)."""
+    r = rooms.get(room_id)
+    if not r:
+        return None
+    st: GameState = r["state"]
+    loop = asyncio.get_running_loop()
+    fut = loop.run_in_executor(
+        _get_bot_pool(), choose_action_payload,
+        r["bots"][pid], st.model_dump(mode="json"), BOT_THINK_TIME, random.getrandbits(32),
+    )
+    try:
+        return await asyncio.wait_for(fut, timeout=BOT_TIMEOUT)
+    except Exception:
+        return None
+
+
+async def _bot_take_turn(room_id: str) -> None:
+    r = rooms.get(room_id)
+    if not r:
+        return
+    st: GameState = r["state"]
+    pid = st.active_player
+    if not _is_bot(r, pid):
+        return
+    turn = st.turn_number
+    payload = await _bot_decide(room_id, pid)
+    # Пока бот думал, комнату могли сбросить или ход мог смениться
+    r = rooms.get(room_id)
+    if not r or r["state"] is not st or st.turn_number != turn or st.active_player != pid:
+        return
+    res = None
+    if payload is not None:
+        try:
+            action = _action_from_payload(payload)
+            res = apply_action(Ctx.model_construct(state=st, log=[], undo=[]), action)
+        except Exception:
+            res = None
+    if res is None or "error" in res:
+        _log(room_id, "bot", f"{pid} (bot) passed", actor=pid)
+    else:
+        _log(room_id, "bot", f"{pid} (bot) played {payload.get('kind')}", actor=pid)
+    keeps_turn = False
+    if res and "winner" in res:
+        _log(room_id, "game_over", f"{res['winner']} wins ({res.get('win_reason', '')})")
+    elif res and "error" not in res and st.active_player == pid and st.phase == TurnPhase.main:
+        # Платная способность оставляет ход за ботом — он выбирает ещё одно действие
+        keeps_turn = True
+    elif st.active_player == pid:
+        # Ход не завершился движком (пас, ошибка или таймаут) — завершаем сами
+        _switch_turn(st)
+        _log(room_id, "end_turn", f"{pid} ended turn. Now {st.active_player}'s turn · Turn {st.turn_number}")
+    await _emit_views(room_id)
+    if keeps_turn:
+        r["bot_task"] = None
+        _schedule_bot(room_id)
+
+
+def _schedule_bot(room_id: str) -> None:
+    """Запустить ход бота в фоне, если сейчас ходит бот."""
+    r = rooms.get(room_id)
+    if not r or not _is_bot(r, r["state"].active_player):
+        return
+    task = r.get("bot_task")
+    if task is not None and not task.done():
+        return
+    r["bot_task"] = asyncio.create_task(_bot_take_turn(room_id))
+
+
 async def _emit_views(room_id: str) -> None:
     r = rooms.get(room_id)
     if not r:
@@ -286,6 +401,9 @@ async def connect(sid, environ):
 
 @sio.event
 async def join_room(sid, data):
+    """Client sends: { room: str, bot?: "random" | "greedy" | "mcts" }
+    With `bot`, the seat opposite the joining player is taken by a server-side bot.
+    """
     room = data.get("room", "demo")
     # Always use CSV as the single source of truth for card data
     # Подключаемся к комнате
@@ -301,6 +419,7 @@ async def join_room(sid, data):
             "visible_slots": {"P1": INIT_VISIBLE_SLOTS, "P2": INIT_VISIBLE_SLOTS},
             "source": "csv",
             "log": [],
+            "bots": {},
         }
         # Debug: log and print Reserve/Draw sizes after CSV load
         try:
@@ -313,20 +432,24 @@ async def join_room(sid, data):
 
     r = rooms[room]
     # Назначение места
-    seat: Optional[str] = None
-    if r["seats"].get("P1") is None:
-        seat = "P1"
-    elif r["seats"].get("P2") is None:
-        seat = "P2"
-    else:
+    seat = _free_seat(r)
+    if seat is None:
         await sio.emit("room_full", {"room": room}, to=sid)
         return
 
     r["seats"][seat] = sid
     sid_index[sid] = {"room": room, "pid": seat}
     _log(room, "join", f"{seat} joined", actor=seat)
+    # Бот занимает место напротив, если оно свободно
+    policy = data.get("bot")
+    if policy in POLICIES:
+        op = "P2" if seat == "P1" else "P1"
+        if r["seats"].get(op) is None and not _is_bot(r, op):
+            r.setdefault("bots", {})[op] = policy
+            _log(room, "join", f"{op} joined (bot: {policy})", actor=op)
     await sio.emit("joined", {"room": room, "seat": seat, "source": r.get("source", "yaml"), "visibleSlots": r["visible_slots"][seat]}, to=sid)
     await _emit_views(room)
+    _schedule_bot(room)
 
 
 @sio.event
@@ -599,6 +722,11 @@ async def attack_propose(sid, data):
         return
     atk["status"] = "proposed"
     _log(room, "attack", f"{pid} proposed destruction: shields={atk.get('plan', {}).get('removeShields', 0)}, card={atk.get('plan', {}).get('destroyCard', False)}", actor=pid)
+    tpid = (atk.get("target") or {}).get("pid")
+    if _is_bot(r, tpid):
+        # Бот всегда принимает предложенный план
+        await _accept_attack(room, tpid)
+        return
     await _emit_views(room)
 
 
@@ -608,8 +736,10 @@ async def attack_accept(sid, data):
     info = sid_index.get(sid)
     if not info:
         return
-    room = info["room"]
-    pid = info["pid"]
+    await _accept_attack(info["room"], info["pid"])
+
+
+async def _accept_attack(room: str, pid: str) -> None:
     r = rooms.get(room)
     if not r or not r.get("attack"):
         return
@@ -721,13 +851,12 @@ async def draw(sid, data):
     if not st.deck:
         # Перетасовать полку в колоду, если есть
         if st.shelf:
-            random.shuffle(st.shelf)
-            st.deck.extend(st.shelf)
-            st.shelf.clear()
+            st.shelf.shuffle(random)
+            st.deck.take_all(st.shelf)
     if not st.deck:
         await sio.emit("error", {"msg": "deck_empty"}, to=sid)
         return
-    card = st.deck.pop(0)
+    card = st.deck.draw()
     st.players[pid].hand.append(card)
     _log(room, "draw", f"{pid} drew a card", actor=pid)
     await _emit_views(room)
@@ -888,17 +1017,10 @@ async def end_turn(sid, data):
     if pid != st.active_player:
         await sio.emit("error", {"msg": "not_your_turn"}, to=sid)
         return
-    prev = st.active_player
-    st.active_player = "P2" if st.active_player == "P1" else "P1"
-    st.turn_number += 1
-    # Сброс фазы к началу хода
-    try:
-        from packages.engine.models import TurnPhase
-        st.phase = TurnPhase.upkeep
-    except Exception:
-        pass
+    prev = _switch_turn(st)
     _log(room, "end_turn", f"{prev} ended turn. Now {st.active_player}'s turn · Turn {st.turn_number}")
     await _emit_views(room)
+    _schedule_bot(room)
 
 
 @sio.event
@@ -978,7 +1100,7 @@ async def shuffle_deck(sid, data):
     st: GameState = rooms.get(room, {}).get("state")
     if not st:
         return
-    random.shuffle(st.deck)
+    st.deck.shuffle(random)
     _log(room, "shuffle", "Deck shuffled")
     await _emit_views(room)
 
@@ -1039,3 +1161,4 @@ async def reset_room(sid, data):
         if psid:
             await sio.emit("joined", {"room": room, "seat": pid, "source": r.get("source", "yaml"), "visibleSlots": r["visible_slots"][pid]}, to=psid)
     await _emit_views(room)
+    _schedule_bot(room)
@@ -2,41 +2,148 @@ from __future__ import annotations
 import csv
 import statistics as stats
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-from packages.engine.loader import load_game
-from packages.engine.engine import Ctx, apply_action, initialize_game
+from packages.engine.loader import load_yaml_config, load_cards_from_csv, build_state_from_config
+from packages.engine.engine import Ctx, initialize_game
+from packages.engine.eventlog import OFF
+from packages.engine.specialize import specialize
 from packages.engine.actions import Attack, Defend
 from packages.engine.models import Slot, Card
+from packages.simulator.bots import play_game, policy_id, reproducible_policy
+from packages.simulator.sequential import AdaptiveStopper
+from packages.simulator.columnar import ColumnarWriter
+from packages.simulator.replay import Recorder, Replay, config_hash, write_replays
+from packages.simulator.stalemate import REASONS as STALEMATE_REASONS, StalemateDetector, engine_keys
+from packages.simulator.result_cache import (
+    ResultCache, cache_key, catalog_fingerprint, engine_fingerprint, fingerprint, source_fingerprint,
+)
 import random
 import argparse
 
 
-def _place_starters(state, cfg):
+@dataclass
+class BaseCatalog:
+    """Config and cards parsed once and shared by many games.
+
+    `cards` is the in-deck card list in CSV order (what `load_game` deals),
+    `catalog` holds every card by id (including out-of-deck bosses) for starters.
+    Games never mutate these objects; `new_state` copies what it deals.
+    """
+    cfg: dict
+    cards: List[Card]
+    catalog: Dict[str, Card]
+
+
+def load_base(config: str) -> BaseCatalog:
+    cfg = load_yaml_config(config)
+    csv_path = Path(config).parent / "cards.csv"
+    cards = load_cards_from_csv(csv_path) if csv_path.exists() else []
+    return BaseCatalog(cfg=cfg, cards=cards, catalog=_starter_catalog(config))
+
+
+def new_state(base: BaseCatalog):
+    """Fresh game state equivalent to `load_game(config)` for this catalog."""
+    cards = [c.model_copy() for c in base.cards]
+    state = build_state_from_config(base.cfg, cards)
+    # Same split as load_game: first 10 cards on the open shelf, rest in the deck
+    shelf_size = min(10, len(cards))
+    state.shelf = cards[:shelf_size]
+    state.deck = cards[shelf_size:]
+    return state
+
+
+def _starter_catalog(config: str) -> Dict[str, Card]:
+    """All cards (including out-of-deck bosses) by id, for string starters."""
+    csv_path = Path(config).parent / "cards.csv"
+    if not csv_path.exists():
+        return {}
+    return {c.id: c for c in load_cards_from_csv(csv_path, include_all=True)}
+
+
+def _place_starters(state, cfg, catalog: Optional[Dict[str, Card]] = None):
     starters = cfg.get("starters", {})
+    catalog = catalog or {}
     for pid, cards in starters.items():
         for i, cdata in enumerate(cards):
             if i >= len(state.players[pid].slots):
                 break
-            state.players[pid].slots[i] = Slot(card=Card(**cdata), face_up=True, muscles=0)
-
-
-def run_one(seed: int, turns: int, config: str) -> Dict:
-    state, cfg = load_game(config)
+            # Starters are card ids (see config/default.yaml) or inline card dicts
+            if isinstance(cdata, str):
+                base = catalog.get(cdata)
+                if base is None:
+                    continue
+                card = base.model_copy()
+            else:
+                card = Card(**cdata)
+            state.players[pid].slots[i] = Slot(card=card, face_up=True, muscles=0)
+
+
+def run_one(seed: int, turns: int, config: str, policy: Optional[str] = None, record: bool = False,
+            stalemate: bool = True) -> Dict:
+    """Play one game. With `policy` set, both seats are driven by that bot
+    policy (see bots.py) instead of the built-in attack/defend heuristic,
+    with a fixed search effort (`bots.reproducible_policy`) so a seed always
+    replays the same game.
+
+    "end_reason" is the engine's win reason, "turn_limit", or — with
+    `stalemate` — "repetition"/"no_progress" for games ended early as draws
+    (see stalemate.py). With `record`, the result also carries "replay": the
+    game as a compact `replay.Replay` (see replay.py)."""
+    return play_one(seed, turns, load_base(config), policy, record, stalemate)
+
+
+def setup_state(base: BaseCatalog, seed: int):
+    """Start position of game `seed`; also seeds the global RNG the heuristic uses."""
+    state = new_state(base)
+    cfg = base.cfg
     random.seed(seed)
     state.seed = seed
-    _place_starters(state, cfg)
+    _place_starters(state, cfg, base.catalog)
     # Randomize starting player per game to avoid systemic first-move bias
     try:
         state.active_player = random.choice([pid for pid in state.players.keys()])
     except Exception:
         state.active_player = "P1"
     initialize_game(state)
-
-    ctx = Ctx(state=state, log=[])
+    return state
+
+
+def play_one(seed: int, turns: int, base: BaseCatalog, policy: Optional[str] = None,
+             record: bool = False, stalemate: bool = True) -> Dict:
+    """`run_one` against an already loaded catalog (no file I/O per game)."""
+    state = setup_state(base, seed)
+
+    ctx = Ctx(state=state, log=[], log_level=OFF)
+    # Reducer compiled for this ruleset (identical results, no per-call config checks)
+    apply = specialize(state.config)
+    recorder = Recorder(apply, Replay(seed, config_hash(base))) if record else None
+    if recorder:
+        apply = recorder.apply
+    detector = StalemateDetector() if stalemate else None
+
+    if policy:
+        bots = {pid: reproducible_policy(policy, seed * 2 + i) for i, pid in enumerate(("P1", "P2"))}
+        try:
+            res = play_game(state, bots, max_turns=turns, ctx=ctx, apply=apply, stalemate=detector)
+        finally:
+            for b in bots.values():
+                b.close()
+        out = {
+            "seed": seed,
+            "winner": res["winner"],
+            "turns_played": res["turns_played"],
+            "empty_turns": 0,
+            "end_reason": res["win_reason"] or "turn_limit",
+        }
+        if recorder:
+            out["replay"] = recorder.finish(state)
+        return out
 
     empty_turns = 0
     winner: Optional[str] = None
+    end_reason = "turn_limit"
     start_player = state.active_player
 
     for t in range(turns):
@@ -79,21 +186,22 @@ def run_one(seed: int, turns: int, config: str) -> Dict:
                 need = s.muscles < goal or (s.card and s.card.hp <= 2)
                 prob = 0.85 if need else 0.4
                 if random.random() < prob:
-                    apply_action(ctx, Defend(target_slot=attacker_slot, hire_count=1))
+                    apply(ctx, Defend(target_slot=attacker_slot, hire_count=1))
                     did_something = True
 
         def try_attack():
-            nonlocal did_something, winner
+            nonlocal did_something, winner, end_reason
             if attacker_slot is not None and target_slot is not None:
                 # Starting player early turns is more likely to spend 1 ammo
                 base_prob_ammo = 0.25
                 if ap == start_player and t < 3:
                     base_prob_ammo = 0.5
                 ammo = 1 if random.random() < base_prob_ammo else 0
-                res2 = apply_action(ctx, Attack(target_player=op, target_slot=target_slot, attacker_slot=attacker_slot, ammo_spend=ammo))
+                res2 = apply(ctx, Attack(target_player=op, target_slot=target_slot, attacker_slot=attacker_slot, ammo_spend=ammo))
                 did_something = True
                 if isinstance(res2, dict) and "winner" in res2:
                     winner = res2.get("winner")
+                    end_reason = res2.get("win_reason") or "unknown"
                     return True
             return False
 
@@ -109,15 +217,41 @@ def run_one(seed: int, turns: int, config: str) -> Dict:
         if not did_something:
             empty_turns += 1
 
-        # If engine exposes end-of-turn switch implicitly inside actions, continue loop
-        # Otherwise, rely on engine to advance turns via apply_action side-effects
-        # If no progress is possible, we still cap by `turns`
+        # Dead positions (a repeated position, no card changes for many turns) end as draws
+        if detector:
+            reason = detector.update(*engine_keys(state))
+            if reason:
+                end_reason = reason
+                break
 
-    return {
+    out = {
         "seed": seed,
         "winner": winner,
         "turns_played": t + 1,  # 1-indexed count of turns run
         "empty_turns": empty_turns,
+        "end_reason": end_reason,
+    }
+    if recorder:
+        out["replay"] = recorder.finish(state)
+    return out
+
+
+def cache_parts(base: BaseCatalog, turns: int, policy: Optional[str] = None, stalemate: bool = True) -> Dict:
+    """Everything besides the seed that determines `play_one` results."""
+    if policy:
+        policy_key = f"{policy_id(policy)}:{source_fingerprint(Path(__file__).with_name('bots.py'))}"
+    else:
+        # The built-in heuristic lives in this module
+        policy_key = f"heuristic:{source_fingerprint(__file__)}"
+    return {
+        "kind": "balance.play_one",
+        "cards": catalog_fingerprint(base.cards),
+        "starters": catalog_fingerprint(base.catalog.values()),
+        "rules": fingerprint(base.cfg),
+        "policy": policy_key,
+        "engine": engine_fingerprint(),
+        "turns": turns,
+        "stalemate": StalemateDetector().params() if stalemate else None,
     }
 
 
@@ -126,6 +260,7 @@ def aggregate(results: List[Dict]) -> Dict:
     p1_wins = sum(1 for r in results if r.get("winner") == "P1")
     p2_wins = sum(1 for r in results if r.get("winner") == "P2")
     draws = total - p1_wins - p2_wins
+    stalemates = sum(1 for r in results if r.get("end_reason") in STALEMATE_REASONS)
 
     lengths = [r["turns_played"] for r in results]
     empty = [r["empty_turns"] for r in results]
@@ -139,6 +274,7 @@ def aggregate(results: List[Dict]) -> Dict:
         "p1_wins": p1_wins,
         "p2_wins": p2_wins,
         "draws": draws,
+        "stalemates": stalemates,
         "mean_turns": stats.mean(lengths) if lengths else 0.0,
         "median_turns": stats.median(lengths) if lengths else 0.0,
         "p25_turns": stats.quantiles(lengths, n=4)[0] if len(lengths) >= 4 else 0.0,
@@ -153,6 +289,8 @@ def print_summary(summary: Dict):
     print("Balance summary")
     print(f"Games: {summary['games']}")
     print(f"P1 winrate: {summary['p1_winrate']*100:.1f}% (P1={summary['p1_wins']}, P2={summary['p2_wins']}, draws={summary['draws']})")
+    if summary.get("stalemates"):
+        print(f"Ended early as draws (repetition / no progress): {summary['stalemates']}")
     print(
         "Turns: mean={:.2f}, median={}, IQR=[{}, {}]".format(
             summary["mean_turns"], summary["median_turns"], summary["p25_turns"], summary["p75_turns"]
@@ -165,6 +303,10 @@ def print_summary(summary: Dict):
     )
 
 
+# Column types of run_one() results for the columnar table
+RESULT_SCHEMA = {"seed": "int", "winner": "str", "turns_played": "int", "empty_turns": "int", "end_reason": "str"}
+
+
 def write_csv(results: List[Dict], path: str):
     if not results:
         return
@@ -181,19 +323,79 @@ def main():
     parser.add_argument("--seeds", type=int, default=200)
     parser.add_argument("--turns", type=int, default=15)
     parser.add_argument("--csv", default="")
+    parser.add_argument("--table", default="", help="Stream per-game results to a columnar table (see columnar.py)")
+    parser.add_argument("--policy", default="", choices=["", "random", "greedy", "mcts"],
+                        help="Bot policy for both seats (default: built-in heuristic)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Play seeds in batches and stop once the P1 winrate is settled (--seeds is the cap)")
+    parser.add_argument("--ci-width", type=float, default=0.1, help="Target width of the P1 winrate interval")
+    parser.add_argument("--ci-method", default="wilson", choices=["wilson", "bayes"])
+    parser.add_argument("--batch", type=int, default=20)
+    parser.add_argument("--cache-dir", default="",
+                        help="Reuse per-seed results from this content-addressed cache (see result_cache.py)")
+    parser.add_argument("--no-stalemate", action="store_true",
+                        help="Always play to --turns instead of ending repeated/stalled games as draws")
+    parser.add_argument("--replays", default="",
+                        help="Record every game to this replay file (see replay.py); bypasses --cache-dir")
     args = parser.parse_args()
 
+    base = load_base(args.config)
+    policy = args.policy or None
+    record = bool(args.replays)
+    # Cached results carry no replays, so recording always plays every seed
+    cache = ResultCache(args.cache_dir) if args.cache_dir and not record else None
+    stalemate = not args.no_stalemate
+    parts = cache_parts(base, args.turns, policy, stalemate) if cache else {}
+    key = cache_key(**parts) if cache else ""
+    stopper = AdaptiveStopper(target_width=args.ci_width, method=args.ci_method) if args.adaptive else None
+    table = ColumnarWriter(args.table, schema=RESULT_SCHEMA) if args.table else None
     results: List[Dict] = []
-    for seed in range(1, args.seeds + 1):
-        r = run_one(seed=seed, turns=args.turns, config=args.config)
-        results.append(r)
+    replays = []
+    seed = 1
+    while seed <= args.seeds:
+        end = min(args.seeds, seed + args.batch - 1) if stopper else args.seeds
+        seeds = range(seed, end + 1)
+
+        def compute(s: int) -> Dict:
+            return play_one(seed=s, turns=args.turns, base=base, policy=policy, record=record, stalemate=stalemate)
+
+        if cache:
+            batch = cache.run(key, seeds, compute, meta=parts)
+        else:
+            batch = [compute(s) for s in seeds]
+        if record:
+            replays.extend(r.pop("replay") for r in batch)
+        if table:
+            table.extend(batch)
+        results.extend(batch)
+        seed = end + 1
+        if stopper:
+            p1 = sum(1 for r in batch if r.get("winner") == "P1")
+            p2 = sum(1 for r in batch if r.get("winner") == "P2")
+            stopper.update(p1, p2, len(batch) - p1 - p2)
+            if stopper.stop_reason():
+                break
+
+    if table:
+        table.close()
 
     summary = aggregate(results)
     print_summary(summary)
+    if table:
+        print(f"Saved per-game results table to {args.table}")
+    if cache:
+        print(f"Cache: {cache.hits} seeds reused, {cache.misses} simulated")
+    if stopper:
+        lo, hi = stopper.interval()
+        reason = stopper.stop_reason() or "max_games"
+        print(f"Adaptive: stopped after {len(results)} games ({reason}), P1 score interval=[{lo*100:.1f}%, {hi*100:.1f}%]")
 
     if args.csv:
         write_csv(results, args.csv)
         print(f"Saved per-game metrics to {args.csv}")
+    if record:
+        write_replays(args.replays, replays)
+        print(f"Saved {len(replays)} replays to {args.replays}")
 
 
 if __name__ == "__main__":
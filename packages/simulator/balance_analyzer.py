@@ -5,10 +5,19 @@ Kingpin Card Balance Analyzer
 
 import csv
 import math
+import sys
+from pathlib import Path
 from typing import Dict, List, Tuple, Any
 from dataclasses import dataclass
 from collections import defaultdict
 
+# Repo root on the path, so the script entry points (run_balance_analysis.py) share
+# the `packages.simulator` modules — and their table caches — with everything else
+_ROOT = str(Path(__file__).resolve().parents[2])
+if _ROOT not in sys.path:
+    sys.path.append(_ROOT)
+from packages.simulator.duel_table import DuelTable, KILL, get_table as get_duel_table
+
 @dataclass
 class Card:
     id: str
@@ -250,6 +259,33 @@ class BalanceAnalyzer:
             
         return caste_stats
     
+    def duel_table(self) -> DuelTable:
+        """Таблица дуэлей карт колоды (строится заново, только если статы изменились)"""
+        deck_cards = [c for c in self.cards if c.in_deck and c.type not in ['event', 'token', 'boss']]
+        return get_duel_table((c.id, c.hp, c.atk) for c in deck_cards)
+
+    def analyze_caste_duels(self, shields: int = 0) -> Dict[str, Dict[str, float]]:
+        """
+        Доля дуэлей, в которых карта клана-атакующего убивает карту клана-защитника
+        за один обмен (у обеих сторон по shields щитов)
+        """
+        table = self.duel_table()
+        by_caste = defaultdict(list)
+        for card in self.cards:
+            if card.id in table.index and card.caste in self.castes:
+                by_caste[card.caste].append(card.id)
+
+        duels = {}
+        for attacker_caste, attackers in by_caste.items():
+            duels[attacker_caste] = {}
+            for defender_caste, defenders in by_caste.items():
+                kills = sum(
+                    1 for a in attackers for d in defenders
+                    if table.outcome(a, d, shields, shields) & KILL
+                )
+                duels[attacker_caste][defender_caste] = kills / (len(attackers) * len(defenders))
+        return duels
+
     def _calculate_specialization_score(self, cards: List[Card]) -> float:
         """
         Оценка специализации клана (насколько уникальны его карты)
@@ -318,6 +354,19 @@ class BalanceAnalyzer:
                 report += ", ".join(factions) + "\n"
             report += "\n"
         
+        # Матрица дуэлей
+        duels = self.analyze_caste_duels()
+        if duels:
+            report += "## Дуэли кланов\n\n"
+            report += "Доля пар карт, где атакующий убивает защитника за один обмен (без щитов).\n\n"
+            names = list(duels)
+            report += "| Атакует \\ Защищается | " + " | ".join(names) + " |\n"
+            report += "|" + "---|" * (len(names) + 1) + "\n"
+            for attacker in names:
+                cells = [f"{duels[attacker][d] * 100:.0f}%" for d in names]
+                report += f"| {attacker} | " + " | ".join(cells) + " |\n"
+            report += "\n"
+        
         # Рекомендации по балансу
         report += "## Рекомендации по балансу\n\n"
         
@@ -0,0 +1,377 @@
+"""
+Bot policies for simulations and server-side bot seats.
+
+Every policy maps an engine `GameState` to one action from
+`legal_actions(state)` for the active player:
+
+- `RandomPolicy`  — uniform over legal moves (baseline, fastest).
+- `GreedyPolicy`  — one-ply lookahead on a fork with a material evaluation.
+- `MCTSPolicy`    — determinized information-set MCTS with time and rollout
+  budgets and an optional root-parallel mode across processes.
+
+Hidden information (the deck order and the opponent's hand) is handled by
+determinization: each MCTS iteration reshuffles the cards the mover cannot see
+before searching, so the bot never peeks at the real deck.
+
+`play_game` drives two policies through `apply_action` until someone wins,
+the turn cap is hit or (optionally) the game stalls (see stalemate.py).
+"""
+
+from __future__ import annotations
+import inspect
+import math
+import random
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from packages.engine.engine import Ctx, apply_action
+from packages.engine.eventlog import OFF
+from packages.engine.legal import legal_actions
+from packages.engine.actions import Action, Attack
+from packages.engine.models import GameState
+from packages.engine import zobrist as zh
+from packages.simulator.stalemate import StalemateDetector, engine_keys
+
+
+def action_key(action: Action) -> Tuple:
+    """Hashable identity of an action (kind + field values)."""
+    return tuple(action.__dict__.values())
+
+
+def evaluate(state: GameState, pid: str) -> float:
+    """Heuristic value of `state` for `pid` in [0, 1] (0.5 = even)."""
+    def side(p) -> float:
+        v = 0.6 * p.tokens.reserve_money
+        for s in p.slots:
+            c = s.card
+            if c is None:
+                continue
+            hp = max(0, c.hp)
+            v += hp + s.muscles + 0.8 * c.atk
+            if c.type == "boss":
+                v += 2 * hp
+        return v + 0.5 * len(p.hand)
+
+    op = "P2" if pid == "P1" else "P1"
+    diff = side(state.players[pid]) - side(state.players[op])
+    return 1.0 / (1.0 + math.exp(-diff / 8.0))
+
+
+class Policy(ABC):
+    """Base class: choose one legal action for the active player."""
+
+    name = "base"
+    version = "1"
+
+    @abstractmethod
+    def choose(self, state: GameState) -> Action:
+        """One action from `legal_actions(state)` for `state.active_player`."""
+
+    def close(self) -> None:
+        """Release any worker resources held by the policy."""
+
+
+class RandomPolicy(Policy):
+    name = "random"
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def choose(self, state: GameState) -> Action:
+        return self.rng.choice(legal_actions(state))
+
+
+class GreedyPolicy(Policy):
+    """Apply every legal move on a fork and keep the best-evaluated one."""
+
+    name = "greedy"
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = random.Random(seed)
+
+    def choose(self, state: GameState) -> Action:
+        me = state.active_player
+        best: List[Action] = []
+        best_v = -1.0
+        for action in legal_actions(state):
+            child = state.fork()
+            zh.invalidate(child)
+            res = apply_action(Ctx(state=child, log_level=OFF), action)
+            if "winner" in res:
+                v = 1.0 if res["winner"] == me else 0.0
+            else:
+                v = evaluate(child, me)
+            if v > best_v + 1e-9:
+                best, best_v = [action], v
+            elif abs(v - best_v) <= 1e-9:
+                best.append(action)
+        return self.rng.choice(best)
+
+
+# --- MCTS --------------------------------------------------------------------
+
+class _Node:
+    __slots__ = ("mover", "visits", "value", "avail", "children")
+
+    def __init__(self, mover: Optional[str]):
+        self.mover = mover  # player whose move led to this node
+        self.visits = 0
+        self.value = 0.0
+        self.avail = 0
+        self.children: Dict[Tuple, "_Node"] = {}
+
+
+def determinize(state: GameState, observer: str, rng: random.Random) -> GameState:
+    """Fork `state` and reshuffle everything `observer` cannot see.
+
+    The deck order and the opponent's hand are pooled and redealt with the
+    original sizes. Face-up board cards, the shelf and the discard stay as-is.
+    """
+    det = state.fork()
+    zh.invalidate(det)
+    op = det.players["P2" if observer == "P1" else "P1"]
+    n_hand = len(op.hand)
+    pool = det.deck + op.hand
+    rng.shuffle(pool)
+    op.hand = pool[:n_hand]
+    det.deck = pool[n_hand:]
+    return det
+
+
+def _rollout_action(state: GameState, rng: random.Random, attack_bias: float) -> Action:
+    acts = legal_actions(state)
+    if rng.random() < attack_bias:
+        attacks = [a for a in acts if isinstance(a, Attack)]
+        if attacks:
+            return rng.choice(attacks)
+    return rng.choice(acts)
+
+
+def _search(root: GameState, time_budget: float, max_iterations: int, rollout_depth: int,
+            tree_depth: int, exploration: float, attack_bias: float,
+            seed: Optional[int]) -> Dict[Tuple, Tuple[int, float]]:
+    """Run one ISMCTS search; return root child stats {action_key: (visits, value)}."""
+    rng = random.Random(seed)
+    me = root.active_player
+    tree = _Node(None)
+    deadline = time.perf_counter() + time_budget if time_budget > 0 else None
+    it = 0
+    while it < max_iterations:
+        if deadline is not None and it > 0 and time.perf_counter() >= deadline:
+            break
+        it += 1
+        st = determinize(root, me, rng)
+        ctx = Ctx(state=st, log_level=OFF)
+        node = tree
+        path = [node]
+        winner = None
+
+        # Selection / expansion
+        for _ in range(tree_depth):
+            acts = legal_actions(st)
+            mover = st.active_player
+            fresh = []
+            best, best_score = None, -1.0
+            for a in acts:
+                k = action_key(a)
+                child = node.children.get(k)
+                if child is None:
+                    fresh.append((k, a))
+                    continue
+                child.avail += 1
+                score = child.value / child.visits + exploration * math.sqrt(math.log(child.avail) / child.visits)
+                if score > best_score:
+                    best, best_score = (child, a), score
+            if fresh:
+                k, a = rng.choice(fresh)
+                child = node.children[k] = _Node(mover)
+                child.avail = 1
+                res = apply_action(ctx, a)
+                node = child
+                path.append(node)
+                winner = res.get("winner")
+                break
+            node, a = best
+            res = apply_action(ctx, a)
+            path.append(node)
+            winner = res.get("winner")
+            if winner:
+                break
+
+        # Rollout
+        depth = 0
+        while winner is None and depth < rollout_depth:
+            res = apply_action(ctx, _rollout_action(st, rng, attack_bias))
+            winner = res.get("winner")
+            depth += 1
+
+        # Backpropagation (value from the point of view of each node's mover)
+        if winner is not None:
+            v_me = 1.0 if winner == me else 0.0
+        else:
+            v_me = evaluate(st, me)
+        for n in path:
+            n.visits += 1
+            if n.mover is not None:
+                n.value += v_me if n.mover == me else 1.0 - v_me
+
+    return {k: (c.visits, c.value) for k, c in tree.children.items()}
+
+
+def _search_worker(args):
+    return _search(*args)
+
+
+class MCTSPolicy(Policy):
+    """Determinized MCTS bot.
+
+    Args:
+        time_budget: wall-clock seconds per move (0 disables the clock).
+        max_iterations: hard cap on search iterations (rollouts) per move.
+        rollout_depth: plies played by the rollout policy before evaluation.
+        tree_depth: maximum tree depth below the root.
+        workers: >1 enables root-parallel search across processes; each worker
+            searches independently and root statistics are summed.
+    """
+
+    name = "mcts"
+    version = "1"
+
+    def __init__(self, time_budget: float = 0.08, max_iterations: int = 10_000,
+                 rollout_depth: int = 6, tree_depth: int = 4, exploration: float = 0.7,
+                 attack_bias: float = 0.6, workers: int = 1, seed: Optional[int] = None):
+        self.time_budget = time_budget
+        self.max_iterations = max_iterations
+        self.rollout_depth = rollout_depth
+        self.tree_depth = tree_depth
+        self.exploration = exploration
+        self.attack_bias = attack_bias
+        self.workers = max(1, workers)
+        self.rng = random.Random(seed)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self.last_stats: Dict[Tuple, Tuple[int, float]] = {}
+
+    def _args(self, state: GameState, seed: int):
+        return (state, self.time_budget, self.max_iterations, self.rollout_depth,
+                self.tree_depth, self.exploration, self.attack_bias, seed)
+
+    def choose(self, state: GameState) -> Action:
+        acts = legal_actions(state)
+        if len(acts) == 1:
+            return acts[0]
+        if self.workers > 1:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers)
+            seeds = [self.rng.getrandbits(32) for _ in range(self.workers)]
+            parts = list(self._pool.map(_search_worker, [self._args(state, s) for s in seeds]))
+        else:
+            parts = [_search(*self._args(state, self.rng.getrandbits(32)))]
+        stats: Dict[Tuple, List[float]] = {}
+        for part in parts:
+            for k, (n, v) in part.items():
+                acc = stats.setdefault(k, [0, 0.0])
+                acc[0] += n
+                acc[1] += v
+        self.last_stats = {k: (int(n), v) for k, (n, v) in stats.items()}
+        by_key = {action_key(a): a for a in acts}
+        ranked = sorted(
+            (k for k in stats if k in by_key),
+            key=lambda k: (stats[k][0], stats[k][1] / max(1, stats[k][0])),
+            reverse=True,
+        )
+        return by_key[ranked[0]] if ranked else self.rng.choice(acts)
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+
+POLICIES: Dict[str, Callable[..., Policy]] = {
+    "random": RandomPolicy,
+    "greedy": GreedyPolicy,
+    "mcts": MCTSPolicy,
+}
+
+
+def make_policy(name: str, **kwargs) -> Policy:
+    try:
+        factory = POLICIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown policy: {name}") from None
+    return factory(**kwargs)
+
+
+# Fixed search effort for games that are seeded, cached or recorded: with a
+# wall-clock budget the moves depend on machine load, not just on the seed.
+REPRODUCIBLE: Dict[str, Dict[str, object]] = {
+    "mcts": {"time_budget": 0, "max_iterations": 64},
+}
+
+
+def reproducible_policy(name: str, seed: int) -> Policy:
+    """`make_policy` with settings under which the moves depend only on `seed`."""
+    return make_policy(name, seed=seed, **REPRODUCIBLE.get(name, {}))
+
+
+def policy_id(name: str) -> str:
+    """Identity of `reproducible_policy(name)` for cache keys and manifests."""
+    if name not in POLICIES:
+        raise ValueError(f"Unknown policy: {name}")
+    settings = ",".join(f"{k}={v}" for k, v in sorted(REPRODUCIBLE.get(name, {}).items()))
+    return f"{name}:{POLICIES[name].version}" + (f":{settings}" if settings else "")
+
+
+def choose_action_payload(policy: str, state: dict, time_budget: float, seed: Optional[int] = None) -> dict:
+    """Process-pool entry point for server bot seats.
+
+    Takes a `GameState.model_dump()` and returns the chosen action as a dict, so
+    nothing engine-specific crosses the process boundary. Policies that accept
+    a `time_budget` get the caller's think time.
+    """
+    factory = POLICIES[policy]
+    kwargs = {"seed": seed}
+    if "time_budget" in inspect.signature(factory).parameters:
+        kwargs["time_budget"] = time_budget
+    bot = factory(**kwargs)
+    try:
+        return bot.choose(GameState.model_validate(state)).model_dump()
+    finally:
+        bot.close()
+
+
+def play_game(state: GameState, policies: Dict[str, Policy], max_turns: int = 50,
+              ctx: Optional[Ctx] = None, apply: Optional[Callable[..., Dict]] = None,
+              stalemate: Optional[StalemateDetector] = None,
+              on_action: Optional[Callable[[GameState, Action], None]] = None) -> Dict:
+    """Play until a winner or `max_turns` actions; return winner and turn count.
+
+    `turns_played` counts actions: most actions end the mover's turn, but a
+    paid ability (UseAbility) keeps it. `apply` replaces `apply_action` (a
+    specialized reducer, a replay recorder). With `stalemate`, a game that
+    repeats a position or stops progressing ends as a draw and `win_reason`
+    is the detector's reason. `on_action(state, action)` sees every action
+    before it is applied (dataset recording).
+    """
+    ctx = ctx or Ctx(state=state, log=[])
+    apply = apply or apply_action
+    winner = None
+    reason = None
+    turns = 0
+    while turns < max_turns:
+        action = policies[state.active_player].choose(state)
+        if on_action is not None:
+            on_action(state, action)
+        res = apply(ctx, action)
+        turns += 1
+        if "winner" in res:
+            winner = res["winner"]
+            reason = res.get("win_reason")
+            break
+        if stalemate is not None:
+            reason = stalemate.update(*engine_keys(state))
+            if reason:
+                break
+    return {"winner": winner, "win_reason": reason, "turns_played": turns}
@@ -0,0 +1,346 @@
+"""
+Columnar on-disk table for simulation results.
+
+A small Parquet-like format implemented with the standard library (pyarrow is
+not a project dependency):
+
+    MAGIC
+    row group 0: one zlib-compressed chunk per column
+    row group 1: ...
+    footer (JSON): schema, per-group row counts, chunk offsets and min/max/null stats
+    footer length (8 bytes, little-endian) + MAGIC
+
+Columns are typed: "int" and "float" chunks are packed arrays, "bool" one byte
+per value, "str" is dictionary-encoded (cheap for winner/clan columns). Any
+column may hold None.
+
+`ColumnarWriter` buffers rows and writes a row group every `row_group_size`
+rows, so games can be streamed to disk as they complete. `ColumnarReader`
+reads only the requested columns and skips row groups whose statistics cannot
+match the filters:
+
+    with ColumnarWriter("games.kpcol") as w:
+        for r in results:
+            w.append(r)
+    ColumnarReader("games.kpcol").read(["seed"], filters=[("winner", "==", "P1"), ("turns_played", ">=", 10)])
+"""
+
+from __future__ import annotations
+import json
+import operator
+import struct
+import zlib
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+MAGIC = b"KPCOL\x00\x01\n"
+TYPES = ("int", "float", "bool", "str")
+ROW_GROUP_SIZE = 4096
+
+Filter = Tuple[str, str, Any]
+
+_OPS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "in": lambda v, options: v in options,
+}
+
+
+def infer_type(value: Any) -> str:
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "float"
+    return "str"
+
+
+def _coerce(value: Any, typ: str, name: str) -> Any:
+    if value is None:
+        return None
+    if typ == "str":
+        return value if isinstance(value, str) else str(value)
+    if typ == "bool":
+        return bool(value)
+    if typ == "float":
+        if isinstance(value, (int, float)):
+            return float(value)
+    elif typ == "int":
+        if isinstance(value, int):
+            return int(value)
+        if isinstance(value, float) and value.is_integer():
+            return int(value)
+    raise ValueError(f"Column {name!r} is {typ}, got {value!r}")
+
+
+# --- Chunk encoding ---------------------------------------------------------
+
+def _encode(values: List[Any], typ: str) -> bytes:
+    nulls = [v is None for v in values]
+    head = b"\x00"
+    if any(nulls):
+        head = b"\x01" + bytes(nulls)
+    if typ == "int":
+        body = array("q", (0 if v is None else v for v in values)).tobytes()
+    elif typ == "float":
+        body = array("d", (0.0 if v is None else v for v in values)).tobytes()
+    elif typ == "bool":
+        body = bytes(1 if v else 0 for v in values)
+    else:
+        index: Dict[str, int] = {}
+        codes = array("i", (index.setdefault(v, len(index)) if v is not None else 0 for v in values))
+        words = json.dumps(list(index), ensure_ascii=False).encode("utf-8")
+        body = struct.pack("<I", len(words)) + words + codes.tobytes()
+    return zlib.compress(head + body, 1)
+
+
+def _decode(blob: bytes, typ: str, n: int) -> List[Any]:
+    raw = zlib.decompress(blob)
+    nulls = None
+    if raw[0] == 1:
+        nulls = raw[1:1 + n]
+        raw = raw[1 + n:]
+    else:
+        raw = raw[1:]
+    if typ == "int":
+        a = array("q")
+        a.frombytes(raw)
+        values: List[Any] = a.tolist()
+    elif typ == "float":
+        a = array("d")
+        a.frombytes(raw)
+        values = a.tolist()
+    elif typ == "bool":
+        values = [b == 1 for b in raw]
+    else:
+        (wlen,) = struct.unpack_from("<I", raw)
+        words = json.loads(raw[4:4 + wlen].decode("utf-8"))
+        codes = array("i")
+        codes.frombytes(raw[4 + wlen:])
+        values = [words[c] if words else None for c in codes]
+    if nulls is not None:
+        values = [None if isnull else v for v, isnull in zip(values, nulls)]
+    return values
+
+
+# --- Writer -----------------------------------------------------------------
+
+class ColumnarWriter:
+    """Append rows (dicts) and write them to `path` in row groups.
+
+    The schema is a {column: type} mapping; without one it is inferred from the
+    first row. Unknown columns in later rows raise ValueError; missing ones are
+    stored as None. The footer is written by `close()`.
+    """
+
+    def __init__(self, path: str | Path, schema: Optional[Dict[str, str]] = None,
+                 row_group_size: int = ROW_GROUP_SIZE, metadata: Optional[dict] = None):
+        self.path = Path(path)
+        self.row_group_size = max(1, row_group_size)
+        self.metadata = dict(metadata or {})
+        self.schema: Optional[Dict[str, str]] = None
+        self._buf: List[List[Any]] = []
+        if schema is not None:
+            self._set_schema(schema)
+        self._groups: List[dict] = []
+        self.rows_written = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "wb")
+        self._f.write(MAGIC)
+
+    def _set_schema(self, schema: Dict[str, str]) -> None:
+        for name, typ in schema.items():
+            if typ not in TYPES:
+                raise ValueError(f"Unknown column type {typ!r} for {name!r}")
+        self.schema = dict(schema)
+        self._buf = [[] for _ in self.schema]
+
+    def append(self, row: Dict[str, Any]) -> None:
+        if self.schema is None:
+            self._set_schema({k: infer_type(v) if v is not None else "str" for k, v in row.items()})
+        extra = set(row) - set(self.schema)
+        if extra:
+            raise ValueError(f"Columns not in schema: {sorted(extra)}")
+        for col, (name, typ) in zip(self._buf, self.schema.items()):
+            col.append(_coerce(row.get(name), typ, name))
+        if len(self._buf[0]) >= self.row_group_size:
+            self.flush()
+
+    def extend(self, rows) -> None:
+        for row in rows:
+            self.append(row)
+
+    def flush(self) -> None:
+        """Write buffered rows as one row group."""
+        if not self._buf or not self._buf[0]:
+            return
+        n = len(self._buf[0])
+        columns = {}
+        for values, (name, typ) in zip(self._buf, self.schema.items()):
+            blob = _encode(values, typ)
+            present = [v for v in values if v is not None]
+            columns[name] = {
+                "offset": self._f.tell(),
+                "length": len(blob),
+                "nulls": n - len(present),
+                "min": min(present) if present else None,
+                "max": max(present) if present else None,
+            }
+            self._f.write(blob)
+        self._groups.append({"rows": n, "columns": columns})
+        self.rows_written += n
+        self._buf = [[] for _ in self.schema]
+        self._f.flush()
+
+    def close(self) -> None:
+        if self._f.closed:
+            return
+        self.flush()
+        footer = json.dumps({
+            "version": 1,
+            "schema": list((self.schema or {}).items()),
+            "row_groups": self._groups,
+            "metadata": self.metadata,
+        }, ensure_ascii=False).encode("utf-8")
+        self._f.write(footer)
+        self._f.write(struct.pack("<Q", len(footer)))
+        self._f.write(MAGIC)
+        self._f.close()
+
+    def __enter__(self) -> "ColumnarWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+# --- Reader -----------------------------------------------------------------
+
+def _group_may_match(stats: dict, op: str, value: Any) -> bool:
+    """Conservative row-group pruning from min/max statistics."""
+    lo, hi = stats.get("min"), stats.get("max")
+    if lo is None:
+        return False  # all-null chunk never matches a comparison
+    try:
+        if op == "==":
+            return lo <= value <= hi
+        if op == "<":
+            return lo < value
+        if op == "<=":
+            return lo <= value
+        if op == ">":
+            return hi > value
+        if op == ">=":
+            return hi >= value
+        if op == "in":
+            return any(lo <= v <= hi for v in value)
+    except TypeError:
+        return True
+    return True
+
+
+class ColumnarReader:
+    """Read a table written by `ColumnarWriter`.
+
+    Iterating yields rows as dicts and `len()` is the row count, so a reader
+    can stand in for the list of per-game dicts it replaces.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            f.seek(0, 2)
+            size = f.tell()
+            tail = len(MAGIC) + 8
+            if size < len(MAGIC) + tail:
+                raise ValueError(f"{self.path} is not a columnar table (truncated)")
+            f.seek(size - tail)
+            (flen,) = struct.unpack("<Q", f.read(8))
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{self.path} is not a columnar table (missing footer)")
+            f.seek(size - tail - flen)
+            footer = json.loads(f.read(flen).decode("utf-8"))
+        self.schema: Dict[str, str] = dict(footer["schema"])
+        self.row_groups: List[dict] = footer["row_groups"]
+        self.metadata: dict = footer.get("metadata", {})
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self.schema)
+
+    @property
+    def num_rows(self) -> int:
+        return sum(g["rows"] for g in self.row_groups)
+
+    def __len__(self) -> int:
+        return self.num_rows
+
+    def _chunk(self, f, group: dict, name: str) -> List[Any]:
+        meta = group["columns"][name]
+        f.seek(meta["offset"])
+        return _decode(f.read(meta["length"]), self.schema[name], group["rows"])
+
+    def read(self, columns: Optional[Sequence[str]] = None,
+             filters: Optional[Sequence[Filter]] = None) -> Dict[str, List[Any]]:
+        """Selected columns ({name: values}) of the rows matching all `filters`.
+
+        Filters are (column, op, value) with op in ==, !=, <, <=, >, >=, in.
+        """
+        columns = list(columns) if columns is not None else self.columns
+        filters = list(filters or ())
+        for name in list(columns) + [flt[0] for flt in filters]:
+            if name not in self.schema:
+                raise KeyError(f"Unknown column: {name}")
+        for _, op, _ in filters:
+            if op not in _OPS:
+                raise ValueError(f"Unknown filter operator: {op}")
+        out: Dict[str, List[Any]] = {c: [] for c in columns}
+        with open(self.path, "rb") as f:
+            for group in self.row_groups:
+                if not all(_group_may_match(group["columns"][c], op, v) for c, op, v in filters if op != "!="):
+                    continue
+                cache: Dict[str, List[Any]] = {}
+                keep: Optional[List[int]] = None
+                for c, op, v in filters:
+                    values = cache.get(c)
+                    if values is None:
+                        values = cache[c] = self._chunk(f, group, c)
+                    fn = _OPS[op]
+                    rows = range(group["rows"]) if keep is None else keep
+                    keep = [i for i in rows if values[i] is not None and fn(values[i], v)]
+                    if not keep:
+                        break
+                if keep is not None and not keep:
+                    continue
+                for c in columns:
+                    values = cache.get(c)
+                    if values is None:
+                        values = self._chunk(f, group, c)
+                    out[c].extend(values if keep is None else [values[i] for i in keep])
+        return out
+
+    def rows(self, columns: Optional[Sequence[str]] = None,
+             filters: Optional[Sequence[Filter]] = None) -> List[Dict[str, Any]]:
+        table = self.read(columns, filters)
+        names = list(table)
+        return [dict(zip(names, vals)) for vals in zip(*(table[n] for n in names))]
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for group in self.row_groups:
+            with open(self.path, "rb") as f:
+                chunks = [self._chunk(f, group, c) for c in self.columns]
+            for vals in zip(*chunks):
+                yield dict(zip(self.columns, vals))
+
+
+def write_table(rows, path: str | Path, schema: Optional[Dict[str, str]] = None, **kwargs) -> int:
+    """Write an iterable of row dicts; return the number of rows written."""
+    with ColumnarWriter(path, schema=schema, **kwargs) as w:
+        w.extend(rows)
+    return w.rows_written
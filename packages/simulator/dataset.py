@@ -0,0 +1,264 @@
+"""
+Sharded self-play datasets: one row per decision of bot-vs-bot games.
+
+Games are played with the bot policies (bots.py) on the balance start
+positions (`balance.setup_state`) and recorded as rows of
+
+    game, seed, step, player, turn                      who moved when
+    me_s<i>_card/hp/atk/d/muscles/face_up, me_money,    the position before the
+    me_otboy, me_hand, op_... (same), deck, shelf       action, mover's view
+    action_kind, action, legal_count                    what was played
+    winner, win_reason, result, game_length             how the game ended
+
+Only what the mover can see is recorded: an opponent's face-down slot
+shows its muscles and face_up=False, with card/hp/atk/d left None.
+`action` is the action's fields as compact JSON; `result` is +1/-1/0 for
+the mover. A game's rows are held until it ends (its outcome is only known
+then) and streamed to the shard; with at most one game and one row group in
+memory, a worker's footprint does not grow with the dataset.
+
+Layout of the output directory:
+
+    manifest.json             parameters, schema and the finished shards
+    shard-00000.kpcol, ...    columnar tables (see columnar.py), zlib-compressed
+
+Shard k holds games k*games_per_shard ... in seed order and is written by one
+worker process under a temporary name, then renamed. The manifest is
+rewritten after every finished shard, so an interrupted run resumes where it
+stopped: rerunning the same command only plays the missing shards. Resuming
+with different parameters, policies or engine sources raises ValueError.
+
+    python -m packages.simulator.dataset --out data/selfplay --games 20000 \\
+        --p1 greedy --p2 random --workers 4
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from packages.engine.engine import Ctx
+from packages.engine.eventlog import OFF
+from packages.engine.legal import legal_actions
+from packages.engine.specialize import specialize
+from packages.simulator.balance import BaseCatalog, load_base, setup_state
+from packages.simulator.bots import POLICIES, play_game, policy_id, reproducible_policy
+from packages.simulator.columnar import ColumnarReader, ColumnarWriter
+from packages.simulator.replay import config_hash
+from packages.simulator.result_cache import engine_fingerprint
+from packages.simulator.stalemate import StalemateDetector
+
+FORMAT = "kingpin-selfplay/2"
+MANIFEST = "manifest.json"
+ROW_GROUP_SIZE = 2048
+
+SLOT_COLUMNS = (("card", "str"), ("hp", "int"), ("atk", "int"), ("d", "int"), ("muscles", "int"),
+                ("face_up", "bool"))
+
+
+def record_schema(slots: int) -> Dict[str, str]:
+    schema = {"game": "int", "seed": "int", "step": "int", "player": "str", "turn": "int"}
+    for side in ("me", "op"):
+        for i in range(slots):
+            for name, typ in SLOT_COLUMNS:
+                schema[f"{side}_s{i}_{name}"] = typ
+        schema.update({f"{side}_money": "int", f"{side}_otboy": "int", f"{side}_hand": "int"})
+    schema.update({"deck": "int", "shelf": "int",
+                   "action_kind": "str", "action": "str", "legal_count": "int",
+                   "winner": "str", "win_reason": "str", "result": "float", "game_length": "int"})
+    return schema
+
+
+def _position(state) -> Dict[str, Any]:
+    row: Dict[str, Any] = {}
+    for side, pid in (("me", state.active_player), ("op", state.opponent_id())):
+        p = state.players[pid]
+        for i, s in enumerate(p.slots):
+            # The mover sees only the muscles on the opponent's face-down cards
+            c = s.card if side == "me" or s.face_up else None
+            prefix = f"{side}_s{i}_"
+            row[prefix + "card"] = c.id if c is not None else None
+            row[prefix + "hp"] = c.hp if c is not None else None
+            row[prefix + "atk"] = c.atk if c is not None else None
+            row[prefix + "d"] = c.d if c is not None else None
+            row[prefix + "muscles"] = s.muscles
+            row[prefix + "face_up"] = s.face_up if s.card is not None else None
+        row[side + "_money"] = p.tokens.reserve_money
+        row[side + "_otboy"] = p.tokens.otboy
+        row[side + "_hand"] = len(p.hand)
+    row["deck"] = len(state.deck)
+    row["shelf"] = len(state.shelf)
+    return row
+
+
+def play_recorded(base: BaseCatalog, seed: int, policies: Sequence[str], turns: int,
+                  game: int = 0) -> List[Dict[str, Any]]:
+    """Play one game between `policies` (P1, P2) and return its rows."""
+    state = setup_state(base, seed)
+    ctx = Ctx(state=state, log=[], log_level=OFF)
+    bots = {pid: reproducible_policy(name, seed * 2 + i) for i, (pid, name) in enumerate(zip(("P1", "P2"), policies))}
+    rows: List[Dict[str, Any]] = []
+
+    def on_action(st, action):
+        row = {"game": game, "seed": seed, "step": len(rows), "player": st.active_player,
+               "turn": st.turn_number}
+        row.update(_position(st))
+        row["action_kind"] = action.kind
+        row["action"] = json.dumps(action.model_dump(exclude_none=True), sort_keys=True, separators=(",", ":"))
+        row["legal_count"] = len(legal_actions(st))
+        rows.append(row)
+
+    try:
+        res = play_game(state, bots, max_turns=turns, ctx=ctx, apply=specialize(state.config),
+                        stalemate=StalemateDetector(), on_action=on_action)
+    finally:
+        for b in bots.values():
+            b.close()
+    winner = res["winner"]
+    for row in rows:
+        row["winner"] = winner
+        row["win_reason"] = res["win_reason"] or "turn_limit"
+        row["result"] = 0.0 if winner is None else (1.0 if winner == row["player"] else -1.0)
+        row["game_length"] = len(rows)
+    return rows
+
+
+# --- Shards -------------------------------------------------------------------------
+
+def shard_name(index: int) -> str:
+    return f"shard-{index:05d}.kpcol"
+
+
+def write_shard(base: BaseCatalog, out_dir: str | Path, index: int, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Play and write shard `index`; returns its manifest entry."""
+    first = params["games_per_shard"] * index
+    last = min(params["games"], first + params["games_per_shard"])
+    path = Path(out_dir) / shard_name(index)
+    tmp = path.with_name(path.name + ".tmp")
+    schema = params["schema"]
+    rows = 0
+    with ColumnarWriter(tmp, schema=schema, row_group_size=params["row_group_size"],
+                        metadata={"shard": index, "games": [first, last]}) as writer:
+        for game in range(first, last):
+            game_rows = play_recorded(base, params["seed"] + game, params["policies"], params["turns"], game)
+            writer.extend(game_rows)
+            rows += len(game_rows)
+    os.replace(tmp, path)
+    return {"index": index, "file": path.name, "games": [first, last], "rows": rows,
+            "bytes": path.stat().st_size}
+
+
+_worker_base: Optional[BaseCatalog] = None
+
+
+def _init_worker(config: str) -> None:
+    global _worker_base
+    _worker_base = load_base(config)
+
+
+def _shard_worker(args) -> Dict[str, Any]:
+    out_dir, index, params = args
+    return write_shard(_worker_base, out_dir, index, params)
+
+
+def _write_manifest(out_dir: Path, manifest: Dict[str, Any]) -> None:
+    tmp = out_dir / (MANIFEST + ".tmp")
+    tmp.write_text(json.dumps(manifest, indent=1))
+    os.replace(tmp, out_dir / MANIFEST)
+
+
+def read_manifest(out_dir: str | Path) -> Optional[Dict[str, Any]]:
+    path = Path(out_dir) / MANIFEST
+    return json.loads(path.read_text()) if path.exists() else None
+
+
+def generate(out_dir: str | Path, games: int, policies: Sequence[str] = ("greedy", "greedy"),
+             config: str = "config/default.yaml", turns: int = 60, seed: int = 1,
+             games_per_shard: int = 500, workers: int = 1, row_group_size: int = ROW_GROUP_SIZE) -> Dict[str, Any]:
+    """Generate (or resume) a dataset in `out_dir`; returns the final manifest."""
+    for name in policies:
+        if name not in POLICIES:
+            raise ValueError(f"Unknown policy: {name}")
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    base = load_base(config)
+    slots = len(setup_state(base, seed).players["P1"].slots)
+    params = {
+        "games": games, "games_per_shard": games_per_shard, "seed": seed, "turns": turns,
+        "policies": list(policies), "row_group_size": row_group_size,
+        "schema": record_schema(slots),
+    }
+    identity = {
+        "config": config_hash(base),
+        "engine": engine_fingerprint(),
+        "policies": [policy_id(p) for p in policies],
+        "stalemate": StalemateDetector().params(),
+    }
+    manifest = read_manifest(out_dir)
+    if manifest is not None:
+        if (manifest.get("format") != FORMAT or manifest.get("params") != params
+                or manifest.get("identity") != identity):
+            raise ValueError(f"{out_dir} holds a dataset with other parameters; use a new directory")
+    else:
+        manifest = {"format": FORMAT, "params": params, "identity": identity, "shards": [], "complete": False}
+        _write_manifest(out_dir, manifest)
+
+    n_shards = (games + games_per_shard - 1) // games_per_shard
+    done = {s["index"] for s in manifest["shards"] if (out_dir / s["file"]).exists()}
+    manifest["shards"] = [s for s in manifest["shards"] if s["index"] in done]
+    pending = [i for i in range(n_shards) if i not in done]
+
+    def finished(entry: Dict[str, Any]) -> None:
+        manifest["shards"].append(entry)
+        manifest["shards"].sort(key=lambda s: s["index"])
+        manifest["complete"] = len(manifest["shards"]) == n_shards
+        _write_manifest(out_dir, manifest)
+
+    if workers <= 1 or len(pending) <= 1:
+        for i in pending:
+            finished(write_shard(base, out_dir, i, params))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+            futures = [pool.submit(_shard_worker, (str(out_dir), i, params)) for i in pending]
+            for fut in as_completed(futures):
+                finished(fut.result())
+    manifest["complete"] = len(manifest["shards"]) == n_shards
+    _write_manifest(out_dir, manifest)
+    return manifest
+
+
+def read_dataset(out_dir: str | Path, columns: Optional[Sequence[str]] = None, filters=None) -> Iterator[Dict[str, Any]]:
+    """Rows of every finished shard, in game order."""
+    manifest = read_manifest(out_dir)
+    if manifest is None:
+        raise FileNotFoundError(f"No {MANIFEST} in {out_dir}")
+    for shard in manifest["shards"]:
+        yield from ColumnarReader(Path(out_dir) / shard["file"]).rows(columns, filters=filters)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a sharded self-play dataset (resumable)")
+    parser.add_argument("--out", required=True, help="Output directory (rerun to resume)")
+    parser.add_argument("--config", default="config/default.yaml")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--games-per-shard", type=int, default=500)
+    parser.add_argument("--p1", default="greedy", choices=sorted(POLICIES))
+    parser.add_argument("--p2", default="greedy", choices=sorted(POLICIES))
+    parser.add_argument("--turns", type=int, default=60, help="Max actions per game")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=1)
+    args = parser.parse_args()
+
+    manifest = generate(args.out, args.games, (args.p1, args.p2), config=args.config, turns=args.turns,
+                        seed=args.seed, games_per_shard=args.games_per_shard, workers=args.workers)
+    rows = sum(s["rows"] for s in manifest["shards"])
+    size = sum(s["bytes"] for s in manifest["shards"])
+    print(f"{len(manifest['shards'])} shards, {rows} rows, {size / 1e6:.1f} MB in {args.out}"
+          f"{'' if manifest['complete'] else ' (incomplete)'}")
+
+
+if __name__ == "__main__":
+    main()
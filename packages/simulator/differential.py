@@ -0,0 +1,238 @@
+"""
+Differential fuzzer for the two reducers.
+
+`engine.apply_action` (dict results) and
+`engine_refactored.apply_action_refactored` (a handler object per action,
+pydantic `ActionResult`) are meant to implement the same rules. This harness
+plays random legal action sequences and, before every action, forks the
+state and runs each reducer on its own copy:
+
+- results are normalized to (error, winner, win_reason);
+- the refactored reducer stops at the resolution phase, so the harness
+  finishes its turn with the engine's own end-of-turn step (boss check,
+  economic collapse, `next_turn`) before the states are compared;
+- the states are compared with `model_dump()`; the first differing paths
+  are kept as an example.
+
+Every action is classified per kind as `agree`, `diverge` (different result
+or state), `error` (the refactored reducer raised) or `unsupported` (it
+returned phase "unknown"). The sequence always continues on the generic
+reducer's state, so one divergence does not derail the rest of the game.
+Both reducers are timed per action kind on the actions they agree on (the
+reducer call only: forks, dumps and turn completion are not counted), so a
+refactored handler that raises or does nothing cannot look fast.
+
+    python -m packages.simulator.differential --games 1000 --actions 200
+"""
+
+from __future__ import annotations
+import argparse
+import json
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from packages.engine import engine as generic
+from packages.engine import engine_refactored as refactored
+from packages.engine.eventlog import OFF
+from packages.engine.legal import legal_actions
+from packages.engine.models import GameState, TurnPhase
+from packages.simulator.balance import BaseCatalog, _place_starters, load_base, new_state
+
+OUTCOMES = ("agree", "diverge", "error", "unsupported")
+
+MAX_EXAMPLES = 20
+MAX_PATHS = 5
+
+
+@dataclass
+class KindStats:
+    """Outcomes for one action kind; reducer timings cover agreeing actions only."""
+    count: int = 0
+    outcomes: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(OUTCOMES, 0))
+    generic_seconds: float = 0.0
+    refactored_seconds: float = 0.0
+
+    def rate(self, seconds: float) -> float:
+        """Actions per second over the agreeing actions (0 if there were none)."""
+        return self.outcomes["agree"] / seconds if seconds > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            **self.outcomes,
+            "generic_per_s": self.rate(self.generic_seconds),
+            "refactored_per_s": self.rate(self.refactored_seconds),
+        }
+
+
+@dataclass
+class Report:
+    games: int = 0
+    actions: int = 0
+    kinds: Dict[str, KindStats] = field(default_factory=dict)
+    # First divergences/errors: seed, step, action, reason, differing paths
+    examples: List[Dict[str, Any]] = field(default_factory=list)
+
+    def total(self, outcome: str) -> int:
+        return sum(k.outcomes[outcome] for k in self.kinds.values())
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "games": self.games,
+            "actions": self.actions,
+            **{o: self.total(o) for o in OUTCOMES},
+            "kinds": {name: k.as_dict() for name, k in sorted(self.kinds.items())},
+            "examples": self.examples,
+        }
+
+
+def start_state(base: BaseCatalog, seed: int) -> GameState:
+    """Seeded opening position from the catalog (starters placed, random first player)."""
+    state = new_state(base)
+    state.seed = seed
+    _place_starters(state, base.cfg, base.catalog)
+    state.active_player = random.Random(seed).choice(sorted(state.players))
+    generic.initialize_game(state)
+    return state
+
+
+def _result(res) -> tuple:
+    if isinstance(res, dict):
+        return (res.get("error", ""), res.get("winner", ""), res.get("win_reason", ""))
+    return (res.error, res.winner, res.win_reason)
+
+
+def _finish_turn(state: GameState) -> Dict:
+    """The engine's end of turn for a state left in the resolution phase."""
+    ap = state.get_player(state.active_player)
+    op = state.get_player(state.opponent_id())
+    boss_dead = any(s.card and s.card.type == "boss" and s.card.hp <= 0 for s in op.slots)
+    state.phase = TurnPhase.end
+    if generic._economic_collapse_check(ap):
+        return {"winner": state.opponent_id(), "win_reason": "economic_collapse"}
+    if boss_dead:
+        return {"winner": state.active_player, "win_reason": "boss_killed"}
+    generic.next_turn(generic.Ctx(state=state, log_level=OFF))
+    return {}
+
+
+def _diff(a: Any, b: Any, path: str, out: List[str]) -> None:
+    if len(out) >= MAX_PATHS or a == b:
+        return
+    if isinstance(a, dict) and isinstance(b, dict):
+        for key in sorted(set(a) | set(b), key=str):
+            _diff(a.get(key), b.get(key), f"{path}.{key}" if path else str(key), out)
+    elif isinstance(a, list) and isinstance(b, list) and len(a) == len(b):
+        for i, (x, y) in enumerate(zip(a, b)):
+            _diff(x, y, f"{path}[{i}]", out)
+    else:
+        out.append(path or "<root>")
+
+
+def _compare(state: GameState, action, report: Report, seed: int, step: int) -> Optional[GameState]:
+    """Run both reducers on forks of `state`; returns the generic result state
+    (None once the game is won)."""
+    kind = report.kinds.setdefault(action.kind, KindStats())
+    kind.count += 1
+    report.actions += 1
+
+    expected_ctx = generic.Ctx(state=state.fork(), log_level=OFF)
+    t0 = time.perf_counter()
+    expected = generic.apply_action(expected_ctx, action)
+    generic_seconds = time.perf_counter() - t0
+
+    actual_ctx = refactored.Ctx(state=state.fork())
+    reason = ""
+    paths: List[str] = []
+    t0 = time.perf_counter()
+    try:
+        actual = refactored.apply_action_refactored(actual_ctx, action)
+    except Exception as e:
+        outcome, reason = "error", f"{type(e).__name__}: {e}"
+    else:
+        refactored_seconds = time.perf_counter() - t0
+        if actual.phase == "unknown":
+            outcome = "unsupported"
+        else:
+            if not actual.error and actual_ctx.state.phase == TurnPhase.resolution:
+                finished = _finish_turn(actual_ctx.state)
+                actual = actual.model_copy(update=finished)
+            if _result(actual) != _result(expected):
+                reason = f"result {_result(actual)} != {_result(expected)}"
+            _diff(actual_ctx.state.model_dump(), expected_ctx.state.model_dump(), "", paths)
+            outcome = "diverge" if reason or paths else "agree"
+
+    kind.outcomes[outcome] += 1
+    if outcome == "agree":
+        kind.generic_seconds += generic_seconds
+        kind.refactored_seconds += refactored_seconds
+    if outcome in ("diverge", "error") and len(report.examples) < MAX_EXAMPLES:
+        report.examples.append({
+            "seed": seed, "step": step, "action": action.model_dump(),
+            "outcome": outcome, "reason": reason or "state", "paths": paths,
+        })
+    return expected_ctx.state if "winner" not in expected else None
+
+
+def fuzz_game(state: GameState, seed: int, actions: int, report: Report) -> None:
+    """Play up to `actions` random legal actions from `state`, comparing every one."""
+    rng = random.Random(seed)
+    report.games += 1
+    for step in range(actions):
+        action = rng.choice(legal_actions(state))
+        state = _compare(state, action, report, seed, step)
+        if state is None:
+            return
+
+
+def run(games: int, actions: int = 200, seed: int = 1, base: Optional[BaseCatalog] = None,
+        make_state: Optional[Callable[[int], GameState]] = None) -> Report:
+    """Fuzz `games` games of up to `actions` actions with seeds seed..seed+games-1.
+
+    Start positions come from `make_state(seed)`, or `start_state(base, seed)`.
+    """
+    if make_state is None:
+        base = base or load_base("config/default.yaml")
+        make_state = lambda s: start_state(base, s)
+    report = Report()
+    for s in range(seed, seed + games):
+        fuzz_game(make_state(s), s, actions, report)
+    return report
+
+
+def print_report(report: Report) -> None:
+    print(f"Differential fuzz: {report.games} games, {report.actions} actions")
+    print("  " + ", ".join(f"{o}={report.total(o)}" for o in OUTCOMES))
+    print(f"  {'kind':<12}{'count':>8}{'agree':>8}{'diverge':>9}{'error':>7}{'unsupp':>8}"
+          f"{'generic/s':>12}{'refact/s':>12}  (rates over agreeing actions)")
+    for name, k in sorted(report.kinds.items()):
+        o = k.outcomes
+        rates = (f"{k.rate(k.generic_seconds):>12.0f}{k.rate(k.refactored_seconds):>12.0f}"
+                 if o["agree"] else f"{'-':>12}{'-':>12}")
+        print(f"  {name:<12}{k.count:>8}{o['agree']:>8}{o['diverge']:>9}{o['error']:>7}{o['unsupported']:>8}"
+              + rates)
+    for ex in report.examples[:5]:
+        print(f"  seed={ex['seed']} step={ex['step']} {ex['action']['kind']}: "
+              f"{ex['outcome']} ({ex['reason']}) {', '.join(ex['paths'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare engine.apply_action with engine_refactored on random games")
+    parser.add_argument("--config", default="config/default.yaml")
+    parser.add_argument("--games", type=int, default=100)
+    parser.add_argument("--actions", type=int, default=200, help="Max actions per game")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", default="", help="Write the full report (all kinds, examples) here")
+    args = parser.parse_args()
+
+    report = run(args.games, args.actions, args.seed, base=load_base(args.config))
+    print_report(report)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report.as_dict(), f, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Pairwise duel table for the card catalog.
+
+One duel is one exchange of `GameSimulator.combat_phase`: each side deals its
+ATK minus the other side's shields (never below zero). Card stats are static,
+so for every (attacker, defender, attacker shields, defender shields) the
+exchange is precomputed once:
+
+    damage to defender, damage to attacker, outcome at full HP
+
+Outcomes: NONE (both survive), KILL (defender dies), DIES (attacker dies),
+TRADE (both die). Lookups are O(1) list indexing.
+
+Tables are built lazily and shared: `get_table(stats)` keys them by the
+catalog's (id, hp, atk) signature, so editing a card produces a new table on
+the next lookup and unchanged catalogs reuse the existing one.
+
+For designers the table exports as a long-format CSV (one row per attacker /
+defender / shield combination), ready to pivot into a heatmap:
+
+    python -m packages.simulator.duel_table --cards config/cards.csv --out duels.csv
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import math
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+NONE, KILL, DIES, TRADE = 0, 1, 2, 3
+OUTCOMES = ("none", "kill", "dies", "trade")
+
+CardStats = Tuple[str, float, float]  # (id, hp, atk)
+
+_TABLES: "OrderedDict[tuple, DuelTable]" = OrderedDict()
+_MAX_TABLES = 8
+
+
+class DuelTable:
+    """Precomputed exchanges for every pair of cards and shield counts 0..max_shields.
+
+    Larger shield counts are clamped to `max_shields`. The default (highest ATK
+    in the catalog, rounded up) keeps clamping exact: from there on no card
+    gets through the shields.
+    """
+
+    def __init__(self, stats: Sequence[CardStats], max_shields: Optional[int] = None):
+        if max_shields is None:
+            max_shields = max((math.ceil(atk) for _, _, atk in stats), default=0)
+        self.ids = [cid for cid, _, _ in stats]
+        self.index: Dict[str, int] = {cid: i for i, cid in enumerate(self.ids)}
+        self.hp = [hp for _, hp, _ in stats]
+        self.atk = [atk for _, _, atk in stats]
+        self.max_shields = max_shields
+        s = max_shields + 1
+        self._s = s
+        self._n = n = len(stats)
+        # Flat arrays indexed by ((a * n + d) * s + a_sh) * s + d_sh
+        self._to_def: List[float] = []
+        self._to_att: List[float] = []
+        self._outcome: List[int] = []
+        for a in range(n):
+            for d in range(n):
+                for a_sh in range(s):
+                    to_att = max(0, self.atk[d] - a_sh)
+                    for d_sh in range(s):
+                        to_def = max(0, self.atk[a] - d_sh)
+                        killed = to_def >= self.hp[d]
+                        died = to_att >= self.hp[a]
+                        self._to_def.append(to_def)
+                        self._to_att.append(to_att)
+                        self._outcome.append((KILL if killed else NONE) | (DIES if died else NONE))
+
+    def __len__(self) -> int:
+        return len(self._outcome)
+
+    def _pos(self, attacker: str, defender: str, attacker_shields: int, defender_shields: int) -> int:
+        s = self._s
+        a_sh = min(max(0, attacker_shields), s - 1)
+        d_sh = min(max(0, defender_shields), s - 1)
+        return ((self.index[attacker] * self._n + self.index[defender]) * s + a_sh) * s + d_sh
+
+    def exchange(self, attacker: str, defender: str, attacker_shields: int = 0,
+                 defender_shields: int = 0) -> Tuple[float, float]:
+        """(damage to defender, damage to attacker) for one exchange."""
+        i = self._pos(attacker, defender, attacker_shields, defender_shields)
+        return self._to_def[i], self._to_att[i]
+
+    def outcome(self, attacker: str, defender: str, attacker_shields: int = 0,
+                defender_shields: int = 0) -> int:
+        """Outcome code (NONE/KILL/DIES/TRADE) of one exchange at full HP."""
+        return self._outcome[self._pos(attacker, defender, attacker_shields, defender_shields)]
+
+    def rows(self) -> Iterable[dict]:
+        """Long-format records: one per attacker/defender/shield combination."""
+        s = self._s
+        i = 0
+        for a in self.ids:
+            for d in self.ids:
+                for a_sh in range(s):
+                    for d_sh in range(s):
+                        yield {
+                            "attacker": a,
+                            "defender": d,
+                            "attacker_shields": a_sh,
+                            "defender_shields": d_sh,
+                            "damage_to_defender": self._to_def[i],
+                            "damage_to_attacker": self._to_att[i],
+                            "outcome": OUTCOMES[self._outcome[i]],
+                        }
+                        i += 1
+
+    def write_csv(self, path: str | Path) -> int:
+        """Export for heatmaps (pivot attacker × defender on any column); returns rows written."""
+        fields = ["attacker", "defender", "attacker_shields", "defender_shields",
+                  "damage_to_defender", "damage_to_attacker", "outcome"]
+        count = 0
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=fields)
+            w.writeheader()
+            for row in self.rows():
+                w.writerow(row)
+                count += 1
+        return count
+
+
+def get_table(stats: Iterable[CardStats], max_shields: Optional[int] = None) -> DuelTable:
+    """Shared table for this catalog signature, built on first use."""
+    key = (tuple(stats), max_shields)
+    table = _TABLES.get(key)
+    if table is None:
+        table = _TABLES[key] = DuelTable(key[0], max_shields)
+        if len(_TABLES) > _MAX_TABLES:
+            _TABLES.popitem(last=False)
+    else:
+        _TABLES.move_to_end(key)
+    return table
+
+
+def main():
+    from packages.engine.loader import load_cards_from_csv
+
+    ap = argparse.ArgumentParser(description="Export the pairwise card duel table")
+    ap.add_argument("--cards", type=str, default="config/cards.csv")
+    ap.add_argument("--out", type=str, default="duels.csv")
+    ap.add_argument("--max-shields", type=int, help="Default: highest ATK in the catalog")
+    args = ap.parse_args()
+
+    cards = [c for c in load_cards_from_csv(args.cards) if c.type not in ("event", "token")]
+    table = get_table(((c.id, c.hp, c.atk) for c in cards), args.max_shields)
+    n = table.write_csv(args.out)
+    print(f"Wrote {n} duels for {len(cards)} cards to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Exact solver for small endgames.
+
+Apart from deck order the engine is deterministic, so a position with a known
+deck can be searched exhaustively: negamax over `legal_actions` with a
+transposition table. The result is ground truth for bot evaluation and for
+balance claims ("this board is a forced win for P1").
+
+Scope and semantics:
+
+- Values are from the side to move: WIN, LOSS or DRAW, where DRAW means that
+  neither side can force a win within `max_plies` actions (the game itself has
+  no turn limit, so an exact answer needs a horizon). Every action except a
+  paid ability (`UseAbility`) ends the turn, so plies are close to turns.
+- The deck order is taken from the state (known deck). A draw from an empty
+  deck would reshuffle the shelf — a chance node — so such moves are not
+  searched.
+
+Positions are memoized under a canonical encoding packed into one int: the
+rules (an interned index of the GameConfig), active player, micro-bribe flag,
+and per player hand limit, reserve money, otboy, cascade count, paid ability
+uses this turn, every slot (card, HP, muscles), the hand; then deck and shelf
+in order. Cards
+are interned to small indexes, HP at or below zero is stored as zero (the
+rules treat every dead card alike), and the discard pile, log and face-up
+flags are left out because no rule reads them. A typical endgame key is a
+few dozen bytes and a table entry well under 150 bytes, so millions of
+positions fit in RAM; `max_positions` caps the table (the search stays exact,
+it only re-searches what it could not store).
+"""
+
+from __future__ import annotations
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from packages.engine.engine import Ctx, apply_action, rollback
+from packages.engine.eventlog import OFF
+from packages.engine.legal import legal_actions
+from packages.engine.actions import Action, Draw
+from packages.engine.models import Card, GameConfig, GameState
+
+WIN, DRAW, LOSS = 1, 0, -1
+RESULTS = {WIN: "win", DRAW: "draw", LOSS: "loss"}
+
+CARD_BITS = 10
+HP_BITS = 8
+MUSCLE_BITS = 6
+MONEY_BITS = 8
+CASCADE_BITS = 3
+ZONE_BITS = 8
+ABILITY_BITS = 8
+USES_BITS = 4
+PLY_BITS = 8
+CONFIG_BITS = 6
+
+
+@dataclass
+class Solution:
+    """Value of a position for the side to move and the moves that achieve it."""
+    value: int
+    best_moves: List[Action]
+    max_plies: int
+    nodes: int = 0
+    positions: int = 0
+
+    @property
+    def result(self) -> str:
+        return RESULTS[self.value]
+
+
+@dataclass
+class EndgameSolver:
+    """Negamax with a transposition table over canonical position keys.
+
+    One solver can be reused across related positions: the table (and the card
+    index) carry over, so solving many positions from the same endgame is
+    cheaper than solving each from scratch. Keys include the rules and hand
+    limits, so positions under other configs never share entries.
+    """
+    max_plies: int = 12
+    max_positions: Optional[int] = None
+    table: Dict[int, int] = field(default_factory=dict)
+    nodes: int = 0
+    _cards: Dict[Tuple, int] = field(default_factory=dict)
+    _abilities: Dict[str, int] = field(default_factory=dict)
+    _configs: Dict[str, int] = field(default_factory=dict)
+    _last_config: Optional[Tuple[GameConfig, int]] = None
+
+    # --- Encoding -----------------------------------------------------------
+
+    def _card_index(self, card: Card) -> int:
+        sig = (card.id, card.atk, card.d, str(card.type))
+        idx = self._cards.get(sig)
+        if idx is None:
+            idx = self._cards[sig] = len(self._cards)
+            if idx >= 1 << CARD_BITS:
+                raise ValueError("too many distinct cards for the endgame encoding")
+        return idx
+
+    def _config_index(self, config: GameConfig) -> int:
+        last = self._last_config
+        if last is not None and last[0] == config:  # a private copy: in-place edits do not fool it
+            return last[1]
+        sig = repr(sorted(config.model_dump().items()))
+        idx = self._configs.get(sig)
+        if idx is None:
+            idx = self._configs[sig] = len(self._configs)
+            if idx >= 1 << CONFIG_BITS:
+                raise ValueError("too many distinct configs for the endgame encoding")
+        self._last_config = (config.model_copy(deep=True), idx)
+        return idx
+
+    def encode(self, state: GameState) -> int:
+        """Canonical position key (see module docstring)."""
+        key = 1  # leading 1 keeps leading zero fields significant
+
+        def put(value: int, bits: int) -> None:
+            nonlocal key
+            if not 0 <= value < 1 << bits:
+                raise ValueError(f"value {value} does not fit the endgame encoding ({bits} bits)")
+            key = (key << bits) | value
+
+        def put_cards(cards: List[Card]) -> None:
+            put(len(cards), ZONE_BITS)
+            for c in cards:
+                put(self._card_index(c), CARD_BITS)
+                put(max(0, c.hp), HP_BITS)
+
+        put(self._config_index(state.config), CONFIG_BITS)
+        put(state.active_player == "P2", 1)
+        put(bool(state.flags.get("micro_bribe_used", False)), 1)
+        for pid in ("P1", "P2"):
+            p = state.players[pid]
+            put(p.hand_limit, ZONE_BITS)
+            put(p.tokens.reserve_money, MONEY_BITS)
+            put(p.tokens.otboy, MONEY_BITS)
+            put(p.cascade_triggers, CASCADE_BITS)
+            uses = sorted((k, n) for k, (turn, n) in p.ability_uses.items() if turn == state.turn_number)
+            put(len(uses), USES_BITS)
+            for k, n in uses:
+                put(self._abilities.setdefault(k, len(self._abilities)), ABILITY_BITS)
+                put(n, USES_BITS)
+            put(len(p.slots), 4)
+            for s in p.slots:
+                if s.card is None:
+                    put(0, 1)
+                    continue
+                put(1, 1)
+                put(self._card_index(s.card), CARD_BITS)
+                put(max(0, s.card.hp), HP_BITS)
+                put(s.muscles, MUSCLE_BITS)
+            put_cards(p.hand)
+        put_cards(state.deck)
+        put_cards(state.shelf)
+        return key
+
+    # --- Search -------------------------------------------------------------
+
+    @staticmethod
+    def moves(state: GameState) -> List[Action]:
+        """Legal moves without chance nodes (shelf reshuffles)."""
+        actions = legal_actions(state)
+        if state.deck:
+            return list(actions)
+        return [a for a in actions if not isinstance(a, Draw)]
+
+    def _negamax(self, ctx: Ctx, plies: int) -> int:
+        if plies == 0:
+            return DRAW
+        st = ctx.state
+        key = (self.encode(st) << PLY_BITS) | plies
+        cached = self.table.get(key)
+        if cached is not None:
+            return cached
+        self.nodes += 1
+        mover = st.active_player
+        best = LOSS
+        for action in self.moves(st):
+            res = apply_action(ctx, action, record_undo=True)
+            if "error" in res:
+                rollback(ctx)
+                continue
+            if "winner" in res:
+                value = WIN if res["winner"] == mover else LOSS
+            else:
+                value = -self._negamax(ctx, plies - 1)
+            rollback(ctx)
+            if value > best:
+                best = value
+                if best == WIN:
+                    break
+        if self.max_positions is None or len(self.table) < self.max_positions:
+            self.table[key] = best
+        return best
+
+    def solve(self, state: GameState, max_plies: Optional[int] = None) -> Solution:
+        """Exact value of `state` for the side to move within `max_plies` actions.
+
+        The state is searched on a fork and left unchanged. `best_moves` are
+        all moves reaching the value; for wins, searching with increasing
+        horizons (`solve_fastest`) yields the quickest ones.
+        """
+        plies = self.max_plies if max_plies is None else max_plies
+        if plies >= 1 << PLY_BITS:
+            raise ValueError(f"max_plies must be below {1 << PLY_BITS}")
+        ctx = Ctx.model_construct(state=state.fork(), log=[], undo=[], log_level=OFF)
+        mover = state.active_player
+        nodes_before = self.nodes
+        scored: List[Tuple[int, Action]] = []
+        for action in self.moves(ctx.state) if plies > 0 else []:
+            res = apply_action(ctx, action, record_undo=True)
+            if "error" in res:
+                rollback(ctx)
+                continue
+            if "winner" in res:
+                value = WIN if res["winner"] == mover else LOSS
+            else:
+                value = -self._negamax(ctx, plies - 1)
+            rollback(ctx)
+            scored.append((value, action))
+        value = max((v for v, _ in scored), default=DRAW if plies == 0 else LOSS)
+        return Solution(
+            value=value,
+            best_moves=[a for v, a in scored if v == value],
+            max_plies=plies,
+            nodes=self.nodes - nodes_before,
+            positions=len(self.table),
+        )
+
+    def solve_fastest(self, state: GameState, max_plies: Optional[int] = None) -> Solution:
+        """`solve` at the shortest horizon where the result is decided.
+
+        A win comes back with only the fastest winning moves (the horizon is in
+        `Solution.max_plies`); undecided positions are solved at the full horizon.
+        """
+        limit = self.max_plies if max_plies is None else max_plies
+        for plies in range(1, limit + 1):
+            solution = self.solve(state, plies)
+            if solution.value != DRAW:
+                return solution
+        return self.solve(state, limit)
@@ -0,0 +1,178 @@
+"""
+Адаптер GameSimulator → настоящий движок (packages/engine).
+
+Матчап кланов играется по правилам движка: урон сначала сжигает мускулы,
+защита ограничена квотой (D + extra_defense + authority), on-enter эффекты,
+каскад, экономический крах и победа убийством Босса. Правила живут в одном
+месте — в `engine.apply_action` (адаптер берёт его вариант, специализированный
+под правила конфига); адаптер только раздаёт колоды и выбирает ходы.
+
+Быстрый путь (игр в турнире — тысячи):
+- карты колод — общие шаблоны `engine.models.Card` с уже разобранными `abl`;
+  партия помечает их copy-on-write (`GameState._owned`), поэтому копируется
+  только раненая карта, а не колода целиком;
+- пустое состояние с правилами и игроками строится один раз и форкается;
+- ходы строятся через `model_construct`, без валидации pydantic, и выбираются
+  эвристикой напрямую, без перебора `legal_actions`;
+- у каждого игрока своя колода (`engine.zones.Zone`, взятие верхней карты
+  за O(1)): перед ходом `state.deck` указывает на колоду активного игрока
+  (движок берёт карту из `state.deck`).
+"""
+
+import random
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path for engine imports
+sys.path.append(str(Path(__file__).parent.parent))
+from engine.engine import Ctx, initialize_game
+from engine.eventlog import OFF
+from engine.specialize import specialize
+from engine.actions import Action, Attack, Defend, DiscardCard, Draw, Influence
+from engine.legal import hire_caps
+from engine.loader import build_state_from_config
+from engine.models import Card as EngineCard, GameState, Slot
+from engine.zones import Zone
+from simulator.stalemate import StalemateDetector, engine_keys
+
+_PASS = Influence.model_construct()
+
+
+class EngineAdapter:
+    """Играет партии GameSimulator через `engine.apply_action`.
+
+    config: YAML-конфиг игры (правила и hand_limit; стартовые карты не нужны —
+    каждый клан играет своим Боссом). bosses: Босс каждого клана по имени клана;
+    клан без своего Босса получает копию первого Босса каталога (по id), чтобы
+    у обеих сторон было одинаковое условие поражения.
+    max_turns: предел раундов (раунд — ход каждого игрока), после него ничья.
+    stalemate: партия с повторившейся позицией или без изменений карт надолго
+    сразу заканчивается ничьей (win_reason 'repetition' / 'no_progress',
+    см. simulator/stalemate.py).
+    """
+
+    def __init__(self, config: Dict[str, Any], bosses: Dict[str, EngineCard],
+                 max_turns: int = 20, stalemate: bool = True):
+        self.bosses = bosses
+        self.max_turns = max_turns
+        self.stalemate = stalemate
+        self._stand_in = bosses[min(bosses)] if bosses else None
+        self._template = build_state_from_config(config, [])
+        # Редьюсер, скомпилированный под правила конфига (см. engine.specialize)
+        self._apply = specialize(self._template.config)
+
+    def boss_for(self, clan: str) -> Optional[EngineCard]:
+        return self.bosses.get(clan, self._stand_in)
+
+    def new_state(self, clan1: str, clan2: str) -> GameState:
+        """Начальная позиция: Босс в первом слоте, рука пуста.
+
+        Карты из руки движок не разыгрывает, а рука в пределе hand_limit
+        занимает места доски — поэтому вся колода остаётся в колоде.
+        """
+        st = self._template.fork()
+        st.deck = []
+        for pid, clan in (('P1', clan1), ('P2', clan2)):
+            p = st.players[pid]
+            boss = self.boss_for(clan)
+            if boss is not None:
+                p.slots[0] = Slot.model_construct(card=boss, face_up=True, muscles=0)
+        # Первый ход — случайный, чтобы не было систематического перекоса в пользу P1
+        st.active_player = random.choice(('P1', 'P2'))
+        initialize_game(st)
+        return st
+
+    def play(self, clan1: str, clan2: str, deck1: List[EngineCard], deck2: List[EngineCard]) -> Dict[str, Any]:
+        """Одна партия; карты колод не изменяются (copy-on-write)."""
+        st = self.new_state(clan1, clan2)
+        decks = {'P1': Zone(deck1), 'P2': Zone(deck2)}
+        ctx = Ctx.model_construct(state=st, log=[], undo=[], log_level=OFF)
+        names = {'P1': f"Player_{clan1}", 'P2': f"Player_{clan2}"}
+        winner, reason = 'Draw', 'turn_limit'
+        detector = StalemateDetector() if self.stalemate else None
+        first = st.active_player
+        actions = 0
+        while actions < 2 * self.max_turns:
+            st.deck = decks[st.active_player]
+            res = self._apply(ctx, self.choose(st))
+            if 'error' in res:
+                # Эвристика не должна предлагать недопустимых ходов; на всякий случай пас
+                res = self._apply(ctx, _PASS)
+            actions += 1
+            if 'winner' in res:
+                winner, reason = names[res['winner']], res.get('win_reason') or 'unknown'
+                break
+            # Раз в раунд (у каждого игрока своя колода — сравниваем при одной и той же)
+            if detector is not None and st.active_player == first:
+                stalled = detector.update(*engine_keys(st))
+                if stalled:
+                    reason = stalled
+                    break
+
+        p1, p2 = st.players['P1'], st.players['P2']
+        return {
+            'winner': winner,
+            'turns': (actions + 1) // 2,
+            'caste1': clan1,
+            'caste2': clan2,
+            'p1_cards_played': len(deck1) - len(decks['P1']),
+            'p2_cards_played': len(deck2) - len(decks['P2']),
+            'p1_final_field': sum(1 for s in p1.slots if s.card is not None and s.card.hp > 0),
+            'p2_final_field': sum(1 for s in p2.slots if s.card is not None and s.card.hp > 0),
+            'win_reason': reason,
+        }
+
+    def choose(self, st: GameState) -> Action:
+        """Ход активного игрока.
+
+        Приоритеты: добить Босса → убить самую опасную карту, которую можно
+        убить → дозащитить Босса → выложить карту из колоды → ударить по Боссу
+        → убрать мёртвую карту → пас. Последняя монета не тратится на патроны:
+        пустой резерв без мускулов — экономический крах.
+        """
+        cfg = st.config
+        ap = st.players[st.active_player]
+        op_id = st.opponent_id()
+        op = st.players[op_id]
+        money = ap.tokens.reserve_money
+
+        attack = None
+        attackers = [(s.card.atk, i) for i, s in enumerate(ap.slots)
+                     if s.card is not None and s.card.hp > 0 and s.card.atk > 0]
+        targets = [(i, s) for i, s in enumerate(op.slots) if s.card is not None and s.card.hp > 0]
+        if attackers and targets:
+            atk, a_slot = max(attackers)
+            max_ammo = max(0, min(cfg.ammo_max_bonus, money - 1))
+            kills = []
+            boss_slot = None
+            for i, s in targets:
+                need = s.muscles + s.card.hp
+                if s.card.type == 'boss':
+                    boss_slot = i
+                if need <= atk + max_ammo:
+                    kills.append((s.card.type == 'boss', s.card.atk, -need, i, need))
+            if kills:
+                _, _, _, t_slot, need = max(kills)
+                return Attack.model_construct(target_player=op_id, target_slot=t_slot,
+                                              ammo_spend=max(0, need - atk), attacker_slot=a_slot)
+            t_slot = boss_slot if boss_slot is not None else min(targets, key=lambda t: t[1].muscles + t[1].card.hp)[0]
+            attack = Attack.model_construct(target_player=op_id, target_slot=t_slot, ammo_spend=0, attacker_slot=a_slot)
+
+        for i, room in hire_caps(ap):
+            card = ap.slots[i].card
+            if card.type == 'boss' and money > 1:
+                return Defend.model_construct(target_slot=i, hire_count=min(room, money - 1))
+
+        free = [i for i, s in enumerate(ap.slots) if s.card is None]
+        if st.deck and free:
+            on_board = sum(1 for s in ap.slots if s.card is not None)
+            if not cfg.hand_enabled or len(ap.hand) + on_board < ap.hand_limit:
+                return Draw.model_construct(place='slot', slot_index=free[0])
+
+        if attack is not None:
+            return attack
+        for i, s in enumerate(ap.slots):
+            if s.card is not None and s.card.hp <= 0:
+                return DiscardCard.model_construct(own_slot=i)
+        return _PASS
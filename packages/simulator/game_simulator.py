@@ -15,8 +15,17 @@ from pathlib import Path
 
 # Add parent directory to path for engine imports
 sys.path.append(str(Path(__file__).parent.parent))
-from engine.loader import load_cards_from_csv
+from engine.config import get_path
+from engine.loader import load_cards_from_csv, load_yaml_config
 from engine.models import Card as EngineCard
+from simulator.engine_adapter import EngineAdapter
+from simulator.duel_table import DuelTable, get_table as get_duel_table
+from simulator.columnar import ColumnarWriter, ColumnarReader
+from simulator.stalemate import StalemateDetector
+from simulator.result_cache import (
+    ResultCache, cache_key, catalog_fingerprint, engine_fingerprint, fingerprint, source_fingerprint,
+)
+import hashlib
 
 class GamePhase(Enum):
     SETUP = "setup"
@@ -41,6 +50,9 @@ class GameCard:
     kills: int = 0
     current_hp: Optional[int] = None
     current_atk: Optional[int] = None
+    # Способности, разобранные один раз (см. compile_abilities); общие для копий карты
+    _compiled: Optional[List[Tuple[Any, int]]] = dataclass_field(default=None, repr=False, compare=False)
+    _authority: Optional[int] = dataclass_field(default=None, repr=False, compare=False)
     
     def __post_init__(self):
         # Initialize current stats from engine card
@@ -69,6 +81,10 @@ class GameCard:
     @property
     def hp(self) -> int:
         return self.current_hp or 0
+
+    @hp.setter
+    def hp(self, value: int) -> None:
+        self.current_hp = value
     
     @property
     def max_hp(self) -> int:
@@ -77,6 +93,10 @@ class GameCard:
     @property
     def atk(self) -> int:
         return self.current_atk or 0
+
+    @atk.setter
+    def atk(self, value: int) -> None:
+        self.current_atk = value
     
     @property
     def base_atk(self) -> int:
@@ -107,10 +127,134 @@ class GameCard:
         elif isinstance(abl, int) and abl > 0:
             return [str(abl)]
         return []
+
+    @property
+    def compiled_abilities(self) -> List[Tuple[Any, int]]:
+        """Способности как пары (обработчик, величина), разбираются один раз"""
+        if self._compiled is None:
+            self._compiled = compile_abilities(self.abilities)
+        return self._compiled
+
+    @property
+    def authority_bonus(self) -> int:
+        """Сумма authority:N карты (для Player.get_total_authority)"""
+        if self._authority is None:
+            self._authority = sum(
+                int(ability.split(':')[1].strip().split()[0]) for ability in self.abilities if 'authority:' in ability
+            )
+        return self._authority
     
+    def clone(self) -> 'GameCard':
+        """Новый экземпляр с тем же шаблоном (engine_card и разобранные способности общие)"""
+        card = copy.copy(self)
+        card.used_abilities = []
+        card.reset()
+        return card
+
+    def reset(self) -> None:
+        """Вернуть изменяемые поля к началу игры, на месте"""
+        self.in_play = False
+        self.shields = 0
+        self.used_abilities.clear()
+        self.turn_played = 0
+        self.kills = 0
+        self.current_hp = self.engine_card.hp
+        self.current_atk = self.engine_card.atk
+
     @classmethod
     def from_engine_card(cls, engine_card: EngineCard) -> 'GameCard':
-        return cls(engine_card=engine_card)
+        card = cls(engine_card=engine_card)
+        # Разбираем способности сразу: копии колод получают готовую таблицу
+        card.compiled_abilities
+        card.authority_bonus
+        return card
+
+
+# Обработчики способностей legacy-модели: (карта, игрок, соперник, величина)
+
+def _ability_steal(card: GameCard, player: 'Player', opponent: 'Player', amount: int) -> None:
+    stolen = min(amount, opponent.money)
+    opponent.money -= stolen
+    player.money += stolen
+
+
+def _ability_gain(card: GameCard, player: 'Player', opponent: 'Player', amount: int) -> None:
+    player.money += amount
+
+
+def _ability_audit(card: GameCard, player: 'Player', opponent: 'Player', amount: int) -> None:
+    opponent.money = max(0, opponent.money - amount)
+
+
+def _ability_shield(card: GameCard, player: 'Player', opponent: 'Player', amount: int) -> None:
+    card.shields += 1
+
+
+def _ability_authority(card: GameCard, player: 'Player', opponent: 'Player', amount: int) -> None:
+    player.authority += amount
+
+
+def _ability_berserker(card: GameCard, player: 'Player', opponent: 'Player', amount: int) -> None:
+    damage_taken = card.max_hp - card.hp
+    card.atk = card.base_atk + damage_taken
+
+
+def _ability_assault(card: GameCard, player: 'Player', opponent: 'Player', amount: int) -> None:
+    card.atk += card.kills
+
+
+def _ability_lethal(card: GameCard, player: 'Player', opponent: 'Player', amount: int) -> None:
+    card.atk += 1  # Дополнительный урон
+
+
+# Порядок проверки как у прежней цепочки elif: (маркеры, обработчик, нужна ли величина)
+_ABILITY_RULES = (
+    (('steal:',), _ability_steal, True),
+    (('gain:', 'economy:'), _ability_gain, True),
+    (('audit:',), _ability_audit, True),
+    (('bribe:', 'extort:'), _ability_shield, False),
+    (('authority:',), _ability_authority, True),
+    (('berserker:',), _ability_berserker, False),
+    (('assault:',), _ability_assault, False),
+    (('lethal:',), _ability_lethal, False),
+)
+
+
+def compile_abilities(abilities: List[str]) -> List[Tuple[Any, int]]:
+    """Строки способностей → список (обработчик, величина); неизвестные пропускаются"""
+    compiled = []
+    for ability in abilities:
+        ability_lower = ability.lower()
+        for markers, handler, needs_amount in _ABILITY_RULES:
+            if any(m in ability_lower for m in markers):
+                amount = int(ability.split(':')[1].strip().split()[0]) if needs_amount else 0
+                compiled.append((handler, amount))
+                break
+    return compiled
+
+class DeckPool:
+    """Переиспользуемые экземпляры карт касты вместо deepcopy на каждую игру.
+
+    Шаблоны (карты каталога) не меняются. Пул держит два набора их копий и
+    раздаёт наборы по очереди, сбрасывая изменяемые поля на месте, так что две
+    колоды одной игры (в том числе в зеркальном матчапе) не делят экземпляры.
+    Колода остаётся в силе, пока пул не раздал ещё две колоды.
+    """
+
+    def __init__(self, templates: List[GameCard]):
+        self.templates = templates
+        self._sets = [{id(t): t.clone() for t in templates} for _ in range(2)]
+        self._next = 0
+
+    def deal(self, cards: List[GameCard]) -> List[GameCard]:
+        """Экземпляры для выбранных шаблонов, в том же порядке"""
+        instances = self._sets[self._next]
+        self._next ^= 1
+        deck = [instances[id(t)] for t in cards]
+        for card in deck:
+            card.reset()
+        return deck
+
 
 @dataclass
 class Player:
@@ -123,6 +267,8 @@ class Player:
     money: int = 3
     authority: int = 0
     corruption_resistance: bool = False
+    # Сумма authority карт на поле; обновляется в play_card и remove_from_field
+    field_authority: int = 0
     
     def draw_card(self) -> Optional[GameCard]:
         if self.deck:
@@ -138,18 +284,18 @@ class Player:
             card.in_play = True
             card.turn_played = turn
             self.money -= card.price
+            self.field_authority += card.authority_bonus
             return True
         return False
+
+    def remove_from_field(self, card: GameCard) -> None:
+        """Карта погибла: с поля в сброс"""
+        self.field.remove(card)
+        self.graveyard.append(card)
+        self.field_authority -= card.authority_bonus
     
     def get_total_authority(self) -> int:
-        authority = self.authority
-        for card in self.field:
-            if 'authority:' in str(card.abilities):
-                for ability in card.abilities:
-                    if 'authority:' in ability:
-                        auth_val = int(ability.split(':')[1].strip().split()[0])
-                        authority += auth_val
-        return authority
+        return self.authority + self.field_authority
 
 @dataclass
 class GameState:
@@ -170,10 +316,120 @@ class GameState:
     def switch_player(self):
         self.current_player = 2 if self.current_player == 1 else 1
 
+def _legacy_keys(game_state: GameState) -> Tuple[tuple, tuple]:
+    """(позиция, материал) для детектора тупиков: позиция без номера хода,
+    материал — только карты (колода, рука, поле с HP/ATK/щитами, сброс), без денег."""
+    sides = []
+    for p in (game_state.player1, game_state.player2):
+        sides.append((len(p.deck), tuple(c.id for c in p.hand),
+                      tuple((c.id, c.hp, c.atk, c.shields) for c in p.field), len(p.graveyard)))
+    material = tuple(sides)
+    money = tuple((p.money, p.authority) for p in (game_state.player1, game_state.player2))
+    return (game_state.current_player, money, material), material
+
+
+# Типы колонок результата одной игры (см. simulate_game)
+GAME_RESULT_SCHEMA = {
+    'winner': 'str',
+    'turns': 'int',
+    'caste1': 'str',
+    'caste2': 'str',
+    'p1_cards_played': 'int',
+    'p2_cards_played': 'int',
+    'p1_final_field': 'int',
+    'p2_final_field': 'int',
+    'win_reason': 'str',
+}
+
+# Режимы правил GameSimulator: 'engine' — настоящий движок (packages/engine),
+# 'legacy' — прежняя упрощённая модель боя (для сравнения со старыми отчётами)
+RULES = ('engine', 'legacy')
+
+
+class MatchupRun:
+    """Накопитель результатов одного матчапа.
+
+    Считает победы и длину игр на лету. Без writer результаты игр хранятся в
+    памяти списком; с writer (ColumnarWriter) они сразу пишутся на диск, а в
+    detailed_results возвращается ColumnarReader по этому файлу.
+    """
+
+    def __init__(self, caste1: str, caste2: str, writer: Optional[ColumnarWriter] = None):
+        self.caste1 = caste1
+        self.caste2 = caste2
+        self.writer = writer
+        self.results: List[Dict[str, Any]] = []
+        self.wins = {caste1: 0, caste2: 0, 'Draw': 0}
+        self.games = 0
+        self.total_turns = 0
+
+    def add(self, result: Dict[str, Any]) -> None:
+        if result['winner'] == f"Player_{self.caste1}":
+            self.wins[self.caste1] += 1
+        elif result['winner'] == f"Player_{self.caste2}":
+            self.wins[self.caste2] += 1
+        else:
+            self.wins['Draw'] += 1
+        self.games += 1
+        self.total_turns += result['turns']
+        if self.writer is not None:
+            self.writer.append(result)
+        else:
+            self.results.append(result)
+
+    def result(self) -> Dict[str, Any]:
+        """Сводка матчапа; закрывает файл результатов"""
+        games = self.games
+        detailed: Any = self.results
+        if self.writer is not None:
+            self.writer.close()
+            detailed = ColumnarReader(self.writer.path)
+        return {
+            'caste1': self.caste1,
+            'caste2': self.caste2,
+            'games_played': games,
+            'wins': dict(self.wins),
+            'win_rates': {
+                self.caste1: self.wins[self.caste1] / games * 100 if games else 0.0,
+                self.caste2: self.wins[self.caste2] / games * 100 if games else 0.0,
+                'Draw': self.wins['Draw'] / games * 100 if games else 0.0
+            },
+            'avg_game_length': self.total_turns / games if games else 0.0,
+            'detailed_results': detailed
+        }
+
+
 class GameSimulator:
-    def __init__(self, cards_file: str):
+    def __init__(self, cards_file: str, results_dir: Optional[str] = None, row_group_size: int = 1024,
+                 seed: Optional[int] = None, cache: Optional[ResultCache] = None,
+                 rules: str = 'engine', config: Optional[str] = None, stalemate: bool = True):
+        """results_dir: писать результаты игр колоночными таблицами
+        <results_dir>/<каста1>_vs_<каста2>.kpcol вместо списков в памяти.
+        seed: детерминированные игры — i-я игра матчапа получает своё зерно.
+        cache: ResultCache — брать уже сыгранные игры из кэша (включает seed=0).
+        rules: 'engine' — играть по правилам движка через EngineAdapter,
+        'legacy' — прежняя упрощённая модель боя симулятора.
+        config: YAML с правилами для режима 'engine' (по умолчанию config/default.yaml).
+        stalemate: досрочно заканчивать партии с повторившейся позицией или без
+        изменений на столе (win_reason 'repetition' / 'no_progress', см. stalemate.py).
+        В режиме 'engine' это ничья; в 'legacy' итог считается по очкам, как по лимиту ходов."""
+        if rules not in RULES:
+            raise ValueError(f"Unknown rules: {rules}")
+        self.rules = rules
+        self.stalemate = stalemate
         self.cards_data = self.load_cards_from_csv(cards_file)
+        self.bosses = self.load_bosses(cards_file)
+        self.config = load_yaml_config(config or get_path('default_yaml'))
+        self.engine = EngineAdapter(self.config, self.bosses, stalemate=stalemate) if rules == 'engine' else None
         self.castes = ['gangsters', 'authorities', 'loners', 'solo']
+        self.results_dir = results_dir
+        self.row_group_size = row_group_size
+        self.cache = cache
+        self.seed = 0 if seed is None and cache is not None else seed
+        self._cache_parts: Dict[Tuple[str, str], dict] = {}
+        self._card_fps: Optional[Dict[str, str]] = None
+        self._deck_pools: Dict[str, DeckPool] = {}
+        self._duel: Optional[DuelTable] = None
         
     def load_cards_from_csv(self, csv_file: str) -> Dict[str, List[GameCard]]:
         """Load cards from CSV using unified engine loader and organize by caste"""
@@ -198,66 +454,54 @@ class GameSimulator:
         
         return cards_by_caste
 
+    def load_bosses(self, csv_file: str) -> Dict[str, EngineCard]:
+        """Боссы кланов (в колоду не входят, стартуют на столе) по имени клана"""
+        bosses = {}
+        for card in load_cards_from_csv(csv_file, include_all=True):
+            if card.type == 'boss' and card.clan:
+                bosses.setdefault(card.clan.lower(), card)
+        return bosses
+
     def create_deck(self, caste: str, deck_size: int = 8) -> List[GameCard]:
         """Создает колоду для указанной касты"""
-        caste_cards = [card for card in self.cards_data[caste] if card.caste == caste]
+        pool = self._deck_pools.get(caste)
+        if pool is None:
+            pool = self._deck_pools[caste] = DeckPool(
+                [card for card in self.cards_data[caste] if card.caste == caste]
+            )
+        caste_cards = pool.templates
         
         # Берем все доступные карты касты или случайную выборку
         if len(caste_cards) <= deck_size:
-            deck = copy.deepcopy(caste_cards)
+            deck = pool.deal(caste_cards)
         else:
-            deck = copy.deepcopy(random.sample(caste_cards, deck_size))
+            deck = pool.deal(random.sample(caste_cards, deck_size))
         
         # Перемешиваем колоду
         random.shuffle(deck)
         return deck
     
     def apply_card_abilities(self, card: GameCard, player: Player, opponent: Player, game_state: GameState):
-        """Применяет способности карты"""
-        for ability in card.abilities:
-            ability_lower = ability.lower()
-            
-            # Экономические способности
-            if 'steal:' in ability_lower:
-                amount = int(ability.split(':')[1].strip().split()[0])
-                stolen = min(amount, opponent.money)
-                opponent.money -= stolen
-                player.money += stolen
-                
-            elif 'gain:' in ability_lower or 'economy:' in ability_lower:
-                if 'gain:' in ability_lower:
-                    amount = int(ability.split(':')[1].strip().split()[0])
-                else:
-                    amount = int(ability.split(':')[1].strip().split()[0])
-                player.money += amount
-                
-            elif 'audit:' in ability_lower:
-                amount = int(ability.split(':')[1].strip().split()[0])
-                opponent.money = max(0, opponent.money - amount)
-            
-            # Защитные способности
-            elif 'bribe:' in ability_lower or 'extort:' in ability_lower:
-                card.shields += 1
-                
-            elif 'authority:' in ability_lower:
-                auth_amount = int(ability.split(':')[1].strip().split()[0])
-                player.authority += auth_amount
-            
-            # Боевые способности
-            elif 'berserker:' in ability_lower:
-                damage_taken = card.max_hp - card.hp
-                card.atk = card.base_atk + damage_taken
-                
-            elif 'assault:' in ability_lower:
-                card.atk += card.kills
-                
-            elif 'lethal:' in ability_lower:
-                card.atk += 1  # Дополнительный урон
+        """Применяет способности карты (таблица обработчиков готова заранее)"""
+        for handler, amount in card.compiled_abilities:
+            handler(card, player, opponent, amount)
     
+    def duel_table(self) -> DuelTable:
+        """Таблица дуэлей текущего каталога; пересчитывается, только если статы карт изменились"""
+        return get_duel_table(
+            (c.id, c.max_hp, c.base_atk) for cards in self.cards_data.values() for c in cards
+        )
+
     def combat_phase(self, attacker: GameCard, defender: GameCard) -> Tuple[bool, bool]:
         """Симулирует бой между двумя картами"""
-        attacker_damage = max(0, attacker.atk - defender.shields)
-        defender_damage = max(0, defender.atk - attacker.shields)
+        table = self._duel
+        if (table is not None and attacker.atk == attacker.base_atk and defender.atk == defender.base_atk
+                and attacker.id in table.index and defender.id in table.index):
+            # Атаки не изменены способностями — обмен уроном берём из таблицы
+            attacker_damage, defender_damage = table.exchange(attacker.id, defender.id, attacker.shields, defender.shields)
+        else:
+            attacker_damage = max(0, attacker.atk - defender.shields)
+            defender_damage = max(0, defender.atk - attacker.shields)
         
         # Применяем урон
         defender.hp -= attacker_damage
@@ -295,12 +539,10 @@ class GameSimulator:
                 attacker_died, defender_died = self.combat_phase(attacker, defender)
                 
                 if attacker_died:
-                    current_player.field.remove(attacker)
-                    current_player.graveyard.append(attacker)
+                    current_player.remove_from_field(attacker)
                 
                 if defender_died:
-                    opponent.field.remove(defender)
-                    opponent.graveyard.append(defender)
+                    opponent.remove_from_field(defender)
                     attacker.kills += 1
         
         # Проверка условий победы
@@ -309,25 +551,51 @@ class GameSimulator:
             return True
         
         if game_state.turn >= game_state.max_turns:
-            # Победа по очкам (количество карт на поле)
-            p1_score = len(game_state.player1.field)
-            p2_score = len(game_state.player2.field)
-            
-            if p1_score > p2_score:
-                game_state.winner = game_state.player1.name
-            elif p2_score > p1_score:
-                game_state.winner = game_state.player2.name
-            else:
-                game_state.winner = "Draw"
+            game_state.winner = self.winner_by_score(game_state)
             return True
         
         return False
+
+    @staticmethod
+    def winner_by_score(game_state: GameState) -> str:
+        """Победа по очкам (количество карт на поле) при окончании партии по лимиту"""
+        p1_score = len(game_state.player1.field)
+        p2_score = len(game_state.player2.field)
+        if p1_score > p2_score:
+            return game_state.player1.name
+        if p2_score > p1_score:
+            return game_state.player2.name
+        return "Draw"
     
-    def simulate_game(self, caste1: str, caste2: str) -> Dict[str, Any]:
+    def simulate_game(self, caste1: str, caste2: str, seed: Optional[int] = None) -> Dict[str, Any]:
         """Симулирует одну игру между двумя кастами"""
+        if seed is not None:
+            random.seed(seed)
         deck1 = self.create_deck(caste1)
         deck2 = self.create_deck(caste2)
-        
+        return self._play_decks(caste1, caste2, deck1, deck2)
+
+    def _simulate_tracked(self, caste1: str, caste2: str, seed: int) -> Dict[str, Any]:
+        """Игра для кэша: результат плюс отпечатки всех карт, попавших в колоды.
+
+        Состав колод зависит только от зерна и списка id карт касты, поэтому игру,
+        в колодах которой нет изменённых карт, переигрывать не нужно.
+        """
+        random.seed(seed)
+        deck1 = self.create_deck(caste1)
+        deck2 = self.create_deck(caste2)
+        deps = {c.id: self.card_fingerprint(c.id) for c in deck1 + deck2}
+        if self.engine is not None:
+            for caste in (caste1, caste2):
+                boss = self.engine.boss_for(caste)
+                if boss is not None:
+                    deps[boss.id] = self.card_fingerprint(boss.id)
+        return {'result': self._play_decks(caste1, caste2, deck1, deck2), 'deps': deps}
+
+    def _play_decks(self, caste1: str, caste2: str, deck1: List[GameCard], deck2: List[GameCard]) -> Dict[str, Any]:
+        if self.engine is not None:
+            return self.engine.play(caste1, caste2, [c.engine_card for c in deck1], [c.engine_card for c in deck2])
+        self._duel = self.duel_table()
         player1 = Player(name=f"Player_{caste1}", caste=caste1, deck=deck1)
         player2 = Player(name=f"Player_{caste2}", caste=caste2, deck=deck2)
         
@@ -337,12 +605,20 @@ class GameSimulator:
             player2.draw_card()
         
         game_state = GameState(player1=player1, player2=player2)
+        detector = StalemateDetector() if self.stalemate else None
+        stalled = None
         
         # Симулируем игру
         while not self.simulate_turn(game_state):
             game_state.switch_player()
             if game_state.current_player == 1:
                 game_state.turn += 1
+            if detector is not None:
+                stalled = detector.update(*_legacy_keys(game_state))
+                if stalled:
+                    # Столы больше не меняются: итог тот же, что и по лимиту ходов
+                    game_state.winner = self.winner_by_score(game_state)
+                    break
         
         return {
             'winner': game_state.winner,
@@ -352,66 +628,161 @@ class GameSimulator:
             'p1_cards_played': len(player1.graveyard) + len(player1.field),
             'p2_cards_played': len(player2.graveyard) + len(player2.field),
             'p1_final_field': len(player1.field),
-            'p2_final_field': len(player2.field)
+            'p2_final_field': len(player2.field),
+            'win_reason': stalled or ('board_cleared' if game_state.turn < game_state.max_turns else 'turn_limit')
         }
     
-    def run_matchup_simulation(self, caste1: str, caste2: str, games: int = 100) -> Dict[str, Any]:
-        """Запускает серию игр между двумя кастами"""
-        results = []
-        wins = {caste1: 0, caste2: 0, 'Draw': 0}
-        total_turns = 0
-        
-        for _ in range(games):
-            result = self.simulate_game(caste1, caste2)
-            results.append(result)
-            
-            if result['winner'] == f"Player_{caste1}":
-                wins[caste1] += 1
-            elif result['winner'] == f"Player_{caste2}":
-                wins[caste2] += 1
+    def _open_run(self, caste1: str, caste2: str) -> 'MatchupRun':
+        writer = None
+        if self.results_dir is not None:
+            path = Path(self.results_dir) / f"{caste1}_vs_{caste2}.kpcol"
+            writer = ColumnarWriter(path, schema=GAME_RESULT_SCHEMA, row_group_size=self.row_group_size,
+                                    metadata={'caste1': caste1, 'caste2': caste2})
+        return MatchupRun(caste1, caste2, writer)
+
+    def _game_seed(self, caste1: str, caste2: str, index: int) -> int:
+        digest = hashlib.blake2b(f"{self.seed}:{caste1}:{caste2}:{index}".encode(), digest_size=8).digest()
+        return int.from_bytes(digest, 'little')
+
+    def card_fingerprint(self, card_id: str) -> str:
+        fps = self._card_fps
+        if fps is None:
+            fps = self._card_fps = {
+                c.id: catalog_fingerprint([c.engine_card]) for cards in self.cards_data.values() for c in cards
+            }
+            fps.update({b.id: catalog_fingerprint([b]) for b in self.bosses.values()})
+        return fps.get(card_id, '')
+
+    def cache_parts(self, caste1: str, caste2: str) -> dict:
+        """Всё, кроме номера игры и статов карт, что определяет результат игры матчапа.
+
+        Статы карт в ключ не входят: каждая закэшированная игра хранит отпечатки
+        карт из своих колод (deps) и переигрывается, только если одна из них
+        изменилась. Состав каст (id по порядку) в ключе — от него зависит выбор колод.
+        """
+        parts = self._cache_parts.get((caste1, caste2))
+        if parts is None:
+            parts = self._cache_parts[(caste1, caste2)] = {
+                'kind': 'game_simulator/deps',
+                'matchup': [caste1, caste2],
+                'card_ids': [[c.id for c in self.cards_data.get(k, [])] for k in (caste1, caste2)],
+                'rules': self.rules,
+                'stalemate': StalemateDetector().params() if self.stalemate else None,
+                'config': fingerprint(self.config) if self.engine is not None else None,
+                'simulator': source_fingerprint(__file__, Path(__file__).with_name('engine_adapter.py')),
+                'engine': engine_fingerprint(),
+                'seed': self.seed,
+            }
+        return parts
+
+    def _deps_current(self, entry: Dict[str, Any]) -> bool:
+        """Все карты из колод закэшированной игры не изменились"""
+        return all(self.card_fingerprint(cid) == fp for cid, fp in entry['deps'].items())
+
+    def _play_batch(self, run: 'MatchupRun', n: int, stopper=None) -> None:
+        """Доигрывает n игр матчапа и обновляет счётчики stopper"""
+        before = dict(run.wins)
+        c1, c2 = run.caste1, run.caste2
+        if self.seed is None:
+            results = [self.simulate_game(c1, c2) for _ in range(n)]
+        else:
+            indexes = range(run.games, run.games + n)
+            if self.cache is not None:
+                parts = self.cache_parts(c1, c2)
+                entries = self.cache.run(
+                    cache_key(**parts), indexes,
+                    lambda i: self._simulate_tracked(c1, c2, self._game_seed(c1, c2, i)),
+                    meta=parts, is_valid=self._deps_current,
+                )
+                results = [e['result'] for e in entries]
             else:
-                wins['Draw'] += 1
-            
-            total_turns += result['turns']
-        
-        return {
-            'caste1': caste1,
-            'caste2': caste2,
-            'games_played': games,
-            'wins': wins,
-            'win_rates': {
-                caste1: wins[caste1] / games * 100,
-                caste2: wins[caste2] / games * 100,
-                'Draw': wins['Draw'] / games * 100
-            },
-            'avg_game_length': total_turns / games,
-            'detailed_results': results
-        }
-    
-    def run_full_tournament(self, games_per_matchup: int = 50) -> Dict[str, Any]:
-        """Запускает полный турнир между всеми кастами"""
+                results = [self.simulate_game(c1, c2, seed=self._game_seed(c1, c2, i)) for i in indexes]
+        for result in results:
+            run.add(result)
+        if stopper is not None:
+            stopper.update(run.wins[run.caste1] - before[run.caste1],
+                           run.wins[run.caste2] - before[run.caste2],
+                           run.wins['Draw'] - before['Draw'])
+
+    def run_matchup_simulation(self, caste1: str, caste2: str, games: int = 100,
+                               adaptive=None, batch_size: int = 10) -> Dict[str, Any]:
+        """Запускает серию игр между двумя кастами.
+
+        adaptive: AdaptiveStopper (simulator/sequential.py) — играть партиями по
+        batch_size и остановиться, как только интервал винрейта достаточно узок
+        или SPRT принял решение; games тогда служит верхним пределом.
+        """
+        run = self._open_run(caste1, caste2)
+        if adaptive is None:
+            self._play_batch(run, games)
+            return run.result()
+
+        stopper = adaptive.fresh()
+        cap = min(games, stopper.max_games or games)
+        reason = None
+        while run.games < cap:
+            self._play_batch(run, min(batch_size, cap - run.games), stopper)
+            reason = stopper.stop_reason()
+            if reason:
+                break
+        result = run.result()
+        result['stop_reason'] = reason or 'max_games'
+        result['win_rate_interval'] = stopper.interval()
+        return result
+
+    def run_full_tournament(self, games_per_matchup: int = 50, adaptive=None,
+                            batch_size: int = 10) -> Dict[str, Any]:
+        """Запускает полный турнир между всеми кастами.
+
+        С adaptive общий бюджет (games_per_matchup × число матчапов) раздаётся
+        партиями: каждая следующая партия достаётся нерешённому матчапу с самым
+        широким интервалом винрейта. Один матчап получает не больше
+        adaptive.max_games игр (по умолчанию 4 × games_per_matchup).
+        """
         tournament_results = {}
         caste_stats = {caste: {'wins': 0, 'losses': 0, 'draws': 0, 'games': 0} for caste in self.castes}
-        
-        # Все возможные матчапы
-        for i, caste1 in enumerate(self.castes):
-            for j, caste2 in enumerate(self.castes):
-                if i < j:  # Избегаем дублирования матчапов
-                    matchup_key = f"{caste1}_vs_{caste2}"
-                    result = self.run_matchup_simulation(caste1, caste2, games_per_matchup)
-                    tournament_results[matchup_key] = result
-                    
-                    # Обновляем статистику кастов
-                    caste_stats[caste1]['wins'] += result['wins'][caste1]
-                    caste_stats[caste1]['losses'] += result['wins'][caste2]
-                    caste_stats[caste1]['draws'] += result['wins']['Draw']
-                    caste_stats[caste1]['games'] += games_per_matchup
-                    
-                    caste_stats[caste2]['wins'] += result['wins'][caste2]
-                    caste_stats[caste2]['losses'] += result['wins'][caste1]
-                    caste_stats[caste2]['draws'] += result['wins']['Draw']
-                    caste_stats[caste2]['games'] += games_per_matchup
-        
+
+        # Все возможные матчапы (избегаем дублирования)
+        matchups = [(c1, c2) for i, c1 in enumerate(self.castes) for j, c2 in enumerate(self.castes) if i < j]
+
+        if adaptive is None:
+            for caste1, caste2 in matchups:
+                tournament_results[f"{caste1}_vs_{caste2}"] = self.run_matchup_simulation(caste1, caste2, games_per_matchup)
+        else:
+            budget = games_per_matchup * len(matchups)
+            cap = adaptive.max_games or 4 * games_per_matchup
+            runs = {m: self._open_run(*m) for m in matchups}
+            stoppers = {m: adaptive.fresh() for m in matchups}
+            reasons: Dict[Tuple[str, str], Optional[str]] = {m: None for m in matchups}
+            spent = 0
+            while spent < budget:
+                open_ = [m for m in matchups if reasons[m] is None and runs[m].games < cap]
+                if not open_:
+                    break
+                m = max(open_, key=lambda k: (stoppers[k].width(), -runs[k].games))
+                n = min(batch_size, budget - spent, cap - runs[m].games)
+                self._play_batch(runs[m], n, stoppers[m])
+                spent += n
+                reasons[m] = stoppers[m].stop_reason()
+            for m in matchups:
+                result = runs[m].result()
+                result['stop_reason'] = reasons[m] or ('max_games' if result['games_played'] >= cap else 'budget')
+                result['win_rate_interval'] = stoppers[m].interval()
+                tournament_results[f"{m[0]}_vs_{m[1]}"] = result
+
+        # Обновляем статистику кастов
+        for result in tournament_results.values():
+            caste1, caste2 = result['caste1'], result['caste2']
+            caste_stats[caste1]['wins'] += result['wins'][caste1]
+            caste_stats[caste1]['losses'] += result['wins'][caste2]
+            caste_stats[caste1]['draws'] += result['wins']['Draw']
+            caste_stats[caste1]['games'] += result['games_played']
+
+            caste_stats[caste2]['wins'] += result['wins'][caste2]
+            caste_stats[caste2]['losses'] += result['wins'][caste1]
+            caste_stats[caste2]['draws'] += result['wins']['Draw']
+            caste_stats[caste2]['games'] += result['games_played']
+
         # Вычисляем общие винрейты
         for caste in self.castes:
             stats = caste_stats[caste]
@@ -419,14 +790,14 @@ class GameSimulator:
                 stats['win_rate'] = stats['wins'] / stats['games'] * 100
                 stats['loss_rate'] = stats['losses'] / stats['games'] * 100
                 stats['draw_rate'] = stats['draws'] / stats['games'] * 100
-        
+
         return {
             'tournament_results': tournament_results,
             'caste_statistics': caste_stats,
             'games_per_matchup': games_per_matchup,
-            'total_games': len(tournament_results) * games_per_matchup
+            'total_games': sum(r['games_played'] for r in tournament_results.values())
         }
-    
+
     def generate_simulation_report(self, tournament_data: Dict[str, Any]) -> str:
         """Генерирует отчет по результатам симуляции"""
         report = "# ОТЧЕТ ПО ИГРОВОЙ СИМУЛЯЦИИ KINGPIN\n\n"
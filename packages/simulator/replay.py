@@ -0,0 +1,382 @@
+"""
+Compact deterministic game replays and a bulk replay verifier.
+
+A simulated game is fully determined by its start position and the actions
+played, and the start position by the seed and the catalog/rules
+(`balance.setup_state`). A replay therefore stores only:
+
+    seed, config hash, action stream, winner, action count, final state hash
+
+The config hash is a short digest of the rules, deck and starter cards, so a
+replay is never re-executed against a different catalog. The final state
+hash is the Zobrist hash (`engine/zobrist.py`), which is stable across
+processes.
+
+Actions are encoded field by field as varints: a kind code, then each field
+(ints zigzag-encoded, optional fields shifted by one so 0 is None, players
+and draw placements as small codes). An attack takes 6 bytes, a pass 3.
+Actions are encoded directly rather than as an index into `legal_actions`,
+so the heuristic in `balance.play_one`, which builds its actions by hand
+instead of picking them from the generator, replays as well.
+
+Replay files are a 5-byte header followed by length-prefixed records.
+`verify_all` re-executes replays against the current engine over a process
+pool and reports every replay whose outcome or final state changed. This is
+a regression test for rule and engine changes at simulation scale:
+
+    python -m packages.simulator.balance --seeds 5000 --replays games.kpr
+    ... change the engine ...
+    python -m packages.simulator.replay games.kpr --workers 4
+"""
+
+from __future__ import annotations
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from packages.engine.actions import Action, Attack, Defend, DiscardCard, Draw, Influence, UseAbility
+from packages.engine.engine import Ctx
+from packages.engine.eventlog import OFF
+from packages.engine.specialize import specialize
+from packages.engine.zobrist import full_hash
+from packages.simulator.result_cache import catalog_fingerprint, fingerprint
+
+MAGIC = b"KPRP"
+VERSION = 1
+
+KINDS = ("attack", "defend", "influence", "discard", "draw", "use_ability")
+_KIND_CODES = {k: i for i, k in enumerate(KINDS)}
+PLAYERS = (None, "P1", "P2")
+_PLAYER_CODES = {p: i for i, p in enumerate(PLAYERS)}
+PLACES = ("hand", "slot", "shelf")
+_PLACE_CODES = {p: i for i, p in enumerate(PLACES)}
+
+
+# --- Varints -------------------------------------------------------------------
+
+def _put(out: bytearray, n: int) -> None:
+    while n > 0x7F:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _get(data: bytes, pos: int) -> Tuple[int, int]:
+    n = shift = 0
+    while True:
+        try:
+            b = data[pos]
+        except IndexError:
+            raise ValueError("truncated varint") from None
+        pos += 1
+        n |= (b & 0x7F) << shift
+        if b < 0x80:
+            return n, pos
+        shift += 7
+
+
+def _zigzag(n: int) -> int:
+    return n * 2 if n >= 0 else -n * 2 - 1
+
+
+def _unzigzag(n: int) -> int:
+    return n >> 1 if not n & 1 else -(n >> 1) - 1
+
+
+def _put_int(out: bytearray, n: int) -> None:
+    _put(out, _zigzag(n))
+
+
+def _put_opt(out: bytearray, n: Optional[int]) -> None:
+    _put(out, 0 if n is None else _zigzag(n) + 1)
+
+
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data: bytes, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def uint(self) -> int:
+        n, self.pos = _get(self.data, self.pos)
+        return n
+
+    def int(self) -> int:
+        return _unzigzag(self.uint())
+
+    def opt(self) -> Optional[int]:
+        n = self.uint()
+        return None if n == 0 else _unzigzag(n - 1)
+
+    def raw(self, size: int) -> bytes:
+        if self.pos + size > len(self.data):
+            raise ValueError("truncated record")
+        chunk = self.data[self.pos:self.pos + size]
+        self.pos += size
+        return bytes(chunk)
+
+    def done(self) -> bool:
+        return self.pos >= len(self.data)
+
+
+# --- Actions -------------------------------------------------------------------
+
+def encode_action(action: Action, out: bytearray) -> None:
+    kind = action.kind
+    _put(out, _KIND_CODES[kind])
+    if kind == "attack":
+        _put(out, _PLAYER_CODES[action.target_player])
+        _put_opt(out, action.target_slot)
+        _put_int(out, action.ammo_spend)
+        _put_int(out, action.base_damage)
+        _put_opt(out, action.attacker_slot)
+    elif kind == "defend":
+        _put_int(out, action.target_slot)
+        _put_int(out, action.hire_count)
+    elif kind == "influence":
+        _put(out, _PLAYER_CODES[action.micro_bribe_target_player])
+        _put_opt(out, action.micro_bribe_target_slot)
+    elif kind == "discard":
+        _put_int(out, action.own_slot)
+    elif kind == "draw":
+        _put(out, _PLACE_CODES[action.place])
+        _put_opt(out, action.slot_index)
+    else:
+        _put_int(out, action.own_slot)
+        name = action.ability_id.encode("utf-8")
+        _put(out, len(name))
+        out.extend(name)
+
+
+def _decode_action(r: _Reader) -> Action:
+    try:
+        kind = KINDS[r.uint()]
+    except IndexError:
+        raise ValueError("unknown action kind") from None
+    if kind == "attack":
+        return Attack.model_construct(target_player=PLAYERS[r.uint()], target_slot=r.opt(), ammo_spend=r.int(),
+                                      base_damage=r.int(), attacker_slot=r.opt())
+    if kind == "defend":
+        return Defend.model_construct(target_slot=r.int(), hire_count=r.int())
+    if kind == "influence":
+        return Influence.model_construct(micro_bribe_target_player=PLAYERS[r.uint()],
+                                         micro_bribe_target_slot=r.opt())
+    if kind == "discard":
+        return DiscardCard.model_construct(own_slot=r.int())
+    if kind == "draw":
+        return Draw.model_construct(place=PLACES[r.uint()], slot_index=r.opt())
+    own_slot = r.int()
+    return UseAbility.model_construct(own_slot=own_slot, ability_id=r.raw(r.uint()).decode("utf-8"))
+
+
+def decode_actions(data: bytes) -> Iterator[Action]:
+    r = _Reader(data)
+    while not r.done():
+        yield _decode_action(r)
+
+
+# --- Replays -------------------------------------------------------------------
+
+_hashes: Dict[int, Tuple[object, str]] = {}
+
+
+def config_hash(base) -> str:
+    """16-hex digest of a BaseCatalog's rules, deck and starters (memoized per object)."""
+    hit = _hashes.get(id(base))
+    if hit is not None and hit[0] is base:
+        return hit[1]
+    digest = fingerprint({
+        "rules": fingerprint(base.cfg),
+        "cards": catalog_fingerprint(base.cards),
+        "starters": catalog_fingerprint(base.catalog.values()),
+    })[:16]
+    if len(_hashes) >= 64:
+        _hashes.clear()
+    _hashes[id(base)] = (base, digest)
+    return digest
+
+
+@dataclass
+class Replay:
+    seed: int
+    config_hash: str
+    actions: bytes = b""
+    count: int = 0
+    winner: Optional[str] = None
+    final_hash: int = 0
+
+    def to_bytes(self) -> bytes:
+        out = bytearray()
+        _put_int(out, self.seed)
+        out.extend(bytes.fromhex(self.config_hash))
+        _put(out, _PLAYER_CODES[self.winner])
+        _put(out, self.count)
+        _put(out, len(self.actions))
+        out.extend(self.actions)
+        out.extend(self.final_hash.to_bytes(8, "little"))
+        return bytes(out)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "Replay":
+        r = _Reader(data)
+        seed = r.int()
+        chash = r.raw(8).hex()
+        winner = PLAYERS[r.uint()]
+        count = r.uint()
+        actions = r.raw(r.uint())
+        final_hash = int.from_bytes(r.raw(8), "little")
+        if not r.done():
+            raise ValueError("trailing bytes in replay record")
+        return cls(seed, chash, actions, count, winner, final_hash)
+
+
+@dataclass
+class Recorder:
+    """Wraps a reducer and records every action it applies into a Replay.
+
+    `recorder.apply` has the reducer's signature; call `finish(state)` once
+    the game is over.
+    """
+    reducer: Callable[..., Dict]
+    replay: Replay
+    _buf: bytearray = field(default_factory=bytearray)
+
+    def apply(self, ctx, action: Action, record_undo: bool = False) -> Dict:
+        encode_action(action, self._buf)
+        self.replay.count += 1
+        res = self.reducer(ctx, action, record_undo)
+        if "winner" in res:
+            self.replay.winner = res["winner"]
+        return res
+
+    def finish(self, state) -> Replay:
+        self.replay.actions = bytes(self._buf)
+        self.replay.final_hash = full_hash(state)
+        return self.replay
+
+
+def write_replays(path: str, replays: Iterable[Replay]) -> int:
+    n = 0
+    with open(path, "wb") as f:
+        f.write(MAGIC + bytes([VERSION]))
+        for rep in replays:
+            record = rep.to_bytes()
+            head = bytearray()
+            _put(head, len(record))
+            f.write(head)
+            f.write(record)
+            n += 1
+    return n
+
+
+def read_replays(path: str) -> List[Replay]:
+    with open(path, "rb") as f:
+        data = f.read()
+    if data[:4] != MAGIC:
+        raise ValueError(f"{path}: not a replay file")
+    if data[4] != VERSION:
+        raise ValueError(f"{path}: unsupported replay version {data[4]}")
+    out: List[Replay] = []
+    pos = 5
+    while pos < len(data):
+        size, pos = _get(data, pos)
+        if pos + size > len(data):
+            raise ValueError(f"{path}: truncated record {len(out)}")
+        out.append(Replay.from_bytes(data[pos:pos + size]))
+        pos += size
+    return out
+
+
+# --- Verification ----------------------------------------------------------------
+
+def verify(replay: Replay, base) -> Optional[str]:
+    """Re-execute a replay; None if it still ends identically, else what changed."""
+    from packages.simulator.balance import setup_state
+
+    if replay.config_hash != config_hash(base):
+        return "config_mismatch"
+    state = setup_state(base, replay.seed)
+    ctx = Ctx(state=state, log=[], log_level=OFF)
+    apply = specialize(state.config)
+    winner = None
+    step = 0
+    try:
+        for step, action in enumerate(decode_actions(replay.actions)):
+            if winner is not None:
+                return f"ended_early: winner {winner} before action {step}"
+            res = apply(ctx, action)
+            winner = res.get("winner")
+    except Exception as e:
+        return f"exception at action {step}: {type(e).__name__}: {e}"
+    if winner != replay.winner:
+        return f"winner: {winner} != recorded {replay.winner}"
+    if full_hash(state) != replay.final_hash:
+        return "final_state"
+    return None
+
+
+@dataclass
+class VerifyReport:
+    total: int = 0
+    # (replay index, seed, reason)
+    failures: List[Tuple[int, int, str]] = field(default_factory=list)
+
+    @property
+    def ok(self) -> int:
+        return self.total - len(self.failures)
+
+
+_worker_base = None
+
+
+def _init_worker(config: str) -> None:
+    global _worker_base
+    from packages.simulator.balance import load_base
+    _worker_base = load_base(config)
+
+
+def _verify_chunk(args) -> List[Tuple[int, int, str]]:
+    start, records = args
+    out = []
+    for i, data in enumerate(records, start):
+        rep = Replay.from_bytes(data)
+        reason = verify(rep, _worker_base)
+        if reason:
+            out.append((i, rep.seed, reason))
+    return out
+
+
+def verify_all(replays: List[Replay], config: str, workers: int = 1, chunk: int = 256) -> VerifyReport:
+    """Verify `replays` against `config`, spread over `workers` processes."""
+    chunks = [(i, [r.to_bytes() for r in replays[i:i + chunk]]) for i in range(0, len(replays), chunk)]
+    if workers <= 1 or len(chunks) <= 1:
+        _init_worker(config)
+        results = [_verify_chunk(c) for c in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+            results = list(pool.map(_verify_chunk, chunks))
+    report = VerifyReport(total=len(replays))
+    for part in results:
+        report.failures.extend(part)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-execute recorded replays against the current engine")
+    parser.add_argument("replays", help="Replay file written by balance --replays")
+    parser.add_argument("--config", default="config/default.yaml")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--show", type=int, default=20, help="Divergences to print")
+    args = parser.parse_args()
+
+    report = verify_all(read_replays(args.replays), args.config, workers=args.workers)
+    print(f"Replays: {report.total}, identical: {report.ok}, diverged: {len(report.failures)}")
+    for i, seed, reason in report.failures[:args.show]:
+        print(f"  #{i} seed={seed}: {reason}")
+    raise SystemExit(1 if report.failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+Content-addressed cache of simulation results.
+
+Results are stored per seed under a key that hashes everything else that
+determines a game's outcome:
+
+    key = sha256(card catalog, rules config, bot policy + version, engine sources, run parameters)
+
+The seed range is not part of the key: each seed is its own entry, so a rerun
+with more seeds (or an interrupted run) computes only the seeds that are
+missing. Editing a card, a rule, a policy or any engine source file changes
+the key, and the stale entries are simply never looked up again.
+
+Layout: <root>/<key[:2]>/<key>/results.jsonl (one {"seed", "result"} line per
+game, append-only) plus meta.json describing what the key was built from.
+"""
+
+from __future__ import annotations
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+DEFAULT_ROOT = Path(__file__).resolve().parents[2] / ".cache" / "simulations"
+ENGINE_DIR = Path(__file__).resolve().parents[1] / "engine"
+
+
+def _canonical(obj: Any) -> bytes:
+    return json.dumps(obj, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def fingerprint(obj: Any) -> str:
+    """Stable hash of a JSON-like object (dict key order does not matter)."""
+    return hashlib.sha256(_canonical(obj)).hexdigest()
+
+
+def catalog_fingerprint(cards: Iterable[Any]) -> str:
+    """Hash of card contents (engine `Card` models or dicts), order-insensitive."""
+    dumps = [c.model_dump(mode="json") if hasattr(c, "model_dump") else dict(c) for c in cards]
+    dumps.sort(key=lambda d: (str(d.get("id")), _canonical(d)))
+    return fingerprint(dumps)
+
+
+def source_fingerprint(*paths: str | Path) -> str:
+    """Hash of source files; directories contribute every *.py inside them."""
+    h = hashlib.sha256()
+    files: List[Path] = []
+    for p in paths:
+        p = Path(p)
+        files.extend(sorted(p.rglob("*.py")) if p.is_dir() else [p])
+    for f in files:
+        h.update(f.name.encode("utf-8"))
+        h.update(f.read_bytes())
+    return h.hexdigest()
+
+
+_engine_fp: Optional[str] = None
+
+
+def engine_fingerprint() -> str:
+    """Hash of packages/engine sources: any engine change invalidates results."""
+    global _engine_fp
+    if _engine_fp is None:
+        _engine_fp = source_fingerprint(ENGINE_DIR)
+    return _engine_fp
+
+
+def cache_key(**parts: Any) -> str:
+    return fingerprint(parts)
+
+
+class ResultCache:
+    """Per-seed result store addressed by `cache_key(...)`."""
+
+    def __init__(self, root: str | Path = DEFAULT_ROOT):
+        self.root = Path(root)
+        self._loaded: Dict[str, Dict[int, Any]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+
+    def _dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _entries(self, key: str) -> Dict[int, Any]:
+        entries = self._loaded.get(key)
+        if entries is None:
+            entries = {}
+            path = self._dir(key) / "results.jsonl"
+            if path.exists():
+                with open(path, encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                        except ValueError:
+                            continue  # torn last line of an interrupted run
+                        entries[rec["seed"]] = rec["result"]
+            self._loaded[key] = entries
+        return entries
+
+    def get_many(self, key: str, seeds: Iterable[int]) -> Dict[int, Any]:
+        entries = self._entries(key)
+        return {s: entries[s] for s in seeds if s in entries}
+
+    def put_many(self, key: str, results: Dict[int, Any], meta: Optional[dict] = None) -> None:
+        if not results:
+            return
+        d = self._dir(key)
+        d.mkdir(parents=True, exist_ok=True)
+        if meta is not None and not (d / "meta.json").exists():
+            (d / "meta.json").write_text(json.dumps(meta, indent=2, ensure_ascii=False, default=str), encoding="utf-8")
+        with open(d / "results.jsonl", "a", encoding="utf-8") as f:
+            for seed, result in results.items():
+                f.write(json.dumps({"seed": seed, "result": result}, ensure_ascii=False) + "\n")
+        self._entries(key).update(results)
+
+    def run(self, key: str, seeds: Iterable[int], compute: Callable[[int], Any],
+            meta: Optional[dict] = None, is_valid: Optional[Callable[[Any], bool]] = None) -> List[Any]:
+        """Results for `seeds` in order, calling `compute(seed)` only for missing ones.
+
+        `is_valid(entry)` lets callers track finer-grained dependencies than the
+        key: entries it rejects are recomputed (counted in `stale`) and the new
+        result supersedes the old line on the next load.
+        """
+        seeds = list(seeds)
+        cached = self.get_many(key, seeds)
+        if is_valid is not None:
+            for s in [s for s, entry in cached.items() if not is_valid(entry)]:
+                del cached[s]
+                self.stale += 1
+        self.hits += len(cached)
+        for s in seeds:
+            if s not in cached:
+                # Persist every game right away so an interrupted run resumes
+                cached[s] = compute(s)
+                self.put_many(key, {s: cached[s]}, meta)
+                self.misses += 1
+        return [cached[s] for s in seeds]
@@ -12,6 +12,8 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 from engine.config import get_path
 from game_simulator import GameSimulator
+from simulator.sequential import AdaptiveStopper
+from simulator.result_cache import ResultCache
 
 def main():
     parser = argparse.ArgumentParser(description='Kingpin Game Simulator')
@@ -28,6 +30,22 @@ def main():
                        help='[legacy] Вторая каста для режима matchup')
     parser.add_argument('--games', type=int, default=100,
                        help='Количество игр на матчап (по умолчанию: 100)')
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Адаптивный режим: играть партиями и останавливаться, когда винрейт определён (--games — верхний предел)')
+    parser.add_argument('--ci-width', type=float, default=0.1,
+                       help='Целевая ширина доверительного интервала винрейта (по умолчанию: 0.1)')
+    parser.add_argument('--ci-method', choices=['wilson', 'bayes'], default='wilson',
+                       help='Интервал: Уилсона или байесовский (по умолчанию: wilson)')
+    parser.add_argument('--batch', type=int, default=10,
+                       help='Размер партии в адаптивном режиме (по умолчанию: 10)')
+    parser.add_argument('--results-dir', type=str,
+                       help='Каталог для колоночных таблиц с результатами каждой игры (по умолчанию: только в памяти)')
+    parser.add_argument('--seed', type=int,
+                       help='Базовое зерно: игры становятся воспроизводимыми')
+    parser.add_argument('--cache-dir', type=str,
+                       help='Кэш результатов по содержимому карт/правил/движка: пересчитываются только недостающие игры')
+    parser.add_argument('--rules', choices=['engine', 'legacy'], default='engine',
+                       help='Правила: engine — настоящий движок, legacy — прежняя упрощённая модель (по умолчанию: engine)')
     parser.add_argument('--output', type=str,
                        help='Файл для сохранения отчета (по умолчанию: simulation_report.md)')
     
@@ -44,7 +62,10 @@ def main():
     print(f"📁 Загружаем карты из: {cards_file}")
     
     # Создаем симулятор
-    simulator = GameSimulator(cards_file)
+    cache = ResultCache(args.cache_dir) if args.cache_dir else None
+    simulator = GameSimulator(cards_file, results_dir=args.results_dir, seed=args.seed, cache=cache,
+                              rules=args.rules)
+    adaptive = AdaptiveStopper(target_width=args.ci_width, method=args.ci_method) if args.adaptive else None
     
     if args.mode == 'matchup':
         clan1 = args.clan1 or args.caste1
@@ -56,7 +77,7 @@ def main():
         print(f"⚔️ Симулируем матчап: {clan1.upper()} vs {clan2.upper()}")
         print(f"🎲 Количество игр: {args.games}")
         
-        result = simulator.run_matchup_simulation(clan1, clan2, args.games)
+        result = simulator.run_matchup_simulation(clan1, clan2, args.games, adaptive=adaptive, batch_size=args.batch)
         
         # Выводим результаты
         print(f"\n📊 РЕЗУЛЬТАТЫ МАТЧАПА:")
@@ -64,10 +85,13 @@ def main():
         print(f"🏆 {clan2.upper()}: {result['win_rates'][clan2]:.1f}% ({result['wins'][clan2]} побед)")
         print(f"🤝 Ничьи: {result['win_rates']['Draw']:.1f}% ({result['wins']['Draw']})")
         print(f"⏱️ Средняя длина игры: {result['avg_game_length']:.1f} ходов")
+        if adaptive:
+            lo, hi = result['win_rate_interval']
+            print(f"📐 Сыграно {result['games_played']} игр, интервал винрейта {clan1.upper()}: [{lo*100:.1f}%, {hi*100:.1f}%] ({result['stop_reason']})")
         
         # Простой отчет для одного матчапа
         report = f"# Результаты матчапа {clan1.upper()} vs {clan2.upper()}\n\n"
-        report += f"**Игр сыграно:** {args.games}\n\n"
+        report += f"**Игр сыграно:** {result['games_played']}\n\n"
         report += f"## Результаты\n"
         report += f"- **{clan1.upper()}**: {result['win_rates'][clan1]:.1f}% ({result['wins'][clan1]} побед)\n"
         report += f"- **{clan2.upper()}**: {result['win_rates'][clan2]:.1f}% ({result['wins'][clan2]} побед)\n"
@@ -79,7 +103,7 @@ def main():
         print(f"🎲 Игр на матчап: {args.games}")
         print("⏳ Это может занять некоторое время...")
         
-        tournament_data = simulator.run_full_tournament(args.games)
+        tournament_data = simulator.run_full_tournament(args.games, adaptive=adaptive, batch_size=args.batch)
         
         # Выводим краткие результаты
         print(f"\n🏆 РЕЗУЛЬТАТЫ ТУРНИРА:")
@@ -109,6 +133,9 @@ def main():
         f.write(report)
     
     print(f"\n✅ Отчет сохранен в: {report_path}")
+    if cache:
+        print(f"🗄️ Кэш: {cache.hits} игр взято из кэша, {cache.misses} сыграно "
+              f"(из них {cache.stale} — из-за изменённых карт)")
     
     # Анализ баланса
     if args.mode == 'tournament':
@@ -0,0 +1,217 @@
+"""
+Sequential stopping rules for win-rate estimation.
+
+Simulations play games in batches and ask an `AdaptiveStopper` after each
+batch whether the matchup is settled:
+
+- interval width: the Wilson score interval (or a Bayesian Jeffreys
+  Beta(score + 1/2, n - score + 1/2) credible interval) on the win rate is
+  narrower than `target_width`;
+- SPRT: Wald's sequential probability ratio test of "balanced" (p = 0.5)
+  against "unbalanced" (|p - 0.5| = `delta`) has crossed a boundary.
+
+A draw counts as half a win, so the score of side A over n games is
+wins_a + draws / 2.
+"""
+
+from __future__ import annotations
+import math
+from dataclasses import dataclass, field
+from statistics import NormalDist
+from typing import Optional, Tuple
+
+Interval = Tuple[float, float]
+
+
+def _z(confidence: float) -> float:
+    return NormalDist().inv_cdf(0.5 + confidence / 2.0)
+
+
+def wilson_interval(score: float, n: int, confidence: float = 0.95) -> Interval:
+    """Wilson score interval for a binomial proportion."""
+    if n <= 0:
+        return 0.0, 1.0
+    z = _z(confidence)
+    p = score / n
+    denom = 1.0 + z * z / n
+    centre = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, centre - half), min(1.0, centre + half)
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    """Continued fraction for the incomplete beta function (modified Lentz)."""
+    tiny = 1e-30
+    qab, qap, qam = a + b, a + 1.0, a - 1.0
+    c, d = 1.0, 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+
+def beta_cdf(x: float, a: float, b: float) -> float:
+    """Regularized incomplete beta I_x(a, b)."""
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    ln_front = math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b) + a * math.log(x) + b * math.log1p(-x)
+    front = math.exp(ln_front)
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def beta_ppf(q: float, a: float, b: float) -> float:
+    """Quantile of Beta(a, b) by bisection."""
+    lo, hi = 0.0, 1.0
+    for _ in range(60):
+        mid = (lo + hi) / 2.0
+        if beta_cdf(mid, a, b) < q:
+            lo = mid
+        else:
+            hi = mid
+    return (lo + hi) / 2.0
+
+
+def bayes_interval(score: float, n: int, confidence: float = 0.95) -> Interval:
+    """Equal-tailed credible interval under a Jeffreys Beta(1/2, 1/2) prior."""
+    a, b = score + 0.5, max(0.0, n - score) + 0.5
+    tail = (1.0 - confidence) / 2.0
+    return beta_ppf(tail, a, b), beta_ppf(1.0 - tail, a, b)
+
+
+@dataclass
+class SPRT:
+    """Two-sided Wald SPRT: p = 0.5 against p = 0.5 ± delta.
+
+    Runs one one-sided test per direction; "unbalanced" as soon as either
+    accepts its alternative, "balanced" once both accept the null.
+    """
+    delta: float = 0.1
+    alpha: float = 0.05
+    beta: float = 0.1
+    llr_hi: float = 0.0
+    llr_lo: float = 0.0
+
+    def __post_init__(self):
+        self.upper = math.log((1 - self.beta) / (self.alpha / 2))
+        self.lower = math.log(self.beta / (1 - self.alpha / 2))
+        p_hi, p_lo = 0.5 + self.delta, 0.5 - self.delta
+        # Per-observation log-likelihood ratios (win, loss) for each direction
+        self._hi = (math.log(p_hi / 0.5), math.log((1 - p_hi) / 0.5))
+        self._lo = (math.log(p_lo / 0.5), math.log((1 - p_lo) / 0.5))
+
+    def update(self, wins: int, losses: int, draws: int = 0) -> None:
+        w = wins + draws / 2.0
+        l = losses + draws / 2.0
+        self.llr_hi += w * self._hi[0] + l * self._hi[1]
+        self.llr_lo += w * self._lo[0] + l * self._lo[1]
+
+    def decision(self) -> Optional[str]:
+        if self.llr_hi >= self.upper or self.llr_lo >= self.upper:
+            return "unbalanced"
+        if self.llr_hi <= self.lower and self.llr_lo <= self.lower:
+            return "balanced"
+        return None
+
+
+@dataclass
+class AdaptiveStopper:
+    """Decide when a matchup has been played enough.
+
+    Args:
+        target_width: stop once the win-rate interval is narrower than this.
+        method: "wilson" or "bayes" interval.
+        confidence: interval confidence level.
+        sprt_delta: enable the SPRT with this effect size (None disables it).
+        min_games: never stop before this many games.
+        max_games: always stop at this many games (None = caller's budget).
+    """
+    target_width: float = 0.1
+    method: str = "wilson"
+    confidence: float = 0.95
+    sprt_delta: Optional[float] = 0.1
+    alpha: float = 0.05
+    beta: float = 0.1
+    min_games: int = 20
+    max_games: Optional[int] = None
+    wins: int = 0
+    losses: int = 0
+    draws: int = 0
+    sprt: Optional[SPRT] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        if self.method not in ("wilson", "bayes"):
+            raise ValueError(f"Unknown interval method: {self.method}")
+        if self.sprt is None and self.sprt_delta:
+            self.sprt = SPRT(self.sprt_delta, self.alpha, self.beta)
+
+    def fresh(self) -> "AdaptiveStopper":
+        """Same settings with empty counters (one stopper per matchup)."""
+        return AdaptiveStopper(self.target_width, self.method, self.confidence, self.sprt_delta,
+                               self.alpha, self.beta, self.min_games, self.max_games)
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.losses + self.draws
+
+    @property
+    def score(self) -> float:
+        return self.wins + self.draws / 2.0
+
+    def update(self, wins: int, losses: int, draws: int = 0) -> None:
+        self.wins += wins
+        self.losses += losses
+        self.draws += draws
+        if self.sprt is not None:
+            self.sprt.update(wins, losses, draws)
+
+    def interval(self) -> Interval:
+        fn = wilson_interval if self.method == "wilson" else bayes_interval
+        return fn(self.score, self.games, self.confidence)
+
+    def width(self) -> float:
+        lo, hi = self.interval()
+        return hi - lo
+
+    def stop_reason(self) -> Optional[str]:
+        """Why the matchup can stop now, or None to keep playing."""
+        n = self.games
+        if self.max_games is not None and n >= self.max_games:
+            return "max_games"
+        if n < self.min_games:
+            return None
+        if self.width() <= self.target_width:
+            return "interval"
+        if self.sprt is not None:
+            verdict = self.sprt.decision()
+            if verdict is not None:
+                return f"sprt_{verdict}"
+        return None
+
+    def summary(self) -> dict:
+        lo, hi = self.interval()
+        return {
+            "games": self.games,
+            "win_rate": self.score / self.games if self.games else 0.0,
+            "interval": (lo, hi),
+            "stop_reason": self.stop_reason(),
+        }
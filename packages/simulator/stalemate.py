@@ -0,0 +1,84 @@
+"""
+Stalemate and repetition detection for simulated games.
+
+Simulators feed one pair of fingerprints per turn (or action) to a
+`StalemateDetector`:
+
+- position: everything that determines the rest of the game except the turn
+  counter. A position seen `repeat_limit` times means the players are going
+  in circles; the game ends as a draw with reason REPETITION.
+- material: the cards only — board HP and muscles, hands, deck and discard —
+  without money. When it has not changed for `stall_turns` updates in a row
+  nobody is damaging, deploying or defending anything and the game ends as a
+  draw with reason NO_PROGRESS (money alone piling up does not count).
+
+Fingerprints are any hashables; `engine_keys` builds them for engine states
+as plain tuples. (The incremental Zobrist hash would do, but keeping it
+tracked costs more per action than building the tuples once per turn.)
+"""
+
+from __future__ import annotations
+from typing import Dict, Hashable, Optional, Tuple
+
+REPETITION = "repetition"
+NO_PROGRESS = "no_progress"
+REASONS = (REPETITION, NO_PROGRESS)
+
+REPEAT_LIMIT = 3
+STALL_TURNS = 12
+
+
+class StalemateDetector:
+    """Tracks one game; `update` returns a draw reason once the game is dead.
+
+    `repeat_limit` or `stall_turns` of 0 disables that check.
+    """
+
+    def __init__(self, repeat_limit: int = REPEAT_LIMIT, stall_turns: int = STALL_TURNS):
+        self.repeat_limit = repeat_limit
+        self.stall_turns = stall_turns
+        self._seen: Dict[Hashable, int] = {}
+        self._material: Optional[Hashable] = None
+        self._stalled = 0
+
+    def update(self, position: Hashable, material: Hashable) -> Optional[str]:
+        if self.repeat_limit:
+            n = self._seen.get(position, 0) + 1
+            self._seen[position] = n
+            if n >= self.repeat_limit:
+                return REPETITION
+        if self.stall_turns:
+            if material == self._material:
+                self._stalled += 1
+                if self._stalled >= self.stall_turns:
+                    return NO_PROGRESS
+            else:
+                self._material = material
+                self._stalled = 0
+        return None
+
+    def params(self) -> Dict[str, int]:
+        """What determines the detector's verdicts (for cache keys)."""
+        return {"repeat_limit": self.repeat_limit, "stall_turns": self.stall_turns}
+
+
+
+def engine_keys(state) -> Tuple[Hashable, Hashable]:
+    """(position, material) of an engine GameState.
+
+    Decks count by size only: they change by draws (which also change a hand
+    or the board) and by shelf recycles. Duck-typed, so it works with the
+    engine imported either as `packages.engine` or as `engine`.
+    """
+    material = [len(state.deck), len(state.shelf), len(state.discard_out_of_game)]
+    economy = [state.active_player, bool(state.flags.get("micro_bribe_used", False))]
+    for pid in sorted(state.players):
+        p = state.players[pid]
+        material.append(tuple((s.card.id, s.card.hp, s.muscles, s.face_up) if s.card is not None else s.muscles
+                              for s in p.slots))
+        material.append(tuple((c.id, c.hp) for c in p.hand))
+        t = p.tokens
+        economy.append((t.reserve_money, t.otboy, p.cascade_used, p.cascade_triggers,
+                        tuple(sorted(p.ability_uses.items())) if p.ability_uses else ()))
+    material = tuple(material)
+    return (material, tuple(economy)), material
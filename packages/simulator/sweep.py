@@ -0,0 +1,217 @@
+"""
+Parameter sweeps for balance tuning.
+
+A sweep plays `seeds` games for every variant of a base config, where a
+variant overrides some card stats and/or rules:
+
+    cards.<card_id>.<field>   hp, atk, d, price, corruption, rage, pair_hp, pair_d, pair_r
+    rules.<field>             any GameConfig field (cascade_reward, ammo_max_bonus, ...)
+    hand_limit
+
+Variants come from a full grid (`grid`) or random sampling (`random_search`)
+and are spread over a process pool. Each worker parses the base YAML/CSV once
+and applies per-variant overlays on top of it, so no files are re-read per
+game. Results are returned as a columnar table: {column: [value per variant]}.
+
+Example:
+    python -m packages.simulator.sweep \\
+        --param rules.cascade_reward=1,2,3 --param cards.boss_gangster.hp=8,10,12 \\
+        --seeds 100 --workers 4 --out sweep.csv
+"""
+
+from __future__ import annotations
+import argparse
+import csv
+import itertools
+import random
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence
+
+from packages.engine.models import GameConfig
+from packages.simulator.balance import BaseCatalog, aggregate, load_base, play_one
+
+CARD_FIELDS = ("hp", "atk", "d", "price", "corruption", "rage", "pair_hp", "pair_d", "pair_r")
+
+Space = Dict[str, Sequence[Any]]
+Table = Dict[str, List[Any]]
+
+
+def validate_param(name: str, base: Optional[BaseCatalog] = None) -> None:
+    """Raise ValueError for parameter names the sweep cannot apply."""
+    parts = name.split(".")
+    if parts == ["hand_limit"]:
+        return
+    if len(parts) == 2 and parts[0] == "rules":
+        if parts[1] not in GameConfig.model_fields:
+            raise ValueError(f"Unknown rules field: {parts[1]}")
+        return
+    if len(parts) == 3 and parts[0] == "cards":
+        if parts[2] not in CARD_FIELDS:
+            raise ValueError(f"Unsupported card field: {parts[2]} (expected one of {', '.join(CARD_FIELDS)})")
+        if base is not None and parts[1] not in base.catalog:
+            raise ValueError(f"Unknown card id: {parts[1]}")
+        return
+    raise ValueError(f"Bad sweep parameter: {name!r} (use cards.<id>.<field>, rules.<field> or hand_limit)")
+
+
+def grid(space: Space) -> List[Dict[str, Any]]:
+    """Every combination of the given values (cartesian product)."""
+    names = list(space)
+    return [dict(zip(names, combo)) for combo in itertools.product(*(space[n] for n in names))]
+
+
+def random_search(space: Space, n: int, seed: Optional[int] = None) -> List[Dict[str, Any]]:
+    """`n` variants with each parameter drawn uniformly from its values."""
+    rng = random.Random(seed)
+    return [{name: rng.choice(list(values)) for name, values in space.items()} for _ in range(n)]
+
+
+def apply_overlay(base: BaseCatalog, params: Dict[str, Any]) -> BaseCatalog:
+    """Return `base` with `params` applied; only overridden cards are copied."""
+    cfg = base.cfg
+    card_updates: Dict[str, Dict[str, Any]] = {}
+    for name, value in params.items():
+        parts = name.split(".")
+        if parts[0] == "cards":
+            card_updates.setdefault(parts[1], {})[parts[2]] = int(value)
+        elif parts[0] == "rules":
+            if cfg is base.cfg:
+                cfg = dict(cfg, rules=dict(cfg.get("rules") or {}))
+            cfg["rules"][parts[1]] = value
+        elif parts[0] == "hand_limit":
+            if cfg is base.cfg:
+                cfg = dict(cfg)
+            cfg["hand_limit"] = int(value)
+        else:
+            raise ValueError(f"Bad sweep parameter: {name!r}")
+    if not card_updates:
+        return BaseCatalog(cfg=cfg, cards=base.cards, catalog=base.catalog)
+    cards = [c.model_copy(update=card_updates[c.id]) if c.id in card_updates else c for c in base.cards]
+    catalog = {
+        cid: c.model_copy(update=card_updates[cid]) if cid in card_updates else c
+        for cid, c in base.catalog.items()
+    }
+    return BaseCatalog(cfg=cfg, cards=cards, catalog=catalog)
+
+
+def run_variant(base: BaseCatalog, params: Dict[str, Any], seeds: Sequence[int], turns: int,
+                policy: Optional[str] = None) -> Dict[str, Any]:
+    """Play every seed for one variant; return params + `aggregate` summary."""
+    variant = apply_overlay(base, params)
+    results = [play_one(seed, turns, variant, policy) for seed in seeds]
+    row = dict(params)
+    row.update(aggregate(results))
+    return row
+
+
+# Per-worker base catalog, parsed once by the pool initializer
+_worker_base: Optional[BaseCatalog] = None
+
+
+def _init_worker(config: str) -> None:
+    global _worker_base
+    _worker_base = load_base(config)
+
+
+def _variant_worker(args) -> Dict[str, Any]:
+    params, seeds, turns, policy = args
+    return run_variant(_worker_base, params, seeds, turns, policy)
+
+
+def to_table(rows: List[Dict[str, Any]]) -> Table:
+    """Rows -> columns, keeping the column order of the first row."""
+    columns: List[str] = []
+    for row in rows:
+        for k in row:
+            if k not in columns:
+                columns.append(k)
+    return {c: [row.get(c) for row in rows] for c in columns}
+
+
+def run_sweep(config: str, variants: List[Dict[str, Any]], seeds: Sequence[int], turns: int = 15,
+              policy: Optional[str] = None, workers: int = 1) -> Table:
+    """Evaluate `variants` of `config`; one table row per variant, in input order."""
+    base = load_base(config)
+    for params in variants:
+        for name in params:
+            validate_param(name, base)
+    seeds = list(seeds)
+    if workers <= 1 or len(variants) <= 1:
+        rows = [run_variant(base, p, seeds, turns, policy) for p in variants]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(config,)) as pool:
+            rows = list(pool.map(_variant_worker, [(p, seeds, turns, policy) for p in variants]))
+    for i, row in enumerate(rows):
+        row["variant"] = i
+    table = to_table(rows)
+    # Variant index first for readability
+    return {"variant": table.pop("variant"), **table}
+
+
+def write_table(table: Table, path: str) -> None:
+    columns = list(table)
+    n = len(table[columns[0]]) if columns else 0
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(columns)
+        for i in range(n):
+            w.writerow([table[c][i] for c in columns])
+
+
+def _parse_value(text: str) -> Any:
+    t = text.strip()
+    if t.lower() in {"true", "false"}:
+        return t.lower() == "true"
+    try:
+        return int(t)
+    except ValueError:
+        return t
+
+
+def parse_space(specs: List[str]) -> Space:
+    """Parse `name=v1,v2,...` or `name=lo:hi` (inclusive int range) specs."""
+    space: Space = {}
+    for spec in specs:
+        if "=" not in spec:
+            raise ValueError(f"Bad --param {spec!r}: expected name=values")
+        name, values = spec.split("=", 1)
+        name = name.strip()
+        validate_param(name)
+        if ":" in values:
+            lo, hi = (int(v) for v in values.split(":", 1))
+            space[name] = list(range(lo, hi + 1))
+        else:
+            space[name] = [_parse_value(v) for v in values.split(",") if v.strip()]
+    return space
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep card stats and rules, simulating each variant")
+    parser.add_argument("--config", default="config/default.yaml")
+    parser.add_argument("--param", action="append", default=[],
+                        help="cards.<id>.<field>=v1,v2 | rules.<field>=lo:hi | hand_limit=... (repeatable)")
+    parser.add_argument("--random", type=int, default=0, help="Sample N random variants instead of the full grid")
+    parser.add_argument("--sample-seed", type=int, default=0)
+    parser.add_argument("--seeds", type=int, default=100)
+    parser.add_argument("--turns", type=int, default=15)
+    parser.add_argument("--policy", default="", choices=["", "random", "greedy", "mcts"])
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--out", default="", help="Write the results table to this CSV file")
+    args = parser.parse_args()
+
+    space = parse_space(args.param)
+    variants = random_search(space, args.random, args.sample_seed) if args.random else grid(space)
+    table = run_sweep(args.config, variants, range(1, args.seeds + 1), args.turns,
+                      policy=args.policy or None, workers=args.workers)
+
+    names = list(space)
+    for i in range(len(table["variant"])):
+        params = ", ".join(f"{n}={table[n][i]}" for n in names)
+        print(f"[{i}] {params}: P1 winrate={table['p1_winrate'][i]*100:.1f}%, mean turns={table['mean_turns'][i]:.2f}")
+    if args.out:
+        write_table(table, args.out)
+        print(f"Saved sweep table to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
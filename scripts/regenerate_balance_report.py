@@ -1,6 +1,8 @@
 #!/usr/bin/env python3
 import sys
 import os
+import hashlib
+import types
 
 # Ensure project root is on PYTHONPATH when running from repo root
 ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -8,17 +10,48 @@ if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
 
 from packages.simulator.balance_analyzer import BalanceAnalyzer  # type: ignore
+from packages.simulator import balance_analyzer
+from packages.simulator.result_cache import ResultCache, cache_key, source_fingerprint
 
 CARDS = os.path.join(ROOT, 'config', 'cards.csv')
 OUT = os.path.join(ROOT, 'docs', 'balance_report.md')
 
+
+def analyzer_sources():
+    """Source files of the analyzer and every project module it imports (transitively)."""
+    seen = {balance_analyzer.__name__}
+    todo = [balance_analyzer]
+    while todo:
+        module = todo.pop()
+        for value in vars(module).values():
+            name = value.__name__ if isinstance(value, types.ModuleType) else getattr(value, '__module__', None)
+            if isinstance(name, str) and name.startswith('packages.') and name not in seen and name in sys.modules:
+                seen.add(name)
+                todo.append(sys.modules[name])
+    return sorted(sys.modules[name].__file__ for name in seen)
+
+
 def main():
-    analyzer = BalanceAnalyzer(CARDS)
-    report = analyzer.generate_balance_report()
+    # The report depends only on the CSV and the analyzer code (with the modules it
+    # imports, e.g. duel_table): reuse it while all of them are unchanged
+    with open(CARDS, 'rb') as f:
+        cards_hash = hashlib.sha256(f.read()).hexdigest()
+    parts = {
+        'kind': 'balance_report',
+        'cards_csv': cards_hash,
+        'analyzer': source_fingerprint(*analyzer_sources()),
+    }
+    cache = ResultCache()
+    report = cache.run(
+        cache_key(**parts), [0],
+        lambda _: BalanceAnalyzer(CARDS).generate_balance_report(),
+        meta=parts,
+    )[0]
     os.makedirs(os.path.dirname(OUT), exist_ok=True)
     with open(OUT, 'w', encoding='utf-8') as f:
         f.write(report)
-    print(f"Regenerated: {OUT}")
+    status = "from cache" if cache.hits else "regenerated"
+    print(f"Regenerated: {OUT} ({status})")
 
 if __name__ == '__main__':
     main()
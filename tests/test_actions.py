@@ -4,7 +4,7 @@ Unit-тесты для действий engine/actions.py и их примене
 
 import pytest
 from packages.engine.actions import (
-    Action, Attack, Defend, Influence, DiscardCard, Draw
+    Action, Attack, Defend, Influence, DiscardCard, Draw, UseAbility
 )
 from packages.engine.engine import apply_action
 from packages.engine.models import Card, CardType, TurnPhase
@@ -779,3 +779,59 @@ class TestDrawActions:
         assert ctx.state.players["P1"].slots[2].card.id == "existing"
         assert len(ctx.state.deck) == 1
         assert ctx.state.deck[0].id == "new_card"
+
+
+class TestUseAbilityActions:
+    """Тесты платных способностей (UseAbility)"""
+
+    def _ctx(self, cooldown=1, cost=2, effect_id="heal_self_1"):
+        from packages.engine.models import PaidAbility
+        card = TestDataBuilder.create_basic_card("medic", hp=2)
+        card.paid = [PaidAbility(id="patch", cost=cost, cooldown_per_turn=cooldown, effect_id=effect_id)]
+        state = TestDataBuilder.create_game_state(p1_cards=[card])
+        state.players["P1"].tokens.reserve_money = 10
+        return TestDataBuilder.create_context(state)
+
+    def test_use_ability_pays_and_runs_effect(self):
+        """Тест: способность списывает стоимость и вызывает эффект, ход продолжается"""
+        ctx = self._ctx()
+        p1 = ctx.state.players["P1"]
+
+        result = apply_action(ctx, UseAbility(own_slot=0, ability_id="patch"))
+
+        assert "error" not in result
+        assert p1.slots[0].card.hp == 3
+        assert p1.tokens.reserve_money == 8 and p1.tokens.otboy == 2
+        assert ctx.state.active_player == "P1"
+
+    def test_cooldown_per_turn(self):
+        """Тест: лимит использований за ход и сброс на следующем ходу"""
+        from packages.engine.engine import next_turn
+        ctx = self._ctx(cooldown=1)
+        action = UseAbility(own_slot=0, ability_id="patch")
+
+        apply_action(ctx, action)
+        assert apply_action(ctx, action) == {"error": "ability_on_cooldown"}
+
+        next_turn(ctx)
+        next_turn(ctx)
+        assert "error" not in apply_action(ctx, action)
+
+    def test_errors(self):
+        """Тест: неизвестная способность, эффект и нехватка денег"""
+        ctx = self._ctx(cost=20)
+        assert apply_action(ctx, UseAbility(own_slot=0, ability_id="nope"))["error"] == "unknown_ability"
+        assert apply_action(ctx, UseAbility(own_slot=0, ability_id="patch"))["error"] == "not_enough_money"
+        ctx = self._ctx(effect_id="missing")
+        assert apply_action(ctx, UseAbility(own_slot=0, ability_id="patch"))["error"] == "unknown_effect"
+
+    def test_legal_actions_respect_cooldown(self):
+        """Тест: генератор ходов предлагает способность, пока она не на перезарядке"""
+        from packages.engine.legal import legal_actions
+        ctx = self._ctx(cooldown=1)
+        offered = [a for a in legal_actions(ctx.state) if isinstance(a, UseAbility)]
+        assert [(a.own_slot, a.ability_id) for a in offered] == [(0, "patch")]
+
+        apply_action(ctx, offered[0])
+
+        assert not any(isinstance(a, UseAbility) for a in legal_actions(ctx.state))
@@ -0,0 +1,187 @@
+"""
+Unit-тесты для бот-политик simulator/bots.py
+"""
+
+import random
+import pytest
+from packages.engine.engine import Ctx, apply_action
+from packages.engine.legal import legal_actions
+from packages.engine.actions import Attack
+from packages.engine.models import Card
+from packages.simulator.bots import (
+    RandomPolicy, GreedyPolicy, MCTSPolicy, make_policy, play_game,
+    determinize, evaluate, action_key, policy_id, reproducible_policy,
+)
+from tests.test_helpers import TestDataBuilder, CardTemplates
+
+
+def _state():
+    state = TestDataBuilder.create_game_state(
+        p1_cards=[Card(**CardTemplates.BOSS_GANGSTER), Card(**CardTemplates.LONER_HACKER)],
+        p2_cards=[Card(**{**CardTemplates.BOSS_GANGSTER, "id": "boss_p2"}), Card(**CardTemplates.AUTHORITY_OFFICER)],
+    )
+    state.deck = [TestDataBuilder.create_basic_card(f"d{i}") for i in range(10)]
+    state.players["P2"].hand = [TestDataBuilder.create_basic_card(f"h{i}") for i in range(2)]
+    return state
+
+
+class TestPolicies:
+    """Тесты выбора хода политиками"""
+
+    @pytest.mark.parametrize("name", ["random", "greedy"])
+    def test_policy_returns_legal_action(self, name):
+        """Тест: политика возвращает допустимый ход"""
+        state = _state()
+        policy = make_policy(name, seed=1)
+
+        assert policy.choose(state) in legal_actions(state)
+
+    def test_base_policy_is_abstract(self):
+        """Тест: базовый класс без choose нельзя создать"""
+        from packages.simulator.bots import Policy
+
+        with pytest.raises(TypeError):
+            Policy()
+
+    def test_unknown_policy(self):
+        """Тест: неизвестная политика"""
+        with pytest.raises(ValueError):
+            make_policy("nope")
+
+    def test_greedy_takes_winning_move(self):
+        """Тест: жадная политика добивает босса"""
+        state = _state()
+        state.players["P2"].slots[0].card.hp = 2
+
+        action = GreedyPolicy(seed=0).choose(state)
+        res = apply_action(Ctx(state=state), action)
+
+        assert res.get("winner") == "P1"
+
+    def test_greedy_does_not_mutate_state(self):
+        """Тест: перебор на копиях не меняет исходное состояние"""
+        state = _state()
+        before = state.model_dump()
+
+        GreedyPolicy(seed=0).choose(state)
+
+        assert state.model_dump() == before
+
+    def test_evaluate_symmetric(self):
+        """Тест: оценка симметрична для двух игроков"""
+        state = _state()
+        state.players["P2"].slots[1].card = None
+
+        assert evaluate(state, "P1") > 0.5
+        assert evaluate(state, "P1") + evaluate(state, "P2") == pytest.approx(1.0)
+
+
+class TestDeterminization:
+    """Тесты детерминизации скрытой информации"""
+
+    def test_hidden_cards_reshuffled(self):
+        """Тест: колода и рука соперника перераспределяются, размеры сохраняются"""
+        state = _state()
+        det = determinize(state, "P1", random.Random(3))
+
+        before = sorted(c.id for c in state.deck + state.players["P2"].hand)
+        after = sorted(c.id for c in det.deck + det.players["P2"].hand)
+        assert before == after
+        assert len(det.players["P2"].hand) == 2
+        assert len(det.deck) == 10
+        assert [c.id for c in state.players["P2"].hand] == ["h0", "h1"]
+
+    def test_own_hand_untouched(self):
+        """Тест: собственная рука наблюдателя не меняется"""
+        state = _state()
+        state.players["P1"].hand = [TestDataBuilder.create_basic_card("mine")]
+
+        det = determinize(state, "P1", random.Random(0))
+
+        assert [c.id for c in det.players["P1"].hand] == ["mine"]
+
+
+class TestMCTS:
+    """Тесты MCTS-бота"""
+
+    def test_iteration_budget(self):
+        """Тест: бюджет итераций соблюдается"""
+        state = _state()
+        policy = MCTSPolicy(time_budget=0, max_iterations=40, seed=1)
+
+        action = policy.choose(state)
+
+        assert action in legal_actions(state)
+        assert sum(n for n, _ in policy.last_stats.values()) == 40
+
+    def test_time_budget(self):
+        """Тест: ход укладывается в бюджет времени"""
+        import time
+        state = _state()
+        policy = MCTSPolicy(time_budget=0.05, seed=1)
+
+        t0 = time.perf_counter()
+        policy.choose(state)
+
+        assert time.perf_counter() - t0 < 0.5
+
+    def test_finds_boss_kill(self):
+        """Тест: MCTS находит немедленную победу"""
+        state = _state()
+        state.players["P2"].slots[0].card.hp = 2
+
+        action = MCTSPolicy(time_budget=0, max_iterations=300, seed=2).choose(state)
+
+        assert isinstance(action, Attack)
+        assert action.target_slot == 0
+
+    def test_does_not_mutate_state(self):
+        """Тест: поиск не меняет исходное состояние"""
+        state = _state()
+        before = state.model_dump()
+
+        MCTSPolicy(time_budget=0, max_iterations=50, seed=3).choose(state)
+
+        assert state.model_dump() == before
+
+    @pytest.mark.slow
+    def test_root_parallel(self):
+        """Тест: параллельный поиск по процессам суммирует статистику"""
+        state = _state()
+        policy = MCTSPolicy(time_budget=0, max_iterations=30, workers=2, seed=4)
+        try:
+            action = policy.choose(state)
+        finally:
+            policy.close()
+
+        assert action in legal_actions(state)
+        assert sum(n for n, _ in policy.last_stats.values()) == 60
+
+
+class TestPlayGame:
+    """Тесты прогона партии ботами"""
+
+    def test_play_until_cap_or_winner(self):
+        """Тест: партия заканчивается победой или лимитом ходов"""
+        state = _state()
+        res = play_game(state, {"P1": RandomPolicy(1), "P2": RandomPolicy(2)}, max_turns=30)
+
+        assert res["turns_played"] <= 30
+        assert res["winner"] in (None, "P1", "P2")
+
+    def test_action_key_distinguishes_actions(self):
+        """Тест: ключи действий различаются"""
+        keys = {action_key(a) for a in legal_actions(_state())}
+
+        assert len(keys) == len(legal_actions(_state()))
+
+    def test_reproducible_policies_replay_by_seed(self):
+        """Тест: воспроизводимые боты (MCTS без часов) играют по сиду одинаково"""
+        def game(seed):
+            bots = {"P1": reproducible_policy("mcts", seed), "P2": reproducible_policy("greedy", seed + 1)}
+            return play_game(_state(), bots, max_turns=12)
+
+        assert reproducible_policy("mcts", 1).time_budget == 0
+        assert [game(s) for s in (1, 2)] == [game(s) for s in (1, 2)]
+        assert policy_id("greedy") == "greedy:1"
+        assert "max_iterations=" in policy_id("mcts")
@@ -0,0 +1,115 @@
+"""
+Unit-тесты для колоночного хранилища результатов simulator/columnar.py
+"""
+
+import pytest
+from packages.simulator.columnar import ColumnarReader, ColumnarWriter, write_table
+from packages.simulator.game_simulator import GameSimulator
+
+
+def _rows(n):
+    return [
+        {"seed": i, "winner": ("P1" if i % 3 else "P2") if i % 7 else None, "turns": 5 + i % 10,
+         "score": i / 4, "draw": i % 5 == 0}
+        for i in range(n)
+    ]
+
+
+class TestColumnarTable:
+    """Тесты записи и чтения таблицы"""
+
+    def test_roundtrip_with_nulls(self, tmp_path):
+        """Тест: значения и типы колонок сохраняются, включая None"""
+        rows = _rows(50)
+        path = tmp_path / "t.kpcol"
+
+        assert write_table(rows, path, row_group_size=16) == 50
+
+        reader = ColumnarReader(path)
+        assert reader.schema == {"seed": "int", "winner": "str", "turns": "int", "score": "float", "draw": "bool"}
+        assert len(reader.row_groups) == 4
+        assert list(reader) == rows
+
+    def test_column_projection(self, tmp_path):
+        """Тест: чтение только выбранных колонок"""
+        path = tmp_path / "t.kpcol"
+        write_table(_rows(10), path)
+
+        table = ColumnarReader(path).read(["turns"])
+
+        assert list(table) == ["turns"]
+        assert table["turns"] == [5 + i for i in range(10)]
+
+    def test_filters(self, tmp_path):
+        """Тест: фильтры по значениям"""
+        rows = _rows(100)
+        path = tmp_path / "t.kpcol"
+        write_table(rows, path, row_group_size=10)
+
+        got = ColumnarReader(path).read(["seed"], filters=[("winner", "==", "P2"), ("turns", ">=", 10)])
+
+        expected = [r["seed"] for r in rows if r["winner"] == "P2" and r["turns"] >= 10]
+        assert got["seed"] == expected
+
+    def test_row_groups_pruned_by_stats(self, tmp_path, monkeypatch):
+        """Тест: группы строк вне диапазона фильтра не читаются"""
+        path = tmp_path / "t.kpcol"
+        write_table(_rows(100), path, row_group_size=10)
+        reader = ColumnarReader(path)
+        reads = []
+        original = reader._chunk
+        monkeypatch.setattr(reader, "_chunk", lambda f, g, c: reads.append(c) or original(f, g, c))
+
+        got = reader.read(["seed"], filters=[("seed", "<", 10)])
+
+        assert got["seed"] == list(range(10))
+        assert len(reads) == 1
+
+    def test_streaming_writes_row_groups(self, tmp_path):
+        """Тест: полные группы строк пишутся на диск сразу"""
+        path = tmp_path / "t.kpcol"
+        w = ColumnarWriter(path, row_group_size=4)
+        w.extend(_rows(9))
+
+        assert w.rows_written == 8
+        w.close()
+        assert ColumnarReader(path).num_rows == 9
+
+    def test_type_mismatch_rejected(self, tmp_path):
+        """Тест: значение не того типа отклоняется"""
+        with ColumnarWriter(tmp_path / "t.kpcol", schema={"turns": "int"}) as w:
+            with pytest.raises(ValueError):
+                w.append({"turns": "many"})
+
+    def test_unknown_column_rejected(self, tmp_path):
+        """Тест: колонка вне схемы отклоняется"""
+        with ColumnarWriter(tmp_path / "t.kpcol", schema={"turns": "int"}) as w:
+            with pytest.raises(ValueError):
+                w.append({"turns": 1, "extra": 2})
+
+    def test_unclosed_file_rejected(self, tmp_path):
+        """Тест: файл без футера не читается"""
+        path = tmp_path / "t.kpcol"
+        w = ColumnarWriter(path, row_group_size=2)
+        w.extend(_rows(4))
+
+        with pytest.raises(ValueError):
+            ColumnarReader(path)
+        w.close()
+
+
+class TestSimulatorResultsDir:
+    """Тесты записи результатов GameSimulator на диск"""
+
+    def test_detailed_results_on_disk(self, tmp_path):
+        """Тест: detailed_results — таблица на диске, а не список"""
+        simulator = GameSimulator("config/cards.csv", results_dir=str(tmp_path))
+
+        result = simulator.run_matchup_simulation("gangsters", "solo", games=12)
+
+        table = result["detailed_results"]
+        assert type(table).__name__ == "ColumnarReader"
+        assert len(table) == 12
+        assert (tmp_path / "gangsters_vs_solo.kpcol").exists()
+        wins = result["wins"]
+        assert len(table.read(["turns"], filters=[("winner", "==", "Player_gangsters")])["turns"]) == wins["gangsters"]
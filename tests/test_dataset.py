@@ -0,0 +1,82 @@
+"""
+Unit-тесты для генератора датасетов самоигры simulator/dataset.py
+"""
+
+import json
+
+import pytest
+from packages.simulator.dataset import MANIFEST, _position, generate, read_dataset, read_manifest
+from tests.test_helpers import TestDataBuilder
+
+CONFIG = "config/default.yaml"
+
+
+def _generate(out, **kw):
+    params = dict(games=6, policies=("greedy", "random"), config=CONFIG, turns=30, games_per_shard=4)
+    params.update(kw)
+    return generate(out, **params)
+
+
+class TestGenerate:
+    """Тесты генерации, манифеста и возобновления"""
+
+    def test_manifest_and_rows(self, tmp_path):
+        """Тест: шарды перечислены в манифесте, строки размечены исходом партии"""
+        manifest = _generate(tmp_path)
+
+        assert manifest["complete"] and manifest == read_manifest(tmp_path)
+        assert [s["games"] for s in manifest["shards"]] == [[0, 4], [4, 6]]
+        rows = list(read_dataset(tmp_path))
+        assert len(rows) == sum(s["rows"] for s in manifest["shards"])
+        assert {r["game"] for r in rows} == set(range(6))
+        for r in rows:
+            assert r["game_length"] > r["step"] >= 0 and r["legal_count"] > 0
+            expected = 0.0 if r["winner"] is None else (1.0 if r["winner"] == r["player"] else -1.0)
+            assert r["result"] == expected and r["win_reason"]
+            assert json.loads(r["action"])["kind"] == r["action_kind"]
+
+    def test_resume_skips_finished_shards(self, tmp_path):
+        """Тест: повторный запуск доигрывает только недостающие шарды"""
+        full = _generate(tmp_path)
+        first, second = (tmp_path / s["file"] for s in full["shards"])
+        mtimes = first.stat().st_mtime_ns, second.stat().st_mtime_ns
+        partial = dict(full, shards=full["shards"][1:], complete=False)
+        (tmp_path / MANIFEST).write_text(json.dumps(partial))
+
+        resumed = _generate(tmp_path)
+
+        assert resumed == full
+        assert first.stat().st_mtime_ns != mtimes[0]
+        assert second.stat().st_mtime_ns == mtimes[1]
+
+    def test_rejects_other_parameters(self, tmp_path):
+        """Тест: возобновление с другими параметрами отклоняется"""
+        _generate(tmp_path, games=2)
+
+        with pytest.raises(ValueError):
+            _generate(tmp_path, games=2, turns=31)
+        with pytest.raises(ValueError):
+            _generate(tmp_path, games=2, policies=("greedy", "greedy"))
+
+
+class TestPosition:
+    """Тесты записи позиции с точки зрения ходящего"""
+
+    def test_opponent_face_down_cards_hidden(self):
+        """Тест: у закрытых карт соперника видны только мускулы"""
+        state = TestDataBuilder.create_game_state(
+            p1_cards=[TestDataBuilder.create_basic_card("mine")],
+            p2_cards=[TestDataBuilder.create_basic_card("secret", atk=3), TestDataBuilder.create_basic_card("open")],
+        )
+        state.players["P1"].slots[0].face_up = False
+        state.players["P2"].slots[0].face_up = False
+        state.players["P2"].slots[0].muscles = 2
+        state.players["P2"].slots[1].face_up = True
+
+        row = _position(state)
+
+        assert row["me_s0_card"] == "mine" and row["me_s0_face_up"] is False
+        assert [row[f"op_s0_{k}"] for k in ("card", "hp", "atk", "d", "muscles", "face_up")] == \
+            [None, None, None, None, 2, False]
+        assert row["op_s1_card"] == "open"
+
@@ -0,0 +1,53 @@
+"""
+Unit-тесты для дифференциального фаззера редьюсеров (simulator/differential.py)
+"""
+
+from packages.engine.actions import Defend, Draw, Influence
+from packages.simulator.differential import OUTCOMES, Report, _compare, run
+from tests.test_helpers import duel_state  # noqa: F401
+
+
+class TestDifferential:
+    """Тесты сравнения engine.apply_action и engine_refactored"""
+
+    def test_pass_agrees(self, duel_state):
+        """Тест: пас без денег на подкуп одинаков в обоих редьюсерах"""
+        state = duel_state()
+        state.players["P1"].tokens.reserve_money = 1
+        report = Report()
+
+        after = _compare(state, Influence(), report, seed=0, step=0)
+
+        assert report.kinds["influence"].outcomes["agree"] == 1
+        assert after.active_player == "P2" and state.active_player == "P1"
+
+    def test_error_and_unsupported_classified(self, duel_state):
+        """Тест: исключение и неподдержанное действие попадают в свои категории"""
+        report = Report()
+        _compare(duel_state(), Defend(target_slot=1, hire_count=1), report, seed=3, step=5)
+        _compare(duel_state(), Draw(place="slot", slot_index=3), report, seed=3, step=6)
+
+        assert report.kinds["defend"].outcomes["error"] == 1
+        assert report.kinds["draw"].outcomes["unsupported"] == 1
+        assert report.examples[0]["seed"] == 3 and report.examples[0]["step"] == 5
+
+    def test_run_report(self, duel_state):
+        """Тест: отчёт детерминирован, исходы покрывают все действия, скорость посчитана"""
+        first = run(3, actions=20, seed=1, make_state=lambda s: duel_state()).as_dict()
+        second = run(3, actions=20, seed=1, make_state=lambda s: duel_state()).as_dict()
+
+        assert sum(first[o] for o in OUTCOMES) == first["actions"] > 0
+        assert {k: v["count"] for k, v in first["kinds"].items()} == \
+            {k: v["count"] for k, v in second["kinds"].items()}
+        for k in first["kinds"].values():
+            assert (k["generic_per_s"] > 0) == (k["refactored_per_s"] > 0) == (k["agree"] > 0)
+
+    def test_only_agreeing_actions_timed(self, duel_state):
+        """Тест: ошибки и неподдержанные действия не входят в замер скорости"""
+        report = Report()
+        _compare(duel_state(), Defend(target_slot=1, hire_count=1), report, seed=0, step=0)
+        _compare(duel_state(), Draw(place="slot", slot_index=3), report, seed=0, step=1)
+
+        for name in ("defend", "draw"):
+            k = report.kinds[name]
+            assert k.generic_seconds == k.refactored_seconds == 0.0 and k.rate(1.0) == 0.0
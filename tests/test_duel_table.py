@@ -0,0 +1,99 @@
+"""
+Unit-тесты для таблицы дуэлей карт simulator/duel_table.py
+"""
+
+import csv
+from packages.simulator.duel_table import DIES, KILL, NONE, TRADE, DuelTable, get_table
+from packages.simulator.balance_analyzer import BalanceAnalyzer
+from packages.simulator.game_simulator import GameCard, GameSimulator
+
+STATS = [("a", 3, 2), ("b", 2, 3), ("c", 5, 1)]
+
+
+class TestDuelTable:
+    """Тесты предрасчитанных обменов"""
+
+    def test_exchange_matches_combat_rule(self):
+        """Тест: урон — ATK минус щиты, не меньше нуля"""
+        table = DuelTable(STATS)
+
+        assert table.exchange("a", "b") == (2, 3)
+        assert table.exchange("a", "b", attacker_shields=1, defender_shields=2) == (0, 2)
+        assert table.exchange("c", "a", defender_shields=3) == (0, 2)
+
+    def test_outcomes(self):
+        """Тест: исход обмена при полном здоровье"""
+        table = DuelTable(STATS)
+
+        assert table.outcome("a", "b") == TRADE
+        assert table.outcome("b", "c") == NONE
+        assert table.outcome("a", "b", defender_shields=1) == DIES
+        assert table.outcome("b", "a", attacker_shields=2) == KILL
+
+    def test_shields_clamped_exactly(self):
+        """Тест: щитов больше предела — урон всё равно ноль"""
+        table = DuelTable(STATS)
+
+        assert table.max_shields == 3
+        assert table.exchange("b", "a", 9, 9) == (0, 0)
+
+    def test_shared_until_catalog_changes(self):
+        """Тест: таблица переиспользуется и пересчитывается при изменении карты"""
+        first = get_table(STATS)
+
+        assert get_table(list(STATS)) is first
+        assert get_table([("a", 3, 2), ("b", 2, 4), ("c", 5, 1)]) is not first
+
+    def test_export_for_heatmap(self, tmp_path):
+        """Тест: экспорт в длинный CSV — строка на каждую комбинацию"""
+        table = DuelTable(STATS)
+        path = tmp_path / "duels.csv"
+
+        assert table.write_csv(path) == len(table) == 3 * 3 * 4 * 4
+        with open(path, newline="", encoding="utf-8") as f:
+            first = next(csv.DictReader(f))
+        assert first["attacker"] == "a" and first["defender"] == "a" and first["outcome"] == "none"
+
+
+class TestConsumers:
+    """Тесты использования таблицы симулятором и анализатором"""
+
+    def test_simulator_uses_table(self, monkeypatch):
+        """Тест: бой legacy-модели берёт обмен из таблицы"""
+        simulator = GameSimulator("config/cards.csv", seed=1, rules="legacy")
+        simulator._duel = table = simulator.duel_table()
+        calls = []
+        original = table.exchange
+        monkeypatch.setattr(table, "exchange", lambda *a: calls.append(a) or original(*a))
+        cards = {c.id: c for cards in simulator.cards_data.values() for c in cards}
+        attacker = GameCard.from_engine_card(cards["solo_killer"].engine_card)
+        defender = GameCard.from_engine_card(cards["gangster_thief"].engine_card)
+
+        assert simulator.combat_phase(attacker, defender) == (False, True)
+        assert calls == [("solo_killer", "gangster_thief", 0, 0)]
+
+    def test_analyzer_caste_duels(self, tmp_path):
+        """Тест: анализатор считает матрицу дуэлей кланов"""
+        header = ["ID", "Название", "Тип", "Клан", "Фракция", "HP", "ATK", "Price", "Corruption",
+                  "Defend", "Rage", "ABL", "Independence", "В_колоде", "Описание"]
+        rows = [
+            ["g1", "G1", "common", "gangsters", "stormers", "3", "4", "2", "1", "0", "0", "", "0", "✓", ""],
+            ["a1", "A1", "common", "authorities", "stormers", "5", "2", "2", "1", "0", "0", "", "0", "✓", ""],
+            ["a2", "A2", "common", "authorities", "stormers", "4", "1", "2", "1", "0", "0", "", "0", "✓", ""],
+        ]
+        path = tmp_path / "cards.csv"
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(header)
+            w.writerows(rows)
+
+        duels = BalanceAnalyzer(str(path)).analyze_caste_duels()
+
+        assert duels["gangsters"]["authorities"] == 0.5
+        assert duels["authorities"]["gangsters"] == 0.0
+
+    def test_analyzer_shares_package_module(self):
+        """Тест: анализатор использует тот же модуль таблиц, что и пакет (один кэш)"""
+        from packages.simulator import balance_analyzer, duel_table
+
+        assert balance_analyzer.get_duel_table is duel_table.get_table
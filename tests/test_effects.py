@@ -357,3 +357,69 @@ class TestEffectIntegration:
         # Проверяем изменения
         assert ctx.state.players["P1"].slots[0].card.hp == 4  # 2 + 2
         assert ctx.state.players["P2"].slots[1].card.hp == 7  # 5 + 2
+
+
+class TestTriggerBus:
+    """Тесты шины триггеров: подписки карт и вызов эффектов движком"""
+
+    def setup_method(self):
+        """Очистка пользовательских эффектов перед каждым тестом"""
+        _registry.clear()
+
+    def _ctx_with(self, card, slot=1, pid="P2"):
+        from tests.test_helpers import TestDataBuilder
+        ctx = TestDataBuilder.create_context()
+        ctx.state.players[pid].slots[slot].card = card
+        return ctx
+
+    def test_card_subscribes_at_build(self):
+        """Тест: подписки карты строятся из abl при создании"""
+        from packages.engine.effects import subscriptions, listening
+        from tests.test_helpers import TestDataBuilder
+        card = TestDataBuilder.create_basic_card("c", abl={"on_enter": {"gain": 2}, "on_death": "revenge"})
+
+        assert subscriptions(card) == {"on_enter": (("gain", 2),), "on_death": (("revenge", 1),)}
+        assert listening("on_death")
+
+    def test_registered_effect_on_damage_and_death(self):
+        """Тест: новый эффект подключается через register без правки движка"""
+        from packages.engine.engine import apply_action
+        from packages.engine.actions import Attack
+        from tests.test_helpers import TestDataBuilder
+        calls = []
+
+        @register("revenge")
+        def revenge(ctx, payload):
+            calls.append((payload["trigger"], payload.get("damage")))
+
+        card = TestDataBuilder.create_basic_card("victim", hp=3, abl={"on_damage": "revenge", "on_death": "revenge"})
+        ctx = self._ctx_with(card)
+
+        apply_action(ctx, Attack(target_player="P2", base_damage=5, target_slot=1))
+
+        assert calls == [("on_damage", 5), ("on_death", None)]
+
+    def test_turn_triggers(self):
+        """Тест: turn_end и turn_start срабатывают для карт на столе владельца"""
+        from packages.engine.engine import Ctx, next_turn
+        from tests.test_helpers import TestDataBuilder
+        card = TestDataBuilder.create_basic_card("banker", abl={"turn_start": {"gain": 2}, "turn_end": {"gain": 1}})
+        ctx = self._ctx_with(card)
+        before = ctx.state.players["P2"].tokens.reserve_money
+
+        next_turn(ctx)   # P1 -> P2: начало хода P2
+        next_turn(ctx)   # P2 -> P1: конец хода P2
+
+        assert ctx.state.players["P2"].tokens.reserve_money == before + 3
+        assert [e["type"] for e in ctx.log] == ["turn_start", "turn_end"]
+
+    def test_events_dispatch_by_card_id(self):
+        """Тест: карта-событие разрешается эффектом со своим id"""
+        from packages.engine.engine import resolve_event
+        from tests.test_helpers import TestDataBuilder
+        ctx = TestDataBuilder.create_context()
+        ctx.state.players["P1"].tokens.otboy = 3
+
+        resolve_event(ctx, TestDataBuilder.create_basic_card("event_plus_cash"))
+
+        assert ctx.log == [{"type": "event_plus_cash", "moved": 2}]
@@ -0,0 +1,129 @@
+"""
+Unit-тесты для точного решателя эндшпилей simulator/endgame.py
+"""
+
+from packages.engine.engine import Ctx, apply_action
+from packages.engine.actions import Attack
+from packages.simulator.endgame import DRAW, LOSS, WIN, EndgameSolver
+from tests.test_helpers import TestDataBuilder
+
+
+def _endgame(p1_boss_hp=4, p2_boss_hp=2, money=3, p1_atk=3):
+    state = TestDataBuilder.create_game_state(
+        p1_cards=[TestDataBuilder.create_boss_card("b1", hp=p1_boss_hp, atk=0),
+                  TestDataBuilder.create_basic_card("x", hp=3, atk=p1_atk, d=0)],
+        p2_cards=[TestDataBuilder.create_boss_card("b2", hp=p2_boss_hp, atk=0)],
+    )
+    for p in state.players.values():
+        p.tokens.reserve_money = money
+    return state
+
+
+def _brute_force(ctx, plies):
+    """Минимакс без таблицы — эталон для сравнения"""
+    if plies == 0:
+        return DRAW
+    st = ctx.state
+    best = LOSS
+    for action in EndgameSolver.moves(st):
+        child = Ctx.model_construct(state=st.fork(), log=[], undo=[])
+        res = apply_action(child, action)
+        if "error" in res:
+            continue
+        if "winner" in res:
+            value = WIN if res["winner"] == st.active_player else LOSS
+        else:
+            value = -_brute_force(child, plies - 1)
+        best = max(best, value)
+    return best
+
+
+class TestSolver:
+    """Тесты значений позиций"""
+
+    def test_mate_in_one(self):
+        """Тест: добивание Босса находится и называется лучшим ходом"""
+        state = _endgame()
+
+        solution = EndgameSolver().solve_fastest(state, 3)
+
+        assert solution.result == "win"
+        assert solution.max_plies == 1
+        assert all(isinstance(a, Attack) and a.target_slot == 0 for a in solution.best_moves)
+
+    def test_forced_loss_by_collapse(self):
+        """Тест: без денег и мускулов любой ход проигрывает"""
+        state = _endgame(p2_boss_hp=10, money=0)
+
+        assert EndgameSolver().solve(state, 2).value == LOSS
+
+    def test_draw_without_attackers(self):
+        """Тест: без атакующих карт никто не может победить"""
+        state = _endgame(p2_boss_hp=10, p1_atk=0)
+
+        assert EndgameSolver().solve(state, 3).value == DRAW
+
+    def test_matches_brute_force(self):
+        """Тест: таблица не меняет результат минимакса"""
+        state = _endgame(p1_boss_hp=3, p2_boss_hp=5, money=2, p1_atk=2)
+        solver = EndgameSolver()
+
+        for plies in range(1, 4):
+            ctx = Ctx.model_construct(state=state.fork(), log=[], undo=[])
+            assert solver.solve(state, plies).value == _brute_force(ctx, plies)
+
+    def test_state_left_unchanged(self):
+        """Тест: решатель не меняет переданную позицию"""
+        state = _endgame(p2_boss_hp=5)
+        before = state.model_dump()
+
+        EndgameSolver().solve(state, 3)
+
+        assert state.model_dump() == before
+
+
+class TestEncoding:
+    """Тесты канонического кодирования позиций"""
+
+    def test_dead_cards_equivalent(self):
+        """Тест: любые HP ≤ 0 кодируются одинаково"""
+        solver = EndgameSolver()
+        a, b = _endgame(), _endgame()
+        a.players["P1"].slots[1].card.hp = 0
+        b.players["P1"].slots[1].card.hp = -4
+
+        assert solver.encode(a) == solver.encode(b)
+
+    def test_relevant_fields_distinguish(self):
+        """Тест: мускулы, деньги и очередь хода различают позиции"""
+        solver = EndgameSolver()
+        base = solver.encode(_endgame())
+        muscles, money, turn = _endgame(), _endgame(), _endgame()
+        muscles.players["P2"].slots[0].muscles = 1
+        money.players["P1"].tokens.reserve_money = 4
+        turn.active_player = "P2"
+
+        keys = {base, solver.encode(muscles), solver.encode(money), solver.encode(turn)}
+        assert len(keys) == 4
+
+    def test_rules_and_hand_limit_distinguish(self):
+        """Тест: правила и лимит руки входят в ключ, в т.ч. при правке конфига на месте"""
+        solver = EndgameSolver()
+        state = _endgame()
+        base = solver.encode(state)
+        limit = _endgame()
+        limit.players["P2"].hand_limit += 1
+        state.config.ammo_max_bonus += 1
+
+        keys = {base, solver.encode(limit), solver.encode(state)}
+        assert len(keys) == 3
+        state.config.ammo_max_bonus -= 1
+        assert solver.encode(state) == base
+
+    def test_position_cap(self):
+        """Тест: ограничение таблицы не меняет результат"""
+        state = _endgame(p1_boss_hp=3, p2_boss_hp=5, money=2, p1_atk=2)
+
+        capped = EndgameSolver(max_positions=5)
+        assert capped.solve(state, 3).value == EndgameSolver().solve(state, 3).value
+        assert len(capped.table) <= 5
@@ -0,0 +1,95 @@
+"""
+Unit-тесты для адаптера GameSimulator → движок simulator/engine_adapter.py
+"""
+
+import pytest
+from packages.simulator.game_simulator import GameSimulator
+
+DRAW_REASONS = {"turn_limit", "repetition", "no_progress"}
+WIN_REASONS = {"boss_killed", "economic_collapse"} | DRAW_REASONS
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    return GameSimulator("config/cards.csv", seed=5)
+
+
+class TestEngineRules:
+    """Тесты игр по правилам движка"""
+
+    def test_games_end_by_engine_rules(self, simulator):
+        """Тест: исход игры определяется движком"""
+        result = simulator.run_matchup_simulation("gangsters", "authorities", games=20)
+
+        assert result["games_played"] == 20
+        for game in result["detailed_results"]:
+            assert game["win_reason"] in WIN_REASONS
+            assert (game["winner"] == "Draw") == (game["win_reason"] in DRAW_REASONS)
+            assert 1 <= game["turns"] <= simulator.engine.max_turns
+
+    def test_cards_fill_the_whole_board(self):
+        """Тест: руки не раздаются, и карты из колоды занимают все слоты доски"""
+        simulator = GameSimulator("config/cards.csv", seed=5)
+        engine = simulator.engine
+        apply = engine._apply
+        most = 0
+
+        def spy(ctx, action):
+            nonlocal most
+            assert not any(p.hand for p in ctx.state.players.values())
+            res = apply(ctx, action)
+            most = max(most, *(sum(s.card is not None for s in p.slots) for p in ctx.state.players.values()))
+            return res
+
+        engine._apply = spy
+        simulator.run_matchup_simulation("gangsters", "authorities", games=10)
+
+        assert most == len(engine.new_state("gangsters", "authorities").players["P1"].slots)
+
+    def test_catalog_cards_not_mutated(self, simulator):
+        """Тест: партии не меняют общие шаблоны карт (copy-on-write)"""
+        before = {c.id: c.engine_card.hp for cards in simulator.cards_data.values() for c in cards}
+        boss_hp = {clan: b.hp for clan, b in simulator.bosses.items()}
+
+        simulator.run_matchup_simulation("loners", "solo", games=10)
+
+        assert {c.id: c.engine_card.hp for cards in simulator.cards_data.values() for c in cards} == before
+        assert {clan: b.hp for clan, b in simulator.bosses.items()} == boss_hp
+
+    def test_clan_without_boss_gets_stand_in(self, simulator):
+        """Тест: клан без своего Босса играет копией Босса каталога"""
+        assert "solo" not in simulator.bosses
+        assert simulator.engine.boss_for("solo").type == "boss"
+        assert simulator.engine.boss_for("gangsters").id == "boss_gangster"
+
+    def test_boss_change_invalidates_cached_game(self, simulator):
+        """Тест: Босс входит в зависимости закэшированной игры"""
+        entry = simulator._simulate_tracked("gangsters", "solo", seed=1)
+
+        assert "boss_gangster" in entry["deps"]
+        assert entry["result"]["caste1"] == "gangsters"
+
+
+class TestRulesSelection:
+    """Тесты выбора набора правил"""
+
+    def test_legacy_rules_still_available(self):
+        """Тест: прежняя модель боя доступна через rules='legacy'"""
+        simulator = GameSimulator("config/cards.csv", seed=5, rules="legacy")
+
+        result = simulator.run_matchup_simulation("gangsters", "solo", games=5)
+
+        assert simulator.engine is None
+        assert result["games_played"] == 5
+
+    def test_rules_in_cache_key(self):
+        """Тест: режим правил входит в ключ кэша"""
+        engine = GameSimulator("config/cards.csv", seed=0).cache_parts("gangsters", "solo")
+        legacy = GameSimulator("config/cards.csv", seed=0, rules="legacy").cache_parts("gangsters", "solo")
+
+        assert engine != legacy
+
+    def test_unknown_rules_rejected(self):
+        """Тест: неизвестный режим правил отклоняется"""
+        with pytest.raises(ValueError):
+            GameSimulator("config/cards.csv", rules="house")
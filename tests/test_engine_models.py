@@ -341,3 +341,11 @@ class TestPaidAbility:
         
         assert ability.cost == 1  # default
         assert ability.cooldown_per_turn == 1  # default
+
+    def test_free_unlimited_ability_rejected(self):
+        """Тест: бесплатная способность без лимита использований отклоняется"""
+        from packages.engine.models import PaidAbility
+
+        with pytest.raises(ValueError):
+            PaidAbility(id="loop", cost=0, cooldown_per_turn=0, effect_id="heal_self_1")
+        assert PaidAbility(id="free", cost=0, effect_id="heal_self_1").cooldown_per_turn == 1
@@ -0,0 +1,81 @@
+"""
+Unit-тесты для журнала событий движка engine/eventlog.py
+"""
+
+from packages.engine.engine import Ctx, apply_action, rollback
+from packages.engine.actions import Attack, Defend, Draw
+from packages.engine.eventlog import FULL, OFF, SUMMARY, EventLog, enabled
+from tests.test_helpers import TestDataBuilder
+
+
+def _play(log_level=FULL, events=None):
+    """Выставить карту с on_enter, защититься и атаковать"""
+    state = TestDataBuilder.create_game_state(
+        p1_cards=[TestDataBuilder.create_basic_card("atk", atk=2)],
+        p2_cards=[TestDataBuilder.create_basic_card("def", hp=5)],
+    )
+    state.deck = [TestDataBuilder.create_basic_card("gainer", abl={"on_enter": {"gain": 2}})]
+    ctx = Ctx(state=state, log_level=log_level, events=events)
+    apply_action(ctx, Draw(place="slot", slot_index=3))
+    apply_action(ctx, Defend(target_slot=0, hire_count=1))
+    apply_action(ctx, Attack(target_player="P2", target_slot=0, attacker_slot=0))
+    return ctx
+
+
+class TestLogLevels:
+    """Тесты уровней журнала"""
+
+    def test_full_keeps_dict_format(self):
+        """Тест: по умолчанию в ctx.log пишутся прежние словари"""
+        ctx = _play()
+
+        assert [e["type"] for e in ctx.log] == ["on_enter", "draw", "defend", "attack"]
+        assert ctx.log[2] == {"type": "defend", "hired": 1}
+        assert ctx.log[3] == {"type": "attack", "dmg": 2}
+
+    def test_summary_and_off(self):
+        """Тест: summary — одно событие на действие, off — ничего"""
+        assert [e["type"] for e in _play(SUMMARY).log] == ["draw", "defend", "attack"]
+        assert _play(OFF).log == []
+
+    def test_extra_fields_match_level(self):
+        """Тест: доп. поля событий пишутся только при включённом уровне"""
+        full = _play()
+
+        assert full.log[0]["effect"] == "gain" and full.log[1]["placed"] == {"zone": "slot", "slot": 3}
+        assert [enabled(Ctx(state=full.state, log_level=level), "on_enter") for level in (OFF, SUMMARY, FULL)] == \
+            [False, False, True]
+        assert [enabled(Ctx(state=full.state, log_level=level), "draw") for level in (OFF, SUMMARY, FULL)] == \
+            [False, True, True]
+
+
+class TestEventLog:
+    """Тесты колоночного кольцевого буфера"""
+
+    def test_buffer_converts_to_dicts(self):
+        """Тест: буфер даёт те же словари, что и ctx.log"""
+        ctx = _play(events=EventLog(16))
+
+        assert ctx.log == []
+        assert ctx.log_dicts() == _play().log
+
+    def test_ring_overwrites_oldest(self):
+        """Тест: при переполнении остаются последние события"""
+        log = EventLog(3)
+        for i in range(5):
+            log.append("defend", "P1", 0, i)
+
+        assert len(log) == 3 and log.dropped == 2
+        assert [d["hired"] for d in log.to_dicts()] == [2, 3, 4]
+
+    def test_rollback_truncates_buffer(self):
+        """Тест: откат удаляет события отменённых действий"""
+        state = TestDataBuilder.create_game_state(p1_cards=[TestDataBuilder.create_basic_card("a")])
+        ctx = Ctx(state=state, events=EventLog(8))
+        apply_action(ctx, Defend(target_slot=0, hire_count=1))
+        apply_action(ctx, Defend(target_slot=0, hire_count=1), record_undo=True)
+
+        rollback(ctx)
+
+        assert len(ctx.events) == 1
+        assert ctx.log_dicts() == [{"type": "defend", "hired": 1}]
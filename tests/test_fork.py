@@ -0,0 +1,137 @@
+"""
+Unit-тесты для копирования состояния при записи (fork) и отката ходов
+"""
+
+import random
+import pytest
+from packages.engine import zobrist as zh
+from packages.engine.engine import Ctx, apply_action, rollback
+from packages.engine.legal import legal_actions
+from packages.engine.actions import Attack, Defend, Draw
+from packages.engine.models import Card
+from tests.test_helpers import TestDataBuilder, CardTemplates
+
+
+def _state():
+    state = TestDataBuilder.create_game_state(
+        p1_cards=[Card(**CardTemplates.BASIC_GANGSTER), Card(**CardTemplates.LONER_HACKER)],
+        p2_cards=[Card(**CardTemplates.BOSS_GANGSTER), Card(**CardTemplates.AUTHORITY_OFFICER)],
+    )
+    state.deck = [TestDataBuilder.create_basic_card(f"d{i}") for i in range(8)]
+    state.players["P2"].hand = [TestDataBuilder.create_basic_card("p2_hand")]
+    return state
+
+
+class TestFork:
+    """Тесты fork()"""
+
+    def test_fork_equals_original(self):
+        """Тест: копия совпадает с оригиналом"""
+        state = _state()
+        child = state.fork()
+
+        assert child.model_dump() == state.model_dump()
+        assert child.config is state.config
+
+    def test_cards_shared_until_write(self):
+        """Тест: карты общие до первой записи"""
+        state = _state()
+        child = state.fork()
+
+        assert child.players["P2"].slots[1].card is state.players["P2"].slots[1].card
+        assert child.deck[0] is state.deck[0]
+
+    def test_child_damage_does_not_leak(self):
+        """Тест: урон в копии не затрагивает оригинал"""
+        state = _state()
+        child = state.fork()
+
+        apply_action(Ctx(state=child), Attack(target_player="P2", target_slot=1, attacker_slot=1))
+
+        assert child.players["P2"].slots[1].card.hp == 1
+        assert state.players["P2"].slots[1].card.hp == 4
+        assert state.players["P1"].tokens.reserve_money == 12
+
+    def test_parent_damage_does_not_leak(self):
+        """Тест: урон в оригинале после fork не затрагивает копию"""
+        state = _state()
+        child = state.fork()
+
+        apply_action(Ctx(state=state), Attack(target_player="P2", target_slot=1, attacker_slot=1))
+
+        assert state.players["P2"].slots[1].card.hp == 1
+        assert child.players["P2"].slots[1].card.hp == 4
+
+    def test_zones_independent(self):
+        """Тест: колода и рука копии независимы"""
+        state = _state()
+        child = state.fork()
+
+        apply_action(Ctx(state=child), Draw(place="hand"))
+
+        assert len(child.deck) == 7
+        assert len(state.deck) == 8
+        assert len(state.players["P1"].hand) == 0
+
+    def test_fork_keeps_hash(self):
+        """Тест: отслеживаемый хэш переносится в копию"""
+        state = _state()
+        h = state.state_hash()
+        child = state.fork()
+        apply_action(Ctx(state=child), Defend(target_slot=0, hire_count=1))
+
+        assert state.state_hash() == h
+        assert child.state_hash() == zh.full_hash(child)
+        assert child.state_hash() != h
+
+
+class TestRollback:
+    """Тесты отката действий"""
+
+    def test_rollback_single_action(self):
+        """Тест: откат одного действия восстанавливает состояние"""
+        state = _state()
+        before = state.model_dump()
+        ctx = Ctx(state=state)
+
+        apply_action(ctx, Attack(target_player="P2", target_slot=1, attacker_slot=1, ammo_spend=2), record_undo=True)
+        assert state.model_dump() != before
+
+        assert rollback(ctx) == 1
+        assert state.model_dump() == before
+        assert ctx.log == []
+
+    def test_rollback_without_history(self):
+        """Тест: откат без истории ничего не делает"""
+        ctx = Ctx(state=_state())
+
+        assert rollback(ctx) == 0
+
+    @pytest.mark.parametrize("seed", range(5))
+    def test_rollback_random_sequence(self, seed):
+        """Тест: откат серии случайных ходов возвращает исходное состояние и хэш"""
+        rng = random.Random(seed)
+        state = _state()
+        h = state.state_hash()
+        before = state.model_dump()
+        ctx = Ctx(state=state)
+        applied = 0
+        for _ in range(20):
+            result = apply_action(ctx, rng.choice(legal_actions(state)), record_undo=True)
+            applied += 1
+            if "winner" in result:
+                break
+
+        assert rollback(ctx, steps=applied) == applied
+        assert state.model_dump() == before
+        assert state.state_hash() == h == zh.full_hash(state)
+
+    def test_search_style_apply_undo(self):
+        """Тест: перебор ходов «сделать/отменить» не портит состояние"""
+        state = _state()
+        before = state.model_dump()
+        ctx = Ctx(state=state)
+        for action in legal_actions(state):
+            apply_action(ctx, action, record_undo=True)
+            rollback(ctx)
+            assert state.model_dump() == before
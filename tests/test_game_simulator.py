@@ -0,0 +1,111 @@
+"""
+Unit-тесты для legacy-модели боя simulator/game_simulator.py
+"""
+
+import pytest
+from packages.simulator.game_simulator import GameCard, GameSimulator, Player, compile_abilities
+
+
+@pytest.fixture(scope="module")
+def simulator():
+    return GameSimulator("config/cards.csv", seed=0, rules="legacy")
+
+
+def _card(simulator, card_id):
+    """Свежая копия карты каталога (шаблоны симулятора не трогаем)"""
+    card = next(c for cards in simulator.cards_data.values() for c in cards if c.id == card_id)
+    return GameCard.from_engine_card(card.engine_card)
+
+
+def _players():
+    p1 = Player(name="P1", caste="gangsters", deck=[], money=10)
+    p2 = Player(name="P2", caste="authorities", deck=[], money=10)
+    return p1, p2
+
+
+class TestAbilityDispatch:
+    """Тесты заранее разобранных способностей"""
+
+    def test_compiled_once(self, simulator):
+        """Тест: способности разбираются при загрузке, а не при каждом розыгрыше"""
+        card = _card(simulator, "unique_gangster")
+
+        assert card._compiled is not None
+        assert [(h.__name__, n) for h, n in card.compiled_abilities] == [("_ability_authority", 2)]
+
+    def test_no_string_parsing_in_apply(self, simulator, monkeypatch):
+        """Тест: apply_card_abilities не обращается к строкам способностей"""
+        p1, p2 = _players()
+        card = _card(simulator, "gangster_racketeer")
+        monkeypatch.setattr(GameCard, "abilities", property(lambda self: pytest.fail("abilities parsed")))
+
+        simulator.apply_card_abilities(card, p1, p2, None)
+
+        assert card.shields == 1
+
+    def test_matches_string_rules(self):
+        """Тест: обработчики повторяют прежний разбор строк"""
+        compiled = compile_abilities(["steal:2", "economy:1", "audit:3", "extort:2", "lethal:1", "unknown"])
+
+        assert [(h.__name__, n) for h, n in compiled] == [
+            ("_ability_steal", 2), ("_ability_gain", 1), ("_ability_audit", 3),
+            ("_ability_shield", 0), ("_ability_lethal", 0),
+        ]
+
+
+class TestAuthorityCache:
+    """Тесты кэша авторитета игрока"""
+
+    def test_updated_on_play_and_death(self, simulator):
+        """Тест: авторитет растёт при розыгрыше и падает при гибели карты"""
+        p1, _ = _players()
+        boss = _card(simulator, "unique_gangster")
+        kingpin = _card(simulator, "gangster_authority")
+        p1.hand = [boss, kingpin]
+
+        p1.play_card(boss, 1)
+        p1.play_card(kingpin, 1)
+        assert p1.get_total_authority() == 3
+
+        p1.remove_from_field(boss)
+        assert p1.get_total_authority() == 1
+        assert p1.graveyard == [boss]
+
+
+class TestDeckPool:
+    """Тесты пула экземпляров колод"""
+
+    def test_no_deepcopy(self, simulator, monkeypatch):
+        """Тест: колоды создаются без deepcopy"""
+        monkeypatch.setattr("copy.deepcopy", lambda *a, **kw: pytest.fail("deepcopy called"))
+
+        simulator.simulate_game("gangsters", "solo", seed=1)
+
+    def test_mirror_decks_do_not_share_cards(self, simulator):
+        """Тест: две колоды одной касты в одной игре — разные экземпляры"""
+        deck1 = simulator.create_deck("loners")
+        deck2 = simulator.create_deck("loners")
+
+        assert not {id(c) for c in deck1} & {id(c) for c in deck2}
+
+    def test_reset_between_games(self, simulator):
+        """Тест: изменяемые поля карты сбрасываются при новой раздаче"""
+        deck = simulator.create_deck("gangsters")
+        card = deck[0]
+        card.hp, card.shields, card.kills, card.in_play = -3, 2, 1, True
+        card.used_abilities.append("steal")
+
+        simulator.create_deck("gangsters")
+        again = simulator.create_deck("gangsters")
+
+        assert card in again
+        assert (card.hp, card.shields, card.kills, card.in_play, card.used_abilities) == (card.max_hp, 0, 0, False, [])
+
+    def test_templates_untouched(self, simulator):
+        """Тест: игры не меняют карты каталога"""
+        before = [(c.hp, c.shields, c.kills) for c in simulator.cards_data["authorities"]]
+
+        for seed in range(5):
+            simulator.simulate_game("authorities", "loners", seed=seed)
+
+        assert [(c.hp, c.shields, c.kills) for c in simulator.cards_data["authorities"]] == before
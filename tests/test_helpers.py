@@ -151,6 +151,18 @@ class TestDataBuilder:
             flags={}
         )
     
+    @staticmethod
+    def create_duel_state(config_overrides: Dict = None, deck_abl: Dict = None) -> GameState:
+        """Создать дуэль двух Боссов (hp=8) с картой поддержки и колодой из 6 карт"""
+        builder = TestDataBuilder
+        state = builder.create_game_state(
+            p1_cards=[builder.create_boss_card("b1", hp=8), builder.create_basic_card("x1", atk=2, d=2)],
+            p2_cards=[builder.create_boss_card("b2", hp=8), builder.create_basic_card("x2", atk=3, d=1)],
+            config_overrides=config_overrides,
+        )
+        state.deck = [builder.create_basic_card(f"d{i}", atk=i % 3, abl=deck_abl) for i in range(6)]
+        return state
+
     @staticmethod
     def create_context(
         game_state: GameState = None,
@@ -279,6 +291,12 @@ def populated_game_state():
     )
 
 
+@pytest.fixture
+def duel_state():
+    """Фикстура-фабрика дуэли Боссов: duel_state(config_overrides=None, deck_abl=None)"""
+    return TestDataBuilder.create_duel_state
+
+
 class TestAssertions:
     """Кастомные проверки для тестов"""
     
@@ -0,0 +1,142 @@
+"""
+Unit-тесты для генератора допустимых ходов engine/legal.py
+"""
+
+import random
+import pytest
+from packages.engine.legal import legal_actions, is_legal, clear_cache, cache_info
+from packages.engine.engine import Ctx, apply_action
+from packages.engine.actions import Attack, Defend, Influence, DiscardCard, Draw
+from packages.engine.models import Card
+from tests.test_helpers import TestDataBuilder, CardTemplates, populated_game_state  # noqa: F401
+
+
+def _kinds(actions):
+    return {a.kind for a in actions}
+
+
+class TestLegalActions:
+    """Тесты перечисления допустимых ходов"""
+
+    def setup_method(self):
+        clear_cache()
+
+    def test_empty_board_only_pass(self):
+        """Тест: пустой стол и пустая колода — только пас"""
+        state = TestDataBuilder.create_game_state()
+
+        actions = legal_actions(state)
+
+        assert actions == (Influence(),)
+
+    def test_attack_enumeration(self, populated_game_state):
+        """Тест перечисления атак: атакующие × цели × боеприпасы"""
+        actions = legal_actions(populated_game_state)
+        attacks = [a for a in actions if isinstance(a, Attack)]
+
+        # 3 атакующих (ATK>0) × 2 цели × 3 варианта боеприпасов (0..2)
+        assert len(attacks) == 3 * 2 * 3
+        assert all(a.target_player == "P2" for a in attacks)
+        assert {a.target_slot for a in attacks} == {0, 1}
+        assert {a.attacker_slot for a in attacks} == {0, 1, 3}
+
+    def test_ammo_limited_by_money(self, populated_game_state):
+        """Тест: боеприпасы ограничены резервом"""
+        populated_game_state.players["P1"].tokens.reserve_money = 1
+
+        attacks = [a for a in legal_actions(populated_game_state) if isinstance(a, Attack)]
+
+        assert {a.ammo_spend for a in attacks} == {0, 1}
+
+    def test_hand_target_when_board_empty(self):
+        """Тест: атака по руке, когда у противника пустой стол"""
+        state = TestDataBuilder.create_game_state(p1_cards=[Card(**CardTemplates.BASIC_GANGSTER)])
+        state.players["P2"].hand = [TestDataBuilder.create_basic_card("in_hand")]
+
+        attacks = [a for a in legal_actions(state) if isinstance(a, Attack)]
+
+        assert attacks
+        assert all(a.target_slot is None for a in attacks)
+
+    def test_defend_respects_quota(self):
+        """Тест: найм ограничен квотой защиты"""
+        card = TestDataBuilder.create_basic_card(d=2)
+        state = TestDataBuilder.create_game_state(p1_cards=[card])
+        state.players["P1"].slots[0].muscles = 1
+
+        defends = [a for a in legal_actions(state) if isinstance(a, Defend)]
+
+        assert [(a.target_slot, a.hire_count) for a in defends] == [(0, 1)]
+
+    def test_micro_bribe_once_per_turn(self, populated_game_state):
+        """Тест: микро-подкуп недоступен после использования"""
+        populated_game_state.players["P2"].slots[0].muscles = 2
+        bribe = Influence(micro_bribe_target_player="P2", micro_bribe_target_slot=0)
+
+        assert is_legal(populated_game_state, bribe)
+
+        populated_game_state.flags["micro_bribe_used"] = True
+        assert not is_legal(populated_game_state, bribe)
+
+    def test_draw_placements(self):
+        """Тест вариантов размещения при доборе"""
+        state = TestDataBuilder.create_game_state(p1_cards=[TestDataBuilder.create_basic_card()])
+        state.deck = [TestDataBuilder.create_basic_card("deck_card")]
+
+        draws = [a for a in legal_actions(state) if isinstance(a, Draw)]
+        places = [(a.place, a.slot_index) for a in draws]
+
+        assert ("hand", None) in places
+        assert ("shelf", None) in places
+        assert sorted(i for p, i in places if p == "slot") == [1, 2, 3, 4, 5]
+
+    def test_draw_blocked_by_hand_limit(self):
+        """Тест: добор запрещён при достижении лимита руки"""
+        state = TestDataBuilder.create_game_state()
+        state.deck = [TestDataBuilder.create_basic_card("deck_card")]
+        state.players["P1"].hand_limit = 1
+        state.players["P1"].hand = [TestDataBuilder.create_basic_card("h")]
+
+        assert "draw" not in _kinds(legal_actions(state))
+
+    def test_discard_every_occupied_slot(self, populated_game_state):
+        """Тест: сброс доступен для каждой занятой ячейки"""
+        discards = [a for a in legal_actions(populated_game_state) if isinstance(a, DiscardCard)]
+
+        assert [a.own_slot for a in discards] == [0, 1, 3]
+
+    def test_illegal_actions_rejected(self, populated_game_state):
+        """Тест: недопустимые ходы отклоняются"""
+        assert not is_legal(populated_game_state, Attack(target_player="P2", target_slot=5, attacker_slot=0))
+        assert not is_legal(populated_game_state, Defend(target_slot=2, hire_count=1))
+        assert not is_legal(populated_game_state, DiscardCard(own_slot=2))
+
+    def test_components_cached_between_calls(self, populated_game_state):
+        """Тест: повторное перечисление берётся из кэша"""
+        first = legal_actions(populated_game_state)
+        misses = sum(v["misses"] for v in cache_info().values())
+
+        second = legal_actions(populated_game_state)
+
+        assert first == second
+        assert sum(v["misses"] for v in cache_info().values()) == misses
+
+    def test_every_legal_action_applies_cleanly(self, populated_game_state):
+        """Тест: любой перечисленный ход применяется без ошибки"""
+        populated_game_state.deck = [TestDataBuilder.create_basic_card(f"d{i}") for i in range(3)]
+        for action in legal_actions(populated_game_state):
+            state = populated_game_state.model_copy(deep=True)
+            result = apply_action(Ctx(state=state), action)
+            assert "error" not in result, (action, result)
+
+    def test_random_playout_stays_legal(self, populated_game_state):
+        """Тест: случайная партия по допустимым ходам не даёт ошибок"""
+        rng = random.Random(7)
+        state = populated_game_state
+        state.deck = [TestDataBuilder.create_basic_card(f"d{i}") for i in range(10)]
+        ctx = Ctx(state=state)
+        for _ in range(60):
+            result = apply_action(ctx, rng.choice(legal_actions(state)))
+            assert "error" not in result
+            if "winner" in result:
+                break
@@ -0,0 +1,80 @@
+"""
+Unit-тесты для компактных реплеев и их проверки simulator/replay.py
+"""
+
+import pytest
+from packages.engine.actions import Attack, Defend, DiscardCard, Draw, Influence, UseAbility
+from packages.simulator.balance import load_base, play_one
+from packages.simulator.replay import (
+    Replay, decode_actions, encode_action, read_replays, verify, verify_all, write_replays,
+)
+
+CONFIG = "config/default.yaml"
+
+
+@pytest.fixture(scope="module")
+def base():
+    return load_base(CONFIG)
+
+
+class TestEncoding:
+    """Тесты кодирования действий и реплеев"""
+
+    def test_actions_round_trip(self):
+        """Тест: все виды действий декодируются в исходные"""
+        actions = [
+            Attack(target_player="P2", target_slot=3, ammo_spend=2, attacker_slot=0),
+            Attack(target_player="P1", base_damage=-1),
+            Defend(target_slot=1, hire_count=300),
+            Influence(),
+            Influence(micro_bribe_target_player="P2", micro_bribe_target_slot=0),
+            DiscardCard(own_slot=5),
+            Draw(place="shelf"),
+            Draw(place="slot", slot_index=2),
+            UseAbility(own_slot=4, ability_id="налёт"),
+        ]
+        out = bytearray()
+        for a in actions:
+            encode_action(a, out)
+
+        assert [a.model_dump() for a in decode_actions(bytes(out))] == [a.model_dump() for a in actions]
+
+    def test_file_round_trip(self, tmp_path):
+        """Тест: реплеи сохраняются и читаются без потерь"""
+        reps = [Replay(seed=s, config_hash="0123456789abcdef", actions=b"\x03\x00\x00", count=1,
+                       winner=w, final_hash=2 ** 64 - 1) for s, w in [(1, None), (2, "P2")]]
+        path = tmp_path / "games.kpr"
+        write_replays(str(path), reps)
+
+        assert read_replays(str(path)) == reps
+
+
+class TestRecording:
+    """Тесты записи реплеев в balance и их проверки"""
+
+    def test_recording_does_not_change_result(self, base):
+        """Тест: запись реплея не меняет исход партии"""
+        for seed in (1, 2, 3):
+            recorded = play_one(seed, 15, base, record=True)
+            replay = recorded.pop("replay")
+
+            assert recorded == play_one(seed, 15, base)
+            assert replay.count > 0 and replay.winner == recorded["winner"]
+
+    def test_replays_verify(self, base):
+        """Тест: записанные партии эвристики и ботов воспроизводятся"""
+        reps = [play_one(s, 15, base, record=True)["replay"] for s in range(1, 6)]
+        reps.append(play_one(1, 20, base, policy="greedy", record=True)["replay"])
+
+        assert all(verify(r, base) is None for r in reps)
+        assert verify_all(reps, CONFIG, chunk=2).ok == len(reps)
+
+    def test_divergence_reported(self, base):
+        """Тест: изменённый исход или другие правила обнаруживаются"""
+        replay = play_one(4, 15, base, record=True)["replay"]
+        replay.final_hash ^= 1
+        other = Replay(seed=4, config_hash="0" * 16)
+
+        report = verify_all([other, replay], CONFIG)
+
+        assert report.failures == [(0, 4, "config_mismatch"), (1, 4, "final_state")]
@@ -0,0 +1,161 @@
+"""
+Unit-тесты для кэша результатов симуляций simulator/result_cache.py
+"""
+
+from packages.simulator.result_cache import ResultCache, cache_key, catalog_fingerprint, fingerprint
+from packages.simulator.balance import cache_parts, load_base, play_one
+from packages.simulator.sweep import apply_overlay
+from packages.simulator.game_simulator import GameSimulator
+import csv
+
+CONFIG = "config/default.yaml"
+
+
+class TestFingerprints:
+    """Тесты хэшей содержимого"""
+
+    def test_dict_order_does_not_matter(self):
+        """Тест: порядок ключей не влияет на хэш"""
+        assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+        assert fingerprint({"a": 1}) != fingerprint({"a": 2})
+
+    def test_catalog_order_insensitive(self):
+        """Тест: хэш каталога не зависит от порядка карт"""
+        base = load_base(CONFIG)
+
+        assert catalog_fingerprint(base.cards) == catalog_fingerprint(list(reversed(base.cards)))
+
+    def test_card_change_changes_key(self):
+        """Тест: изменение карты или правил меняет ключ"""
+        base = load_base(CONFIG)
+        key = cache_key(**cache_parts(base, 15))
+
+        card_id = base.cards[0].id
+        assert cache_key(**cache_parts(apply_overlay(base, {f"cards.{card_id}.hp": 99}), 15)) != key
+        assert cache_key(**cache_parts(apply_overlay(base, {"rules.cascade_reward": 9}), 15)) != key
+        assert cache_key(**cache_parts(base, 16)) != key
+        assert cache_key(**cache_parts(base, 15, "random")) != key
+        assert cache_key(**cache_parts(load_base(CONFIG), 15)) == key
+
+
+class TestResultCache:
+    """Тесты хранилища результатов по зёрнам"""
+
+    def test_only_missing_seeds_computed(self, tmp_path):
+        """Тест: считаются только отсутствующие зёрна"""
+        calls = []
+
+        def compute(seed):
+            calls.append(seed)
+            return {"seed": seed, "winner": "P1"}
+
+        cache = ResultCache(tmp_path)
+        cache.run("k", range(5), compute)
+        calls.clear()
+
+        results = ResultCache(tmp_path).run("k", range(8), compute)
+
+        assert calls == [5, 6, 7]
+        assert [r["seed"] for r in results] == list(range(8))
+
+    def test_keys_are_isolated(self, tmp_path):
+        """Тест: разные ключи не смешиваются"""
+        cache = ResultCache(tmp_path)
+        cache.put_many("a", {1: "x"})
+
+        assert cache.get_many("b", [1]) == {}
+
+    def test_torn_line_ignored(self, tmp_path):
+        """Тест: оборванная последняя строка прерванного запуска пропускается"""
+        cache = ResultCache(tmp_path)
+        cache.put_many("k", {1: "ok"})
+        with open(cache._dir("k") / "results.jsonl", "a") as f:
+            f.write('{"seed": 2, "res')
+
+        assert ResultCache(tmp_path).get_many("k", [1, 2]) == {1: "ok"}
+
+    def test_balance_results_match_fresh_run(self, tmp_path):
+        """Тест: результаты из кэша совпадают с прямым запуском"""
+        base = load_base(CONFIG)
+        key = cache_key(**cache_parts(base, 15))
+        cache = ResultCache(tmp_path)
+        cache.run(key, range(1, 6), lambda s: play_one(s, 15, base))
+
+        cached = ResultCache(tmp_path).run(key, range(1, 6), lambda s: None)
+
+        assert cached == [play_one(s, 15, base) for s in range(1, 6)]
+
+
+class TestSimulatorCache:
+    """Тесты кэша в GameSimulator"""
+
+    def test_seeded_games_reproducible(self):
+        """Тест: с зерном матчап воспроизводим"""
+        a = GameSimulator("config/cards.csv", seed=3).run_matchup_simulation("gangsters", "solo", games=10)
+        b = GameSimulator("config/cards.csv", seed=3).run_matchup_simulation("gangsters", "solo", games=10)
+
+        assert a["detailed_results"] == b["detailed_results"]
+
+    def test_cached_games_not_replayed(self, tmp_path, monkeypatch):
+        """Тест: при повторном запуске играются только новые игры"""
+        first = GameSimulator("config/cards.csv", cache=ResultCache(tmp_path))
+        first.run_matchup_simulation("gangsters", "solo", games=10)
+
+        second = GameSimulator("config/cards.csv", cache=ResultCache(tmp_path))
+        played = []
+        original = second._play_decks
+        monkeypatch.setattr(second, "_play_decks", lambda *a, **kw: played.append(1) or original(*a, **kw))
+        result = second.run_matchup_simulation("gangsters", "solo", games=15)
+
+        assert len(played) == 5
+        assert result["games_played"] == 15
+        assert second.cache.hits == 10
+
+
+class TestIncrementalResimulation:
+    """Тесты точечного пересчёта при изменении отдельных карт"""
+
+    @staticmethod
+    def _write_cards(path, hp_override=None):
+        with open("config/cards.csv", newline="", encoding="utf-8") as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            if hp_override and row["ID"] in hp_override:
+                row["HP"] = str(hp_override[row["ID"]])
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            w = csv.DictWriter(f, fieldnames=list(rows[0]))
+            w.writeheader()
+            w.writerows(rows)
+        return str(path)
+
+    def test_only_games_with_changed_card_replayed(self, tmp_path):
+        """Тест: переигрываются только игры с изменённой картой"""
+        cache_dir = tmp_path / "cache"
+        cards = self._write_cards(tmp_path / "cards.csv")
+        GameSimulator(cards, cache=ResultCache(cache_dir)).run_full_tournament(games_per_matchup=5)
+
+        cards = self._write_cards(tmp_path / "cards.csv", {"gangster_fighter": 9})
+        cache = ResultCache(cache_dir)
+        data = GameSimulator(cards, cache=cache).run_full_tournament(games_per_matchup=5)
+
+        # Колоды гангстеров (7 карт ≤ 8) всегда содержат карту: 3 матчапа × 5 игр
+        assert cache.stale == 15
+        assert cache.misses == 15
+        assert cache.hits == 15
+        assert data["total_games"] == 30
+
+    def test_deck_sampling_limits_replays(self, tmp_path, monkeypatch):
+        """Тест: при выборке колоды переигрываются лишь игры, где карта попала в колоду"""
+        create_deck = GameSimulator.create_deck
+        monkeypatch.setattr(GameSimulator, "create_deck", lambda self, caste, deck_size=3: create_deck(self, caste, deck_size))
+        cache_dir = tmp_path / "cache"
+        cards = self._write_cards(tmp_path / "cards.csv")
+        GameSimulator(cards, cache=ResultCache(cache_dir)).run_matchup_simulation("gangsters", "solo", games=30)
+
+        cards = self._write_cards(tmp_path / "cards.csv", {"gangster_fighter": 9})
+        sim = GameSimulator(cards, cache=ResultCache(cache_dir))
+        fresh = GameSimulator(cards, seed=0).run_matchup_simulation("gangsters", "solo", games=30)
+        result = sim.run_matchup_simulation("gangsters", "solo", games=30)
+
+        assert 0 < sim.cache.stale < 30
+        assert result["detailed_results"] == fresh["detailed_results"]
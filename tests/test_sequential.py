@@ -0,0 +1,146 @@
+"""
+Unit-тесты для последовательных правил остановки simulator/sequential.py
+"""
+
+import random
+import pytest
+from packages.simulator.sequential import (
+    SPRT, AdaptiveStopper, bayes_interval, beta_cdf, wilson_interval,
+)
+from packages.simulator.game_simulator import GameSimulator
+
+
+class TestIntervals:
+    """Тесты доверительных интервалов"""
+
+    def test_wilson_known_value(self):
+        """Тест: интервал Уилсона для 50/100"""
+        lo, hi = wilson_interval(50, 100)
+
+        assert lo == pytest.approx(0.4038, abs=1e-3)
+        assert hi == pytest.approx(0.5962, abs=1e-3)
+
+    def test_wilson_no_games(self):
+        """Тест: без игр интервал — весь отрезок"""
+        assert wilson_interval(0, 0) == (0.0, 1.0)
+
+    def test_beta_cdf_uniform_and_symmetric(self):
+        """Тест: Beta(1,1) равномерна, Beta(a,a) симметрична"""
+        assert beta_cdf(0.3, 1, 1) == pytest.approx(0.3)
+        assert beta_cdf(0.5, 7.5, 7.5) == pytest.approx(0.5)
+
+    def test_bayes_interval_close_to_wilson(self):
+        """Тест: на больших выборках байесовский интервал близок к Уилсону"""
+        b_lo, b_hi = bayes_interval(300, 1000)
+        w_lo, w_hi = wilson_interval(300, 1000)
+
+        assert b_lo == pytest.approx(w_lo, abs=5e-3)
+        assert b_hi == pytest.approx(w_hi, abs=5e-3)
+
+    def test_interval_narrows_with_games(self):
+        """Тест: интервал сужается с ростом числа игр"""
+        w10 = wilson_interval(5, 10)
+        w1000 = wilson_interval(500, 1000)
+
+        assert w1000[1] - w1000[0] < w10[1] - w10[0]
+
+
+class TestSPRT:
+    """Тесты последовательного теста отношения правдоподобия"""
+
+    @staticmethod
+    def _run(p, n=2000, seed=1):
+        rng = random.Random(seed)
+        test = SPRT(delta=0.1)
+        for _ in range(n):
+            win = rng.random() < p
+            test.update(int(win), int(not win))
+            if test.decision():
+                break
+        return test.decision()
+
+    def test_detects_imbalance(self):
+        """Тест: явный перекос признаётся дисбалансом"""
+        assert self._run(0.7) == "unbalanced"
+        assert self._run(0.3) == "unbalanced"
+
+    def test_accepts_balance(self):
+        """Тест: равные шансы признаются балансом"""
+        assert self._run(0.5) == "balanced"
+
+    def test_draws_count_as_half(self):
+        """Тест: ничьи не сдвигают тест ни в одну сторону"""
+        test = SPRT(delta=0.1)
+        test.update(0, 0, draws=10)
+
+        assert test.llr_hi == pytest.approx(test.llr_lo)
+
+
+class TestAdaptiveStopper:
+    """Тесты правила остановки"""
+
+    def test_respects_min_games(self):
+        """Тест: до min_games остановки нет"""
+        stopper = AdaptiveStopper(target_width=0.9, min_games=20)
+        stopper.update(10, 0)
+
+        assert stopper.stop_reason() is None
+
+    def test_stops_on_interval(self):
+        """Тест: остановка, когда интервал уже цели"""
+        stopper = AdaptiveStopper(target_width=0.2, sprt_delta=None, min_games=10)
+        stopper.update(50, 50)
+
+        assert stopper.stop_reason() == "interval"
+
+    def test_stops_on_max_games(self):
+        """Тест: верхний предел числа игр"""
+        stopper = AdaptiveStopper(target_width=0.01, sprt_delta=None, max_games=30)
+        stopper.update(15, 15)
+
+        assert stopper.stop_reason() == "max_games"
+
+    def test_fresh_resets_counters(self):
+        """Тест: fresh() сохраняет настройки и обнуляет счётчики"""
+        stopper = AdaptiveStopper(target_width=0.05, method="bayes")
+        stopper.update(3, 1)
+
+        fresh = stopper.fresh()
+
+        assert fresh.games == 0
+        assert (fresh.target_width, fresh.method) == (0.05, "bayes")
+
+    def test_unknown_method_rejected(self):
+        """Тест: неизвестный метод интервала отклоняется"""
+        with pytest.raises(ValueError):
+            AdaptiveStopper(method="bootstrap")
+
+
+class TestAdaptiveSimulator:
+    """Тесты адаптивного режима GameSimulator"""
+
+    @pytest.fixture
+    def simulator(self):
+        random.seed(0)
+        return GameSimulator("config/cards.csv")
+
+    def test_matchup_stops_in_batches(self, simulator):
+        """Тест: матчап играется партиями и не превышает предел"""
+        result = simulator.run_matchup_simulation(
+            "gangsters", "solo", games=200, adaptive=AdaptiveStopper(target_width=0.3, min_games=10), batch_size=10,
+        )
+
+        assert result["games_played"] % 10 == 0
+        assert 10 <= result["games_played"] <= 200
+        assert result["stop_reason"] in {"interval", "sprt_balanced", "sprt_unbalanced", "max_games"}
+        assert len(result["detailed_results"]) == result["games_played"]
+
+    def test_tournament_stays_within_budget(self, simulator):
+        """Тест: адаптивный турнир укладывается в общий бюджет"""
+        data = simulator.run_full_tournament(
+            games_per_matchup=20, adaptive=AdaptiveStopper(target_width=0.3, min_games=10), batch_size=10,
+        )
+
+        assert data["total_games"] <= 20 * len(data["tournament_results"])
+        for stats in data["caste_statistics"].values():
+            assert stats["games"] == stats["wins"] + stats["losses"] + stats["draws"]
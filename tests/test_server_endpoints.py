@@ -631,3 +631,137 @@ class TestServerValidation:
         # Состояние не должно измениться
         player = test_state.players["P1"]
         assert player.tokens.reserve_money == 12  # default без изменений
+
+
+class TestBotSeats:
+    """Тесты серверных мест для ботов"""
+
+    @pytest.fixture
+    def clean_globals(self):
+        """Очистка глобальных переменных перед тестом"""
+        rooms.clear()
+        sid_index.clear()
+        yield
+        rooms.clear()
+        sid_index.clear()
+
+    async def _join_with_bot(self, mock_sio, state):
+        from packages.server.main import join_room
+
+        with patch('packages.server.main.sio', mock_sio):
+            with patch('packages.server.main._build_state_from_csv', return_value=(state, {})):
+                await join_room("human_sid", {"room": "bot_room", "bot": "random"})
+        return rooms["bot_room"]
+
+    @pytest.mark.asyncio
+    async def test_join_with_bot_takes_opposite_seat(self, clean_globals):
+        """Тест: бот занимает место напротив игрока"""
+        mock_sio = MockSocketIO()
+
+        r = await self._join_with_bot(mock_sio, TestDataBuilder.create_game_state())
+
+        assert r["seats"] == {"P1": "human_sid", "P2": None}
+        assert r["bots"] == {"P2": "random"}
+
+    @pytest.mark.asyncio
+    async def test_room_with_bot_is_full_for_second_player(self, clean_globals):
+        """Тест: второй игрок не может занять место бота"""
+        from packages.server.main import join_room
+        mock_sio = MockSocketIO()
+        await self._join_with_bot(mock_sio, TestDataBuilder.create_game_state())
+
+        with patch('packages.server.main.sio', mock_sio):
+            await join_room("other_sid", {"room": "bot_room"})
+
+        assert mock_sio.events[-1]["event"] == "room_full"
+
+    @pytest.mark.asyncio
+    async def test_bot_moves_after_end_turn(self, clean_globals):
+        """Тест: после завершения хода игроком бот делает ход движком"""
+        from packages.server.main import end_turn
+        mock_sio = MockSocketIO()
+        state = TestDataBuilder.create_game_state()
+        r = await self._join_with_bot(mock_sio, state)
+
+        decide = AsyncMock(return_value={"kind": "influence"})
+        with patch('packages.server.main.sio', mock_sio), patch('packages.server.main._bot_decide', decide):
+            await end_turn("human_sid", {})
+            await r["bot_task"]
+
+        decide.assert_awaited_once_with("bot_room", "P2")
+        assert state.active_player == "P1"
+        assert any(e["kind"] == "bot" for e in r["log"])
+
+    @pytest.mark.asyncio
+    async def test_bot_passes_on_timeout(self, clean_globals):
+        """Тест: при превышении времени размышления бот пасует"""
+        from packages.server.main import end_turn
+        mock_sio = MockSocketIO()
+        state = TestDataBuilder.create_game_state()
+        r = await self._join_with_bot(mock_sio, state)
+        turn = state.turn_number
+
+        with patch('packages.server.main.sio', mock_sio), \
+                patch('packages.server.main._bot_decide', AsyncMock(return_value=None)):
+            await end_turn("human_sid", {})
+            await r["bot_task"]
+
+        assert state.active_player == "P1"
+        assert state.turn_number == turn + 2
+        assert "passed" in [e for e in r["log"] if e["kind"] == "bot"][-1]["msg"]
+
+    @pytest.mark.asyncio
+    async def test_bot_keeps_turn_after_ability(self, clean_globals):
+        """Тест: после платной способности бот делает ещё одно действие в том же ходу"""
+        from packages.engine.models import PaidAbility
+        from packages.server.main import end_turn
+        mock_sio = MockSocketIO()
+        medic = TestDataBuilder.create_basic_card("medic", hp=2)
+        medic.paid = [PaidAbility(id="patch", cost=2, effect_id="heal_self_1")]
+        state = TestDataBuilder.create_game_state(p2_cards=[medic])
+        r = await self._join_with_bot(mock_sio, state)
+        turn = state.turn_number
+
+        decide = AsyncMock(side_effect=[{"kind": "use_ability", "own_slot": 0, "ability_id": "patch"},
+                                        {"kind": "influence"}])
+        with patch('packages.server.main.sio', mock_sio), patch('packages.server.main._bot_decide', decide):
+            await end_turn("human_sid", {})
+            await r["bot_task"]
+            await r["bot_task"]
+
+        assert decide.await_count == 2
+        assert state.players["P2"].slots[0].card.hp == 3
+        assert state.active_player == "P1" and state.turn_number == turn + 2
+
+    @pytest.mark.asyncio
+    async def test_bot_accepts_proposed_attack(self, clean_globals):
+        """Тест: бот автоматически принимает предложенный план атаки"""
+        from packages.server.main import start_attack, attack_propose
+        mock_sio = MockSocketIO()
+        state = TestDataBuilder.create_game_state(
+            p1_cards=[TestDataBuilder.create_basic_card("attacker", atk=2)],
+            p2_cards=[TestDataBuilder.create_basic_card("target")],
+        )
+        state.players["P2"].slots[0].muscles = 2
+        r = await self._join_with_bot(mock_sio, state)
+
+        with patch('packages.server.main.sio', mock_sio):
+            await start_attack("human_sid", {"attackerSlots": [0], "targetSlot": 0})
+            r["attack"]["plan"] = {"removeShields": 1, "destroyCard": False}
+            await attack_propose("human_sid", {})
+
+        assert r["attack"] is None
+        assert state.players["P2"].slots[0].muscles == 1
+
+    def test_choose_action_payload_returns_legal_action(self):
+        """Тест: воркер бота возвращает допустимый ход в виде словаря"""
+        from packages.simulator.bots import choose_action_payload
+        from packages.engine.legal import legal_actions
+        state = TestDataBuilder.create_game_state(
+            p1_cards=[TestDataBuilder.create_basic_card("a", atk=2)],
+            p2_cards=[TestDataBuilder.create_basic_card("b")],
+        )
+
+        payload = choose_action_payload("random", state.model_dump(mode="json"), 0.05, seed=1)
+
+        assert payload in [a.model_dump() for a in legal_actions(state)]
@@ -0,0 +1,72 @@
+"""
+Unit-тесты для редьюсеров, специализированных под GameConfig (engine/specialize.py)
+"""
+
+import random
+import pytest
+from packages.engine.engine import Ctx, apply_action
+from packages.engine.legal import legal_actions
+from packages.engine.models import GameConfig
+from packages.engine.specialize import specialize
+from tests.test_helpers import duel_state  # noqa: F401
+
+CONFIGS = [
+    {},
+    {"hand_enabled": False},
+    {"cascade_enabled": False, "ammo_max_bonus": 0},
+    {"micro_bribe_once_per_turn": False, "cascade_max_triggers": 0},
+]
+
+
+GAIN_ON_ENTER = {"on_enter": {"gain": 1}}
+
+
+class TestSpecializedReducer:
+    """Тесты совпадения специализированного и общего редьюсера"""
+
+    @pytest.mark.parametrize("overrides", CONFIGS)
+    def test_identical_to_generic(self, overrides, duel_state):
+        """Тест: случайные партии дают одинаковые результаты, состояния и журнал"""
+        rng = random.Random(7)
+        for _ in range(10):
+            generic = Ctx(state=duel_state(overrides, deck_abl=GAIN_ON_ENTER))
+            special = Ctx(state=generic.state.fork())
+            apply = specialize(generic.state.config)
+            for _ in range(30):
+                action = rng.choice(legal_actions(generic.state))
+                expected = apply_action(generic, action)
+                assert apply(special, action) == expected
+                assert special.state.model_dump() == generic.state.model_dump()
+                if "winner" in expected:
+                    break
+            assert special.log == generic.log
+
+    def test_config_reads_inlined(self):
+        """Тест: специализированный код не читает правила из конфига"""
+        apply = specialize(GameConfig(hand_enabled=True))
+        names = apply.namespace["apply_action"].__code__.co_names
+
+        assert "hand_enabled" not in names and "micro_bribe_once_per_turn" not in names
+
+    def test_cached_per_config(self):
+        """Тест: один скомпилированный вариант на набор правил"""
+        assert specialize(GameConfig(ammo_max_bonus=1)) is specialize(GameConfig(ammo_max_bonus=1))
+        assert specialize(GameConfig(ammo_max_bonus=1)) is not specialize(GameConfig(ammo_max_bonus=2))
+
+    def test_rejects_other_config(self, duel_state):
+        """Тест: состояние с другими правилами не принимается"""
+        apply = specialize(GameConfig(hand_enabled=True))
+        ctx = Ctx(state=duel_state({"hand_enabled": False}, deck_abl=GAIN_ON_ENTER))
+
+        with pytest.raises(ValueError):
+            apply(ctx, legal_actions(ctx.state)[-1])
+
+    def test_rejects_config_edited_in_place(self, duel_state):
+        """Тест: правка того же объекта конфига после компиляции не проходит молча"""
+        ctx = Ctx(state=duel_state(deck_abl=GAIN_ON_ENTER))
+        apply = specialize(ctx.state.config)
+        ctx.state.config.hand_enabled = False
+
+        with pytest.raises(ValueError):
+            apply(ctx, legal_actions(ctx.state)[-1])
+
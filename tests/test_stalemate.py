@@ -0,0 +1,81 @@
+"""
+Unit-тесты для обнаружения тупиковых партий simulator/stalemate.py
+"""
+
+from packages.engine.actions import Influence
+from packages.simulator.balance import load_base, play_one
+from packages.simulator.bots import play_game
+from packages.simulator.game_simulator import GameSimulator
+from packages.simulator.stalemate import NO_PROGRESS, REPETITION, StalemateDetector, engine_keys
+from tests.test_helpers import TestDataBuilder
+
+
+class _Pass:
+    def choose(self, state):
+        return Influence()
+
+
+def _bosses_only():
+    return TestDataBuilder.create_game_state(
+        p1_cards=[TestDataBuilder.create_boss_card("b1")],
+        p2_cards=[TestDataBuilder.create_boss_card("b2")],
+    )
+
+
+class TestDetector:
+    """Тесты детектора"""
+
+    def test_repetition(self):
+        """Тест: позиция, встреченная repeat_limit раз, — ничья"""
+        d = StalemateDetector(repeat_limit=3, stall_turns=0)
+
+        assert [d.update(p, 0) for p in "ABABA"] == [None, None, None, None, REPETITION]
+
+    def test_no_progress(self):
+        """Тест: материал без изменений stall_turns обновлений подряд — ничья"""
+        d = StalemateDetector(repeat_limit=0, stall_turns=2)
+
+        assert [d.update(i, m) for i, m in enumerate("xyyyz")] == [None, None, None, NO_PROGRESS, None]
+
+    def test_engine_keys_ignore_turn_counter(self):
+        """Тест: номер хода не входит в позицию, деньги не входят в материал"""
+        a, b = _bosses_only(), _bosses_only()
+        b.turn_number += 4
+        b.players["P1"].tokens.reserve_money += 1
+
+        assert engine_keys(a)[1] == engine_keys(b)[1]
+        assert engine_keys(a)[0] != engine_keys(b)[0]
+        b.players["P1"].tokens.reserve_money -= 1
+        assert engine_keys(a) == engine_keys(b)
+
+
+class TestSimulators:
+    """Тесты досрочного завершения в симуляторах"""
+
+    def test_play_game_ends_passing_game(self):
+        """Тест: партия из одних пасов заканчивается ничьей по повтору"""
+        res = play_game(_bosses_only(), {"P1": _Pass(), "P2": _Pass()}, max_turns=50,
+                        stalemate=StalemateDetector())
+
+        assert res == {"winner": None, "win_reason": REPETITION, "turns_played": 5}
+
+    def test_balance_reports_end_reason(self):
+        """Тест: play_one сообщает причину окончания; без тупиков результат тот же"""
+        base = load_base("config/default.yaml")
+        for seed in (1, 2):
+            with_detector = play_one(seed, 60, base, policy="random")
+            without = play_one(seed, 60, base, policy="random", stalemate=False)
+
+            assert with_detector["end_reason"] in {"boss_killed", "economic_collapse", "turn_limit"}
+            assert with_detector == without
+
+    def test_legacy_games_shorter_same_winners(self):
+        """Тест: упрощённая модель заканчивает замершие партии раньше с тем же итогом"""
+        runs = {}
+        for stalemate in (True, False):
+            sim = GameSimulator("config/cards.csv", seed=3, rules="legacy", stalemate=stalemate)
+            runs[stalemate] = sim.run_matchup_simulation("gangsters", "solo", games=20)["detailed_results"]
+
+        assert [g["winner"] for g in runs[True]] == [g["winner"] for g in runs[False]]
+        assert sum(g["turns"] for g in runs[True]) < sum(g["turns"] for g in runs[False])
+        assert any(g["win_reason"] == REPETITION for g in runs[True])
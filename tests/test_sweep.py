@@ -0,0 +1,95 @@
+"""
+Unit-тесты для перебора параметров баланса simulator/sweep.py
+"""
+
+import pytest
+from packages.simulator.balance import load_base, play_one, run_one
+from packages.simulator.sweep import (
+    apply_overlay, grid, parse_space, random_search, run_sweep, validate_param,
+)
+
+CONFIG = "config/default.yaml"
+
+
+class TestVariants:
+    """Тесты построения вариантов"""
+
+    def test_grid_is_cartesian_product(self):
+        """Тест: сетка перебирает все комбинации"""
+        variants = grid({"rules.cascade_reward": [1, 2], "cards.boss_gangster.hp": [8, 9, 10]})
+
+        assert len(variants) == 6
+        assert {"rules.cascade_reward": 2, "cards.boss_gangster.hp": 10} in variants
+
+    def test_random_search_is_reproducible(self):
+        """Тест: случайный поиск воспроизводим по зерну"""
+        space = {"rules.ammo_max_bonus": [0, 1, 2, 3]}
+
+        assert random_search(space, 5, seed=3) == random_search(space, 5, seed=3)
+        assert all(v["rules.ammo_max_bonus"] in space["rules.ammo_max_bonus"] for v in random_search(space, 5))
+
+    def test_parse_space(self):
+        """Тест разбора параметров командной строки"""
+        space = parse_space(["cards.boss_gangster.hp=8:10", "rules.hand_enabled=true,false"])
+
+        assert space == {"cards.boss_gangster.hp": [8, 9, 10], "rules.hand_enabled": [True, False]}
+
+    @pytest.mark.parametrize("name", ["cards.boss_gangster.name", "rules.unknown", "hp", "cards.hp"])
+    def test_invalid_params_rejected(self, name):
+        """Тест: неизвестные параметры отклоняются"""
+        with pytest.raises(ValueError):
+            validate_param(name)
+
+
+class TestOverlay:
+    """Тесты наложения вариантов на базовый каталог"""
+
+    def test_overlay_does_not_mutate_base(self):
+        """Тест: наложение не меняет общий каталог"""
+        base = load_base(CONFIG)
+        hp = base.catalog["boss_gangster"].hp
+        reward = base.cfg["rules"]["cascade_reward"]
+
+        variant = apply_overlay(base, {"cards.boss_gangster.hp": hp + 5, "rules.cascade_reward": reward + 1})
+
+        assert variant.catalog["boss_gangster"].hp == hp + 5
+        assert variant.cfg["rules"]["cascade_reward"] == reward + 1
+        assert base.catalog["boss_gangster"].hp == hp
+        assert base.cfg["rules"]["cascade_reward"] == reward
+
+    def test_preloaded_base_matches_run_one(self):
+        """Тест: игра на заранее загруженном каталоге совпадает с run_one"""
+        base = load_base(CONFIG)
+
+        for seed in (1, 2, 3):
+            assert play_one(seed, 15, base) == run_one(seed, 15, CONFIG)
+
+
+class TestRunSweep:
+    """Тесты запуска перебора"""
+
+    def test_columnar_table(self):
+        """Тест: результат — колоночная таблица, строка на вариант"""
+        variants = grid({"cards.boss_gangster.hp": [4, 12]})
+
+        table = run_sweep(CONFIG, variants, seeds=range(1, 6), turns=10)
+
+        assert table["variant"] == [0, 1]
+        assert table["cards.boss_gangster.hp"] == [4, 12]
+        assert table["games"] == [5, 5]
+        assert all(0.0 <= w <= 1.0 for w in table["p1_winrate"])
+
+    def test_unknown_card_rejected(self):
+        """Тест: неизвестная карта отклоняется до запуска"""
+        with pytest.raises(ValueError):
+            run_sweep(CONFIG, [{"cards.no_such_card.hp": 1}], seeds=[1])
+
+    @pytest.mark.slow
+    def test_process_pool_matches_serial(self):
+        """Тест: пул процессов даёт те же результаты, что и последовательный запуск"""
+        variants = grid({"rules.cascade_reward": [1, 3]})
+
+        serial = run_sweep(CONFIG, variants, seeds=range(1, 4), turns=10)
+        parallel = run_sweep(CONFIG, variants, seeds=range(1, 4), turns=10, workers=2)
+
+        assert serial == parallel
@@ -0,0 +1,102 @@
+"""
+Unit-тесты для векторизованного окружения simulator/vec_env.py
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from packages.engine.legal import legal_actions
+from packages.simulator.vec_env import KingpinVecEnv, ShardedKingpinVecEnv
+
+
+@pytest.fixture
+def env():
+    return KingpinVecEnv(4, seed=1, max_steps=30)
+
+
+def _random_actions(env, rng):
+    masks = env.action_masks()
+    return (rng.random(masks.shape) * masks).argmax(axis=1)
+
+
+class TestVecEnv:
+    """Тесты KingpinVecEnv"""
+
+    def test_shapes(self, env):
+        """Тест: наблюдения и маски фиксированного размера"""
+        obs = env.reset()
+
+        assert obs.shape == (4, env.obs_size) and obs.dtype == np.float32
+        assert env.action_masks().shape == (4, env.n_actions)
+        assert env.action_masks()[:, 0].all()  # пас допустим всегда
+
+    def test_masks_match_legal_actions(self, env):
+        """Тест: маска — ровно допустимые ходы, индексы декодируются обратно"""
+        env.reset()
+        masks = env.action_masks()
+        for state, mask in zip(env.states(), masks):
+            legal = legal_actions(state)
+            decoded = [env.table.action(int(k), state).model_dump() for k in np.flatnonzero(mask)]
+
+            assert sorted(map(str, decoded)) == sorted(str(a.model_dump()) for a in legal)
+
+    def test_auto_reset_and_rewards(self, env):
+        """Тест: законченные партии перезапускаются, победитель получает +1"""
+        env.reset()
+        rng = np.random.default_rng(0)
+        finished = 0
+        for _ in range(80):
+            obs, rewards, dones, infos = env.step(_random_actions(env, rng))
+            for i in np.flatnonzero(dones):
+                info = infos[i]
+                finished += 1
+                assert info["terminal_observation"].shape == (env.obs_size,)
+                if "winner" in info:
+                    assert rewards[i] == (1.0 if info["winner"] == info["player"] else -1.0)
+                else:
+                    assert info["TimeLimit.truncated"] and rewards[i] == 0
+            assert not any(info.get("illegal") for info in infos)
+
+        assert finished > 0
+
+    def test_reproducible(self):
+        """Тест: одинаковое зерно — одинаковые партии"""
+        runs = []
+        for _ in range(2):
+            env = KingpinVecEnv(2, seed=7)
+            rng = np.random.default_rng(3)
+            env.reset()
+            runs.append([env.step(_random_actions(env, rng))[0] for _ in range(20)])
+
+        assert all((a == b).all() for a, b in zip(*runs))
+
+
+class TestShardedVecEnv:
+    """Тесты ShardedKingpinVecEnv"""
+
+    def test_sharded_matches_interface(self):
+        """Тест: игры делятся между процессами, маски соответствуют состояниям"""
+        with ShardedKingpinVecEnv(5, workers=2, seed=1, max_steps=30) as env:
+            obs = env.reset()
+            rng = np.random.default_rng(0)
+            for _ in range(20):
+                obs, rewards, dones, infos = env.step(_random_actions(env, rng))
+            states = env.states()
+
+            assert obs.shape == (5, env.obs_size) and rewards.shape == dones.shape == (5,)
+            assert len(infos) == len(states) == 5
+            for state, mask in zip(states, env.action_masks()):
+                assert mask.sum() == len(legal_actions(state))
+
+    def test_sharded_reproducible(self):
+        """Тест: одинаковое зерно — одинаковые партии и в процессах"""
+        runs = []
+        for _ in range(2):
+            with ShardedKingpinVecEnv(4, workers=2, seed=7) as env:
+                rng = np.random.default_rng(3)
+                env.reset()
+                runs.append([env.step(_random_actions(env, rng))[0] for _ in range(10)])
+
+        assert all((a == b).all() for a, b in zip(*runs))
+
@@ -0,0 +1,142 @@
+"""
+Unit-тесты для Zobrist-хэширования engine/zobrist.py
+"""
+
+import random
+import pytest
+from packages.engine import zobrist as zh
+from packages.engine.engine import Ctx, apply_action, next_turn, initialize_game
+from packages.engine.legal import legal_actions
+from packages.engine.models import Card
+from packages.simulator.balance import load_base, setup_state
+from tests.test_helpers import TestDataBuilder, CardTemplates
+
+
+def _state():
+    state = TestDataBuilder.create_game_state(
+        p1_cards=[Card(**CardTemplates.BASIC_GANGSTER), Card(**CardTemplates.AUTHORITY_OFFICER)],
+        p2_cards=[Card(**CardTemplates.BOSS_GANGSTER), Card(**CardTemplates.THIEF_WITH_STEAL)],
+    )
+    state.deck = [Card(**CardTemplates.THIEF_WITH_STEAL) for _ in range(4)] + [
+        TestDataBuilder.create_basic_card(f"d{i}") for i in range(6)
+    ]
+    state.players["P2"].hand = [TestDataBuilder.create_basic_card("p2_hand")]
+    initialize_game(state)
+    return state
+
+
+class TestZobristHash:
+    """Тесты Zobrist-хэша состояния"""
+
+    def test_hash_is_lazy(self):
+        """Тест: хэш не отслеживается до первого запроса"""
+        state = _state()
+
+        assert not zh.is_tracked(state)
+        h = state.state_hash()
+        assert zh.is_tracked(state)
+        assert h == zh.full_hash(state)
+
+    def test_equal_states_equal_hash(self):
+        """Тест: одинаковые состояния дают одинаковый хэш"""
+        assert zh.full_hash(_state()) == zh.full_hash(_state())
+
+    def test_hash_is_64_bit(self):
+        """Тест: хэш укладывается в 64 бита"""
+        assert 0 <= _state().state_hash() < 2 ** 64
+
+    def test_different_states_differ(self):
+        """Тест: изменение слота, руки, токенов или хода меняет хэш"""
+        base = zh.full_hash(_state())
+
+        s1 = _state()
+        s1.players["P1"].slots[0].muscles = 1
+        s2 = _state()
+        s2.players["P1"].hand.append(TestDataBuilder.create_basic_card("x"))
+        s3 = _state()
+        s3.players["P2"].tokens.reserve_money -= 1
+        s4 = _state()
+        s4.active_player = "P2"
+
+        hashes = {base, zh.full_hash(s1), zh.full_hash(s2), zh.full_hash(s3), zh.full_hash(s4)}
+        assert len(hashes) == 5
+
+    def test_slot_positions_matter(self):
+        """Тест: перестановка карт между слотами меняет хэш"""
+        a = _state()
+        b = _state()
+        pb = b.players["P1"]
+        pb.slots[0], pb.slots[1] = pb.slots[1], pb.slots[0]
+
+        assert zh.full_hash(a) != zh.full_hash(b)
+
+    def test_touch_after_external_mutation(self):
+        """Тест: внешние изменения учитываются через touch()"""
+        state = _state()
+        state.state_hash()
+        state.players["P1"].slots[2].muscles = 3
+
+        assert state.state_hash() != zh.full_hash(state)
+        zh.touch(state, zh.slot_part("P1", 2))
+        assert state.state_hash() == zh.full_hash(state)
+
+    def test_invalidate(self):
+        """Тест: invalidate() сбрасывает отслеживание"""
+        state = _state()
+        state.state_hash()
+        state.turn_number = 10
+        zh.invalidate(state)
+
+        assert state.state_hash() == zh.full_hash(state)
+
+    def test_next_turn_updates_hash(self):
+        """Тест: next_turn поддерживает хэш"""
+        state = _state()
+        state.players["P2"].slots[1].face_up = False
+        before = state.state_hash()
+
+        next_turn(Ctx(state=state))
+
+        assert state.state_hash() != before
+        assert state.state_hash() == zh.full_hash(state)
+
+    def test_copy_keeps_hash(self):
+        """Тест: глубокая копия сохраняет отслеживаемый хэш"""
+        state = _state()
+        h = state.state_hash()
+        clone = state.model_copy(deep=True)
+
+        assert zh.is_tracked(clone)
+        assert clone.state_hash() == h
+
+    @pytest.mark.parametrize("seed", range(8))
+    def test_incremental_matches_full_in_random_games(self, seed):
+        """Тест: инкрементальный хэш совпадает с полным пересчётом на каждом ходу"""
+        rng = random.Random(seed)
+        state = _state()
+        state.state_hash()
+        ctx = Ctx(state=state)
+        for _ in range(80):
+            result = apply_action(ctx, rng.choice(legal_actions(state)))
+            assert state.state_hash() == zh.full_hash(state)
+            if "winner" in result:
+                break
+
+    def test_incremental_matches_full_with_event_draws(self):
+        """Тест: хэш совпадает с полным пересчётом и после розыгрыша событий"""
+        base = load_base("config/default.yaml")
+        events = 0
+        for seed in range(40):
+            rng = random.Random(seed)
+            state = setup_state(base, seed)
+            state.state_hash()
+            ctx = Ctx(state=state, log=[])
+            for _ in range(120):
+                seen = len(ctx.log)
+                result = apply_action(ctx, rng.choice(legal_actions(state)))
+                events += any(e.get("type") == "draw_event" for e in ctx.log[seen:])
+                assert state.state_hash() == zh.full_hash(state)
+                if "winner" in result:
+                    break
+
+        assert events > 0
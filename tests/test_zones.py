@@ -0,0 +1,120 @@
+"""
+Unit-тесты для индексированных зон карт engine/zones.py
+"""
+
+import random
+from packages.engine.engine import Ctx, apply_action
+from packages.engine.actions import Draw
+from packages.engine.models import CardType, GameState
+from packages.engine.zones import Zone
+from tests.test_helpers import TestDataBuilder
+
+
+def _card(card_id, card_type=CardType.common, clan=None):
+    card = TestDataBuilder.create_basic_card(card_id, card_type=card_type)
+    card.clan = clan
+    return card
+
+
+def _ids(zone):
+    return [c.id for c in zone]
+
+
+class TestZone:
+    """Тесты списочного поведения и индексов"""
+
+    def test_list_protocol(self):
+        """Тест: зона ведёт себя как список карт"""
+        a, b, c = _card("a"), _card("b"), _card("c")
+        zone = Zone([a, b])
+        zone.append(c)
+
+        assert len(zone) == 3 and zone[0] is a and zone[-1] is c
+        assert zone == [a, b, c]
+        assert zone.pop(0) is a
+        assert zone.pop() is c
+        assert _ids(zone) == ["b"]
+
+    def test_indexes_follow_removals(self):
+        """Тест: индексы по id, типу и клану обновляются при удалении"""
+        boss = _card("boss", CardType.boss, clan="Gangsters")
+        zone = Zone([_card("a", clan="gangsters"), boss, _card("a")])
+
+        assert zone.of_type("boss") == [boss]
+        assert len(zone.of_clan("gangsters")) == 2
+        assert zone.count(card_id="a") == 2
+
+        zone.remove(boss)
+
+        assert zone.of_type("boss") == []
+        assert zone.count(clan="gangsters") == 1
+        assert _ids(zone) == ["a", "a"]
+
+    def test_take_first_match_in_order(self):
+        """Тест: take возвращает первую подходящую карту в порядке зоны"""
+        zone = Zone([_card("x"), _card("b1", CardType.boss), _card("y"), _card("b2", CardType.boss)])
+
+        assert zone.take(card_type="boss").id == "b1"
+        assert zone.take(card_type="boss", predicate=lambda c: c.id == "b3") is None
+        assert zone.take(predicate=lambda c: c.id == "y").id == "y"
+        assert _ids(zone) == ["x", "b2"]
+        assert zone[1].id == "b2"
+
+    def test_shuffle_with_game_rng(self):
+        """Тест: перемешивание на месте детерминировано переданным RNG"""
+        cards = [_card(str(i)) for i in range(20)]
+        first, second = Zone(cards), Zone(cards)
+
+        first.shuffle(random.Random(7))
+        second.shuffle(random.Random(7))
+
+        assert _ids(first) == _ids(second) != [str(i) for i in range(20)]
+        assert first.draw() is second.draw()
+
+    def test_take_all_moves_cards(self):
+        """Тест: перенос зоны целиком опустошает источник"""
+        deck, shelf = Zone(), Zone([_card("a"), _card("b")])
+
+        deck.take_all(shelf)
+
+        assert _ids(deck) == ["a", "b"] and len(shelf) == 0
+        assert deck.by_id("a") and not shelf.by_id("a")
+
+
+class TestGameStateZones:
+    """Тесты зон в GameState"""
+
+    def test_lists_are_wrapped(self):
+        """Тест: присвоение списка и model_construct дают Zone, сериализация — список"""
+        state = GameState()
+        state.deck = [_card("a")]
+        built = GameState.model_construct(shelf=[_card("b")])
+
+        assert isinstance(state.deck, Zone) and isinstance(built.shelf, Zone)
+        assert isinstance(state.model_dump()["deck"], list)
+        assert GameState.model_validate(state.model_dump()).deck[0].id == "a"
+
+    def test_recycle_uses_game_rng(self):
+        """Тест: перетасовка полки зависит только от seed партии"""
+        def recycled_order(seed, global_seed):
+            state = TestDataBuilder.create_game_state()
+            state.seed = seed
+            state.shelf = [_card(str(i)) for i in range(10)]
+            state.deck = []
+            random.seed(global_seed)
+            apply_action(Ctx(state=state), Draw(place="hand"))
+            return _ids(state.deck)
+
+        assert recycled_order(3, 1) == recycled_order(3, 2)
+
+    def test_fork_keeps_rng_and_zones_independent(self):
+        """Тест: форк копирует зоны и состояние RNG"""
+        state = GameState(seed=5)
+        state.deck = [_card("a"), _card("b")]
+        state.rng().random()
+        child = state.fork()
+
+        child.deck.draw()
+
+        assert len(state.deck) == 2 and len(child.deck) == 1
+        assert child.rng().random() == state.rng().random()